@@ -0,0 +1,68 @@
+"""
+Run the benchmark suites and write the results as JSON:
+
+    python -m benchmarks --suite all --output results.json
+
+or check them against a baseline, exiting non-zero when a benchmark regressed:
+
+    python -m benchmarks --compare baseline.json --tolerance 0.1
+"""
+import argparse
+import sys
+
+from . import compare
+from . import harness
+from . import hotpaths
+from . import workflow
+from .synthetic import DEFAULT_SCAFFOLD_TYPE
+
+SUITES = ('hotpaths', 'workflow', 'all')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Run the benchmark suites.')
+    parser.add_argument('-s', '--suite', choices=SUITES, default='all', help='suite to run')
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help='JSON results file')
+    parser.add_argument('-r', '--repeats', type=int, default=5, help='timed repeats per benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=hotpaths.DEFAULT_SIZES,
+                        help='scaffold elements along each direction')
+    parser.add_argument('--points', type=int, nargs='+', default=hotpaths.DEFAULT_POINT_COUNTS,
+                        help='data points per frame')
+    parser.add_argument('--times', type=int, default=hotpaths.DEFAULT_TIME_COUNT, help='data frames')
+    parser.add_argument('--scaffold-type', default=DEFAULT_SCAFFOLD_TYPE, help='scaffoldmaker scaffold type')
+    parser.add_argument('--sessions', type=int, default=3, help='end-to-end workflow sessions')
+    parser.add_argument('--workflow-elements', type=int, default=workflow.DEFAULT_ELEMENTS,
+                        help='scaffold elements along each direction in workflow sessions')
+    parser.add_argument('--workflow-points', type=int, default=workflow.DEFAULT_POINT_COUNT,
+                        help='data points per frame in workflow sessions')
+    parser.add_argument('--slider-steps', type=int, default=workflow.DEFAULT_SLIDER_STEPS,
+                        help='slider positions per scripted sweep in workflow sessions')
+    parser.add_argument('--compare', metavar='BASELINE', help='baseline results file to check against')
+    parser.add_argument('--results', help='compare these stored results instead of running the suites')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='relative slowdown of the median allowed before a benchmark regresses')
+    parser.add_argument('--confidence', type=float, default=0.95, help='confidence level of the median ratio')
+    args = parser.parse_args(argv)
+
+    if args.results is not None:
+        results = harness.read_results(args.results)
+    else:
+        results = {}
+        if args.suite in ('hotpaths', 'all'):
+            results.update(hotpaths.run(args.sizes, args.points, args.times, args.repeats, args.scaffold_type))
+        if args.suite in ('workflow', 'all'):
+            results.update(workflow.run(args.sessions, args.workflow_elements, args.workflow_points, args.times,
+                                        args.slider_steps, args.scaffold_type))
+        harness.print_results(results)
+        harness.write_results(results, args.output)
+
+    if args.compare is not None:
+        diffs = compare.compare(results, harness.read_results(args.compare), args.tolerance, args.confidence)
+        print(compare.format_diffs(diffs))
+        if compare.has_regressions(diffs):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Regression gate comparing benchmark results against a stored baseline.
+
+Each benchmark is judged on the ratio of its current to its baseline median time. A
+bootstrap confidence interval of that ratio is computed from the individual repeats, and
+the benchmark regresses only when the whole interval lies above 1 + tolerance, so noise
+in a few repeats does not fail the gate.
+"""
+import numpy as np
+
+REGRESSED = 'regressed'
+IMPROVED = 'improved'
+UNCHANGED = 'ok'
+NEW = 'new'
+MISSING = 'missing'
+
+_BOOTSTRAP_SAMPLES = 2000
+
+
+def median_ratio_interval(current_times, baseline_times, confidence=0.95, seed=0):
+    """
+    Ratio of the current to the baseline median and its bootstrap confidence interval.
+    Returns (ratio, lower, upper).
+    """
+    current_times = np.asarray(current_times, dtype=np.float64)
+    baseline_times = np.asarray(baseline_times, dtype=np.float64)
+    ratio = np.median(current_times) / np.median(baseline_times)
+    if len(current_times) < 2 or len(baseline_times) < 2:
+        return ratio, ratio, ratio
+    random = np.random.RandomState(seed)
+    current_medians = np.median(
+        current_times[random.randint(len(current_times), size=(_BOOTSTRAP_SAMPLES, len(current_times)))], axis=1)
+    baseline_medians = np.median(
+        baseline_times[random.randint(len(baseline_times), size=(_BOOTSTRAP_SAMPLES, len(baseline_times)))], axis=1)
+    tail = 50.0 * (1.0 - confidence)
+    lower, upper = np.percentile(current_medians / baseline_medians, [tail, 100.0 - tail])
+    return ratio, lower, upper
+
+
+def compare(current, baseline, tolerance=0.1, confidence=0.95):
+    """
+    Compare {benchmark name: statistics} results against baseline results.
+
+    :param tolerance: Relative slowdown of the median allowed before a benchmark regresses.
+    :param confidence: Confidence level of the interval on the median ratio.
+    :return: Dict of benchmark name to a diff dict with the baseline and current medians,
+    the ratio, its interval and a status of 'regressed', 'improved', 'ok', 'new' or 'missing'.
+    """
+    diffs = {}
+    for name in set(current) | set(baseline):
+        if name not in baseline:
+            diffs[name] = {'status': NEW, 'current': current[name]['median']}
+            continue
+        if name not in current:
+            diffs[name] = {'status': MISSING, 'baseline': baseline[name]['median']}
+            continue
+        ratio, lower, upper = median_ratio_interval(current[name]['times'], baseline[name]['times'], confidence)
+        if lower > 1.0 + tolerance:
+            status = REGRESSED
+        elif upper < 1.0 / (1.0 + tolerance):
+            status = IMPROVED
+        else:
+            status = UNCHANGED
+        diffs[name] = {'status': status, 'baseline': baseline[name]['median'], 'current': current[name]['median'],
+                       'ratio': float(ratio), 'lower': float(lower), 'upper': float(upper)}
+    return diffs
+
+
+def has_regressions(diffs):
+    return any(diff['status'] == REGRESSED for diff in diffs.values())
+
+
+def format_diffs(diffs):
+    lines = ['{:<64}{:>14}{:>14}{:>8}{:>18}  {}'.format(
+        'benchmark', 'baseline (ms)', 'current (ms)', 'ratio', 'interval', 'status')]
+    for name in sorted(diffs):
+        diff = diffs[name]
+        baseline = '{:.3f}'.format(1000.0 * diff['baseline']) if 'baseline' in diff else '-'
+        current = '{:.3f}'.format(1000.0 * diff['current']) if 'current' in diff else '-'
+        if 'ratio' in diff:
+            ratio = '{:.2f}'.format(diff['ratio'])
+            interval = '[{:.2f}, {:.2f}]'.format(diff['lower'], diff['upper'])
+        else:
+            ratio = interval = '-'
+        lines.append('{:<64}{:>14}{:>14}{:>8}{:>18}  {}'.format(name, baseline, current, ratio, interval,
+                                                                diff['status']))
+    regressed = len([diff for diff in diffs.values() if diff['status'] == REGRESSED])
+    lines.append('{} benchmarks, {} regressed'.format(len(diffs), regressed))
+    return '\n'.join(lines)
@@ -0,0 +1,71 @@
+"""
+Timing helpers shared by the benchmark suites.
+"""
+import json
+import platform
+import sys
+import time
+from timeit import default_timer
+
+import numpy as np
+
+
+def measure(run, setup=None, repeats=5, warmup=1):
+    """
+    Time run() repeats times after warmup untimed calls. When given, setup() is
+    called untimed before every call and its result is passed to run.
+    Returns a dict of the individual times in seconds and their summary statistics.
+    """
+    times = []
+    for index in range(warmup + repeats):
+        arguments = () if setup is None else (setup(),)
+        start = default_timer()
+        run(*arguments)
+        elapsed = default_timer() - start
+        if index >= warmup:
+            times.append(elapsed)
+    return summarise(times)
+
+
+def summarise(times):
+    times = np.asarray(times, dtype=np.float64)
+    return {
+        'times': times.tolist(),
+        'repeats': len(times),
+        'minimum': float(times.min()),
+        'median': float(np.median(times)),
+        'mean': float(times.mean()),
+        'p90': float(np.percentile(times, 90.0)),
+        'p99': float(np.percentile(times, 99.0)),
+        'maximum': float(times.max()),
+    }
+
+
+def metadata():
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
+
+
+def write_results(results, filename):
+    """
+    Write {benchmark name: statistics} results with run metadata as JSON.
+    """
+    with open(filename, 'w') as stream:
+        json.dump({'metadata': metadata(), 'benchmarks': results}, stream, indent=4, sort_keys=True)
+
+
+def read_results(filename):
+    with open(filename, 'r') as stream:
+        return json.load(stream)['benchmarks']
+
+
+def print_results(results):
+    print('{:<64}{:>12}{:>12}{:>12}{:>12}'.format('benchmark', 'min (ms)', 'median (ms)', 'p90 (ms)', 'p99 (ms)'))
+    for name in sorted(results):
+        print('{:<64}{:>12.3f}{:>12.3f}{:>12.3f}{:>12.3f}'.format(
+            name, *[1000.0 * results[name][key] for key in ('minimum', 'median', 'p90', 'p99')]))
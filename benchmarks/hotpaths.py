@@ -0,0 +1,104 @@
+"""
+Micro-benchmarks of the zincutils parameter sweeps, the ScaffoldModel queries and the
+DataModel ingest and range queries over synthetic scaffolds of increasing resolution and
+data clouds of increasing size.
+"""
+from opencmiss.zinc.context import Context
+
+from scaffoldmaker.scaffoldpackage import ScaffoldPackage
+
+from mapclientplugins.scaffoldparameterfitterstep.model.datamodel import DataModel
+from mapclientplugins.scaffoldparameterfitterstep.model.scaffoldmodel import ScaffoldModel
+from mapclientplugins.scaffoldparameterfitterstep.utils import maths
+from mapclientplugins.scaffoldparameterfitterstep.utils import zincutils
+
+from .harness import measure
+from .synthetic import DEFAULT_SCAFFOLD_TYPE, data_description, find_scaffold_type, generate_scaffold, node_count, \
+    scaffold_options
+
+DEFAULT_SIZES = (2, 4, 8, 16)
+DEFAULT_POINT_COUNTS = (1000, 10000, 100000)
+DEFAULT_TIME_COUNT = 10
+
+_CYCLIC_REMAP = [[0.0, 0.0, 1.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]
+
+
+def scaffold_benchmarks(context, sizes=DEFAULT_SIZES, repeats=5, scaffold_type_name=DEFAULT_SCAFFOLD_TYPE):
+    results = {}
+    rotation = maths.eulerToRotationMatrix3([0.1, 0.2, 0.3])
+    for elements in sizes:
+        region = context.createRegion()
+        coordinates = generate_scaffold(region, elements, scaffold_type_name)
+        target_region = context.createRegion()
+        target_coordinates = generate_scaffold(target_region, elements, scaffold_type_name)
+        operations = [
+            ('zincutils.transform_coordinates', lambda: zincutils.transform_coordinates(coordinates, rotation)),
+            ('zincutils.scale_coordinates', lambda: zincutils.scale_coordinates(coordinates, [1.01, 1.01, 1.01])),
+            ('zincutils.offset_scaffold', lambda: zincutils.offset_scaffold(coordinates, [0.1, 0.0, 0.0])),
+            ('zincutils.swap_axes', lambda: zincutils.swap_axes(coordinates, remap=_CYCLIC_REMAP)),
+            ('zincutils.copy_nodal_parameters',
+             lambda: zincutils.copy_nodal_parameters(coordinates, target_coordinates)),
+        ]
+        for name, run in operations:
+            result = measure(run, repeats=repeats)
+            result['parameters'] = {'elements': elements, 'nodes': node_count(region)}
+            results['{}[elements={}]'.format(name, elements)] = result
+    return results
+
+
+def scaffold_model_benchmarks(context, sizes=DEFAULT_SIZES, repeats=5, scaffold_type_name=DEFAULT_SCAFFOLD_TYPE):
+    results = {}
+    scaffold_type = find_scaffold_type(scaffold_type_name)
+    scaffold_package = ScaffoldPackage(scaffold_type)
+    for elements in sizes:
+        region = context.createRegion()
+        generate_scaffold(region, elements, scaffold_type_name)
+        model = ScaffoldModel(context, region, None, {}, context.getMaterialmodule(), [scaffold_package],
+                              ScaffoldPackage)
+        model.initialise_scaffold()
+        model.set_scaffold(scaffold_type)
+        model.set_scaffold_options(scaffold_options(scaffold_type, elements))
+        operations = [
+            ('ScaffoldModel.get_range', lambda: model.get_range()),
+            ('ScaffoldModel.get_surface_samples', lambda: model.get_surface_samples()),
+            ('ScaffoldModel.get_nodal_parameters', lambda: model.get_nodal_parameters()),
+            ('ScaffoldModel.generate_temp_mesh', lambda: model.generate_temp_mesh()),
+        ]
+        for name, run in operations:
+            result = measure(run, repeats=repeats)
+            result['parameters'] = {'elements': elements, 'nodes': node_count(region)}
+            results['{}[elements={}]'.format(name, elements)] = result
+    return results
+
+
+def data_benchmarks(context, point_counts=DEFAULT_POINT_COUNTS, time_count=DEFAULT_TIME_COUNT, repeats=5):
+    results = {}
+    material_module = context.getMaterialmodule()
+    for point_count in point_counts:
+        description = data_description(context, point_count, time_count)
+
+        def create_model():
+            return DataModel(context, context.createRegion(), description, material_module, True)
+
+        label = '[points={},times={}]'.format(point_count, time_count)
+        parameters = {'points': point_count, 'times': time_count}
+        result = measure(lambda model: model.initialise_data(), setup=create_model, repeats=repeats)
+        result['parameters'] = parameters
+        results['DataModel.initialise_data' + label] = result
+
+        model = create_model()
+        model.initialise_data()
+        times = model.get_time_index().get_times()
+        result = measure(lambda: [model.get_range(time) for time in times], repeats=repeats)
+        result['parameters'] = parameters
+        results['DataModel.get_range' + label] = result
+    return results
+
+
+def run(sizes=DEFAULT_SIZES, point_counts=DEFAULT_POINT_COUNTS, time_count=DEFAULT_TIME_COUNT, repeats=5,
+        scaffold_type_name=DEFAULT_SCAFFOLD_TYPE):
+    context = Context('hotpaths')
+    results = scaffold_benchmarks(context, sizes, repeats, scaffold_type_name)
+    results.update(scaffold_model_benchmarks(context, sizes, repeats, scaffold_type_name))
+    results.update(data_benchmarks(context, point_counts, time_count, repeats))
+    return results
@@ -0,0 +1,28 @@
+"""
+Stand-in for the aligner description supplied by the upstream MAP Client step, built
+from a synthetic scaffold and synthetic temporal data so sessions can run offline.
+"""
+from mapclientplugins.scaffoldparameterfitterstep.headless import AlignerDescription
+
+from .synthetic import DEFAULT_SCAFFOLD_TYPE, data_description, find_scaffold_type, scaffold_options
+
+
+class StandInAlignerDescription(AlignerDescription):
+    """
+    Headless aligner description whose data frames are synthetic instead of read from files.
+    """
+
+    def __init__(self, context, elements=4, point_count=5000, time_count=10,
+                 scaffold_type_name=DEFAULT_SCAFFOLD_TYPE, seed=0):
+        self._point_count = point_count
+        self._time_count = time_count
+        self._seed = seed
+        description = {
+            'scaffold_type': scaffold_type_name,
+            'scaffold_settings': scaffold_options(find_scaffold_type(scaffold_type_name), elements),
+            'data_is_temporal': True,
+        }
+        super(StandInAlignerDescription, self).__init__(description, context=context)
+
+    def _read_data_description(self, description):
+        return data_description(self._context, self._point_count, self._time_count, self._seed)
@@ -0,0 +1,85 @@
+"""
+Synthetic scaffolds and temporal data clouds for the benchmarks.
+"""
+import numpy as np
+
+from opencmiss.zinc.field import Field
+
+from mapclientplugins.scaffoldparameterfitterstep.headless import find_scaffold_type
+
+DEFAULT_SCAFFOLD_TYPE = '3D Box 1'
+
+
+def scaffold_options(scaffold_type, elements):
+    """
+    Default options of scaffold_type with every 'Number of elements ...' option set to elements.
+    """
+    options = scaffold_type.getDefaultOptions()
+    for key in options:
+        if key.startswith('Number of elements'):
+            options[key] = elements
+    return options
+
+
+def generate_scaffold(region, elements, scaffold_type_name=DEFAULT_SCAFFOLD_TYPE):
+    """
+    Generate a scaffold with about elements elements along each direction into region
+    and return its coordinates field.
+    """
+    scaffold_type = find_scaffold_type(scaffold_type_name)
+    scaffold_type.generateMesh(region, scaffold_options(scaffold_type, elements))
+    return region.getFieldmodule().findFieldByName('coordinates')
+
+
+def node_count(region):
+    return region.getFieldmodule().findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES).getSize()
+
+
+def data_cloud_frames(point_count, time_count, seed=0):
+    """
+    Noisy samples of a beating ellipsoidal shell, one N x 3 array per frame.
+    """
+    random = np.random.RandomState(seed)
+    frames = []
+    for frame in range(time_count):
+        phase = 2.0 * np.pi * frame / max(time_count, 1)
+        radii = np.array([1.0, 0.8, 1.5]) * (1.0 + 0.1 * np.sin(phase))
+        directions = random.normal(size=(point_count, 3))
+        directions /= np.linalg.norm(directions, axis=1)[:, np.newaxis]
+        shell = 1.0 + 0.05 * random.normal(size=(point_count, 1))
+        frames.append(directions * radii * shell)
+    return frames
+
+
+def _write_datapoints(context, points):
+    region = context.createRegion()
+    fm = region.getFieldmodule()
+    fm.beginChange()
+    coordinates = fm.createFieldFiniteElement(3)
+    coordinates.setName('data_coordinates')
+    coordinates.setTypeCoordinate(True)
+    coordinates.setManaged(True)
+    datapoints = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_DATAPOINTS)
+    template = datapoints.createNodetemplate()
+    template.defineField(coordinates)
+    cache = fm.createFieldcache()
+    for identifier, point in enumerate(points.tolist(), 1):
+        cache.setNode(datapoints.createNode(identifier, template))
+        coordinates.assignReal(cache, point)
+    fm.endChange()
+    stream_information = region.createStreaminformationRegion()
+    memory_resource = stream_information.createStreamresourceMemory()
+    stream_information.setResourceDomainTypes(memory_resource, Field.DOMAIN_TYPE_DATAPOINTS)
+    region.write(stream_information)
+    _, buffer_contents = memory_resource.getBuffer()
+    return buffer_contents
+
+
+def data_description(context, point_count, time_count, seed=0):
+    """
+    Data region description of time_count frames of point_count points, keyed by time
+    as the upstream aligner step supplies it.
+    """
+    frames = data_cloud_frames(point_count, time_count, seed)
+    return dict((str(float(index) / max(time_count - 1, 1)), _write_datapoints(context, points))
+                for index, points in enumerate(frames))
@@ -0,0 +1,86 @@
+"""
+End-to-end sessions on MasterModel with a stand-in aligner description: load, create
+graphics, scripted slider sequences and all-time-points scaling, reporting latency
+percentiles per operation and the total wall time of a session.
+"""
+from timeit import default_timer
+
+import numpy as np
+
+from opencmiss.zinc.context import Context
+
+from mapclientplugins.scaffoldparameterfitterstep.model.mastermodel import MasterModel
+
+from .harness import summarise
+from .standin import StandInAlignerDescription
+from .synthetic import DEFAULT_SCAFFOLD_TYPE
+
+DEFAULT_ELEMENTS = 4
+DEFAULT_POINT_COUNT = 5000
+DEFAULT_TIME_COUNT = 10
+DEFAULT_SLIDER_STEPS = 30
+
+
+class _Session(object):
+
+    def __init__(self):
+        self.latencies = {}
+
+    def time(self, name, function, *arguments):
+        start = default_timer()
+        result = function(*arguments)
+        self.latencies.setdefault(name, []).append(default_timer() - start)
+        return result
+
+
+def run_session(elements=DEFAULT_ELEMENTS, point_count=DEFAULT_POINT_COUNT, time_count=DEFAULT_TIME_COUNT,
+                slider_steps=DEFAULT_SLIDER_STEPS, scaffold_type_name=DEFAULT_SCAFFOLD_TYPE):
+    """
+    Run one scripted session in a fresh Zinc context.
+    Returns (latencies, wall time) where latencies maps operation names to lists of seconds.
+    The time spent building the synthetic inputs is not included.
+    """
+    description = StandInAlignerDescription(Context('workflow'), elements, point_count, time_count,
+                                            scaffold_type_name)
+    session = _Session()
+    start = default_timer()
+    model = session.time('load', MasterModel, description, description.data_is_temporal)
+    model.set_output_directory(None)
+    times = model.get_time_index().get_times()
+    session.time('set_time_value', model.set_time_value, times[0])
+    session.time('create_graphics', model.create_graphics, description.data_is_temporal)
+
+    angles = np.linspace(0.0, 45.0, slider_steps).tolist()
+    for angle in ('yaw', 'pitch', 'roll'):
+        for value in angles + angles[::-1]:
+            session.time('rotate_scaffold', model.rotate_scaffold, angle, value)
+    for axis in ('X', 'Y', 'Z'):
+        for value in angles + angles[::-1]:
+            session.time('translate_scaffold', model.translate_scaffold, axis, value, 0.01)
+    for time in times + times[::-1]:
+        session.time('set_time_value', model.set_time_value, time)
+
+    session.time('scale_scaffold_all_time_points', model.scale_scaffold, True)
+    return session.latencies, default_timer() - start
+
+
+def run(sessions=3, elements=DEFAULT_ELEMENTS, point_count=DEFAULT_POINT_COUNT, time_count=DEFAULT_TIME_COUNT,
+        slider_steps=DEFAULT_SLIDER_STEPS, scaffold_type_name=DEFAULT_SCAFFOLD_TYPE):
+    latencies = {}
+    wall_times = []
+    for _ in range(sessions):
+        session_latencies, wall_time = run_session(elements, point_count, time_count, slider_steps,
+                                                   scaffold_type_name)
+        for name, values in session_latencies.items():
+            latencies.setdefault(name, []).extend(values)
+        wall_times.append(wall_time)
+
+    parameters = {'elements': elements, 'points': point_count, 'times': time_count, 'slider_steps': slider_steps}
+    label = '[elements={},points={},times={}]'.format(elements, point_count, time_count)
+    results = {}
+    for name, values in latencies.items():
+        results['workflow.{}{}'.format(name, label)] = summarise(values)
+    results['workflow.session{}'.format(label)] = summarise(wall_times)
+    for result in results.values():
+        result['parameters'] = parameters
+    return results
@@ -8,9 +8,16 @@ __author__ = 'Mahyar Osanlouy'
 __stepname__ = 'Scaffold Parameter Fitter'
 __location__ = ''
 
-# import class that derives itself from the step mountpoint.
-from mapclientplugins.scaffoldparameterfitterstep import step
+try:
+    from PySide import QtGui
+except ImportError:
+    # Running headless, e.g. through the headless module; the step needs Qt.
+    QtGui = None
 
-# Import the resource file when the module is loaded,
-# this enables the framework to use the step icon.
-from . import resources_rc
\ No newline at end of file
+if QtGui is not None:
+    # import class that derives itself from the step mountpoint.
+    from mapclientplugins.scaffoldparameterfitterstep import step
+
+    # Import the resource file when the module is loaded,
+    # this enables the framework to use the step icon.
+    from . import resources_rc
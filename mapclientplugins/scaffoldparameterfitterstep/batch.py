@@ -0,0 +1,193 @@
+"""
+Batch runner fitting a cohort of subjects over a process pool.
+
+A manifest lists the subjects, each a headless job spec, with defaults shared by all:
+
+    {
+        "workers": 4,
+        "retries": 1,
+        "timeout": 7200,
+        "output_directory": "cohort",
+        "defaults": {
+            "description": {"scaffold_type": "3D Heart Ventricles with Base 2", "data_is_temporal": true},
+            "operations": [{"operation": "scale_scaffold", "all_time_points": true, "alignment_mode": "icp"}]
+        },
+        "subjects": [
+            {"name": "pig01", "description": {"data_files": {"0.0": "pig01/frame_000.exf"}}},
+            {"name": "pig02", "description": "pig02/aligner.json"}
+        ]
+    }
+
+Subject entries override the defaults key by key, and description dicts are merged the
+same way. Subject names must be unique. Each attempt at a subject runs in its own worker
+process with its own Zinc context and writes into <output_directory>/<name> together with
+a <name>.log of everything it printed. Attempts that raise, crash the worker or run longer
+than the optional timeout in seconds are retried. A summary table is printed and written
+to summary.json.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from timeit import default_timer
+
+from mapclientplugins.scaffoldparameterfitterstep import headless
+
+_POLL_INTERVAL = 0.2
+
+
+def subject_job(defaults, subject):
+    """
+    Job spec for subject with the manifest defaults filled in.
+    """
+    job = dict(defaults)
+    job.update(subject)
+    if isinstance(defaults.get('description'), dict) and isinstance(subject.get('description'), dict):
+        job['description'] = dict(defaults['description'])
+        job['description'].update(subject['description'])
+    return job
+
+
+def run_subject_attempt(name, job, base_directory, output_directory, attempt):
+    """
+    Run one attempt at a subject with its output redirected to its log file, which the
+    first attempt starts afresh. Returns None on success, otherwise the error.
+    """
+    if not os.path.isdir(output_directory):
+        os.makedirs(output_directory)
+    error = None
+    stdout, stderr = sys.stdout, sys.stderr
+    with open(os.path.join(output_directory, '{}.log'.format(name)), 'w' if attempt == 1 else 'a') as log:
+        sys.stdout = sys.stderr = log
+        try:
+            print('Subject {}, attempt {}'.format(name, attempt))
+            try:
+                headless.run_job(job, base_directory, output_directory)
+            except Exception as exception:
+                traceback.print_exc()
+                error = '{}: {}'.format(type(exception).__name__, exception)
+            log.flush()
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+    return error
+
+
+def _attempt_process(arguments, connection):
+    connection.send(run_subject_attempt(*arguments))
+    connection.close()
+
+
+def run_manifest(manifest, base_directory='', workers=None, retries=None, output_directory=None, timeout=None):
+    """
+    Fit every subject of a manifest dict over a pool of worker processes. Every attempt
+    at a subject runs in a fresh process, so a worker dying hard, e.g. in Zinc, fails
+    only that attempt.
+
+    :param manifest: Manifest, see the module docstring.
+    :param base_directory: Directory relative file names in the manifest are resolved against.
+    :param workers: Number of worker processes, overriding the manifest; defaults to the CPU count.
+    :param retries: Retries per failed subject, overriding the manifest.
+    :param output_directory: Overrides the manifest's output_directory.
+    :param timeout: Seconds after which an attempt is stopped and failed, overriding the manifest.
+    :return: List of subject summaries in manifest order.
+    """
+    workers = manifest.get('workers', None) if workers is None else workers
+    workers = multiprocessing.cpu_count() if workers is None else max(int(workers), 1)
+    retries = manifest.get('retries', 0) if retries is None else retries
+    timeout = manifest.get('timeout', None) if timeout is None else timeout
+    if output_directory is None:
+        output_directory = os.path.join(base_directory, manifest.get('output_directory', 'output'))
+    defaults = manifest.get('defaults', {})
+    tasks = []
+    summaries = []
+    for index, subject in enumerate(manifest['subjects']):
+        name = subject.get('name', 'subject_{}'.format(index))
+        if name in [summary['name'] for summary in summaries]:
+            raise ValueError('Subject name {} occurs more than once in the manifest.'.format(name))
+        subject_directory = os.path.join(output_directory, name)
+        tasks.append((name, subject_job(defaults, subject), base_directory, subject_directory))
+        summaries.append({'name': name, 'status': 'failed', 'attempts': 0, 'time': 0.0, 'error': None,
+                          'output_directory': subject_directory})
+
+    pending = list(range(len(tasks)))
+    running = {}
+    while pending or running:
+        while pending and (len(running) < workers):
+            index = pending.pop(0)
+            summaries[index]['attempts'] += 1
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_attempt_process,
+                                              args=(tasks[index] + (summaries[index]['attempts'],), sender))
+            process.start()
+            sender.close()
+            running[index] = (process, receiver, default_timer())
+        time.sleep(_POLL_INTERVAL)
+        for index in list(running):
+            process, receiver, start = running[index]
+            alive = process.is_alive()
+            if receiver.poll():
+                try:
+                    error = receiver.recv()
+                except EOFError:
+                    process.join()
+                    error = 'worker exited with code {}'.format(process.exitcode)
+            elif not alive:
+                error = 'worker exited with code {}'.format(process.exitcode)
+            elif (timeout is not None) and (default_timer() - start > timeout):
+                process.terminate()
+                error = 'timed out after {} s'.format(timeout)
+            else:
+                continue
+            process.join()
+            receiver.close()
+            del running[index]
+            summary = summaries[index]
+            summary['time'] += default_timer() - start
+            summary['error'] = error
+            if error is None:
+                summary['status'] = 'ok'
+            elif summary['attempts'] <= retries:
+                pending.append(index)
+                continue
+            print('{} {} after {} attempt(s) in {:.1f} s'.format(
+                summary['name'], summary['status'], summary['attempts'], summary['time']))
+
+    if not os.path.isdir(output_directory):
+        os.makedirs(output_directory)
+    with open(os.path.join(output_directory, 'summary.json'), 'w') as stream:
+        json.dump(summaries, stream, indent=4, sort_keys=True)
+    return summaries
+
+
+def format_summary(summaries):
+    lines = ['{:<24}{:<8}{:>10}{:>12}  {}'.format('subject', 'status', 'attempts', 'time (s)', 'error')]
+    for summary in summaries:
+        lines.append('{:<24}{:<8}{:>10}{:>12.1f}  {}'.format(
+            summary['name'], summary['status'], summary['attempts'], summary['time'], summary['error'] or ''))
+    failed = len([summary for summary in summaries if summary['status'] != 'ok'])
+    lines.append('{} subjects, {} failed'.format(len(summaries), failed))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fit scaffolds for a cohort of subjects.')
+    parser.add_argument('manifest', help='JSON manifest of subjects')
+    parser.add_argument('-w', '--workers', type=int, help='number of worker processes')
+    parser.add_argument('-r', '--retries', type=int, help='retries per failed subject')
+    parser.add_argument('-o', '--output-directory', help='overrides the output directory of the manifest')
+    parser.add_argument('-t', '--timeout', type=float, help='seconds after which a subject attempt is stopped')
+    args = parser.parse_args(argv)
+
+    with open(args.manifest, 'r') as stream:
+        manifest = json.load(stream)
+    summaries = run_manifest(manifest, os.path.dirname(os.path.abspath(args.manifest)), args.workers,
+                             args.retries, args.output_directory, args.timeout)
+    print(format_summary(summaries))
+    return 0 if all(summary['status'] == 'ok' for summary in summaries) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
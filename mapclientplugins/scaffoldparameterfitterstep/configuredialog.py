@@ -6,6 +6,13 @@ from mapclientplugins.scaffoldparameterfitterstep.ui_configuredialog import Ui_C
 INVALID_STYLE_SHEET = 'background-color: rgba(239, 0, 0, 50)'
 DEFAULT_STYLE_SHEET = ''
 
+# Operations that can be profiled, by their traced names; empty for no profiling.
+PROFILE_OPERATIONS = ['', 'MasterModel.scale_scaffold', 'MasterModel.fit_time_points_sequentially',
+                      'MasterModel.fit_time_point', 'MasterModel.scale_scaffold_keyframes',
+                      'MasterModel.align_scaffold_automatically', 'MasterModel.rotate_scaffold',
+                      'MasterModel.translate_scaffold', 'DataModel.initialise_data']
+PROFILERS = ['deterministic', 'sampling']
+
 
 class ConfigureDialog(QtGui.QDialog):
     """
@@ -17,6 +24,8 @@ class ConfigureDialog(QtGui.QDialog):
 
         self._ui = Ui_ConfigureDialog()
         self._ui.setupUi(self)
+        self._ui.comboBox1.addItems(PROFILE_OPERATIONS)
+        self._ui.comboBox2.addItems(PROFILERS)
 
         # Keep track of the previous identifier so that we can track changes
         # and know how many occurrences of the current identifier there should
@@ -71,6 +80,9 @@ class ConfigureDialog(QtGui.QDialog):
         self._previousIdentifier = self._ui.lineEdit0.text()
         config = {}
         config['identifier'] = self._ui.lineEdit0.text()
+        config['profile_operation'] = self._ui.comboBox1.currentText()
+        config['profiler'] = self._ui.comboBox2.currentText()
+        config['profile_directory'] = self._ui.lineEdit3.text()
         return config
 
     def setConfig(self, config):
@@ -81,4 +93,7 @@ class ConfigureDialog(QtGui.QDialog):
         '''
         self._previousIdentifier = config['identifier']
         self._ui.lineEdit0.setText(config['identifier'])
+        self._ui.comboBox1.setCurrentIndex(max(self._ui.comboBox1.findText(config.get('profile_operation', '')), 0))
+        self._ui.comboBox2.setCurrentIndex(max(self._ui.comboBox2.findText(config.get('profiler', '')), 0))
+        self._ui.lineEdit3.setText(config.get('profile_directory', ''))
 
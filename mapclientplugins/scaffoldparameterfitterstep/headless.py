@@ -0,0 +1,276 @@
+"""
+Headless entry point for the scaffold parameter fitter.
+
+Builds a MasterModel from a serialized aligner description and runs the operations
+listed in a JSON job spec without Qt, then writes the fitted model and a timing report.
+
+A job spec looks like:
+
+    {
+        "description": "aligner.json",
+        "output_directory": "output",
+        "output": "fitted_scaffold.exf",
+        "write_time_points": false,
+        "trace": "trace.json",
+        "metrics": true,
+        "memory": {"operations": ["ScaffoldModel.generate_temp_mesh"], "top": 10},
+        "profile": {"operations": ["MasterModel.scale_scaffold"], "profiler": "deterministic", "top": 20},
+        "operations": [
+            {"operation": "filter_data_outliers", "method": "statistical"},
+            {"operation": "initialise_alignment"},
+            {"operation": "scale_scaffold", "all_time_points": true, "alignment_mode": "icp"}
+        ]
+    }
+
+and the aligner description, inline or in its own file, looks like:
+
+    {
+        "scaffold_type": "3D Heart Ventricles with Base 2",
+        "scaffold_settings": {...},
+        "scaffold_file": "scaffold.exf",
+        "parameters": {"LV outer height": 0.95},
+        "data_is_temporal": true,
+        "data_files": {"0.0": "frame_000.exf", "0.1": "frame_001.exf"},
+        "landmarks": {"apex": [[x, y, z], [x, y, z]]},
+        "aligner_settings": {"yaw": 0.0, "pitch": 0.0, "roll": 0.0},
+        "correction_factor": null
+    }
+
+Relative file names are resolved against the directory of the file they appear in.
+Without a scaffold_file the scaffold is generated by scaffoldmaker from its settings.
+"""
+import argparse
+import json
+import os
+import sys
+from timeit import default_timer
+
+import numpy as np
+
+from opencmiss.zinc.context import Context
+from opencmiss.zinc.status import OK as ZINC_OK
+
+from scaffoldmaker.scaffolds import Scaffolds
+from scaffoldmaker.scaffoldpackage import ScaffoldPackage
+
+from mapclientplugins.scaffoldparameterfitterstep.model.mastermodel import MasterModel
+
+# MasterModel operations a job may run, in any order and any number of times.
+OPERATIONS = ('set_time_value', 'remove_zero_valued_data', 'filter_data_outliers', 'set_scale_method', 'remap_axes',
+              'rotate_scaffold', 'translate_scaffold', 'initialise_alignment', 'align_scaffold_automatically',
+              'align_scaffold_to_landmarks', 'scale_scaffold', 'fit_time_points_sequentially',
+              'scale_scaffold_keyframes', 'estimate_scales')
+
+_DEFAULT_ALIGNER_SETTINGS = {'yaw': 0.0, 'pitch': 0.0, 'roll': 0.0, 'X': 0.0, 'Y': 0.0, 'Z': 0.0}
+
+
+class AlignerDescription(object):
+    """
+    Qt-free implementation of the aligner description interface MasterModel is built
+    from, normally supplied by the upstream MAP Client step.
+    """
+
+    def __init__(self, description, base_directory='', context=None):
+        self._context = Context('scaffoldparameterfitter') if context is None else context
+        self._region = self._context.getDefaultRegion().createChild('scaffold')
+        self._base_directory = base_directory
+        self.data_is_temporal = bool(description.get('data_is_temporal', False))
+
+        scaffold_type = find_scaffold_type(description['scaffold_type'])
+        settings = description.get('scaffold_settings', None)
+        if settings:
+            self._scaffold_package = ScaffoldPackage(scaffold_type, {'scaffoldSettings': settings})
+        else:
+            self._scaffold_package = ScaffoldPackage(scaffold_type)
+        self._model_name = description.get('model_name', scaffold_type.getName())
+        self._species = description.get('species', None)
+        self._parameters = description.get('parameters', {})
+        self._correction_factor = description.get('correction_factor', None)
+        self._aligner_settings = dict(_DEFAULT_ALIGNER_SETTINGS)
+        self._aligner_settings.update(description.get('aligner_settings', {}))
+
+        scaffold_file = description.get('scaffold_file', None)
+        if scaffold_file is None:
+            self._scaffold_package.generate(self._region)
+        elif self._region.readFile(self._resolve(scaffold_file)) != ZINC_OK:
+            raise ValueError('Failed to read scaffold file {}.'.format(scaffold_file))
+
+        self._data_description = self._read_data_description(description)
+        if 'landmarks' in description:
+            self._data_description['landmarks'] = description['landmarks']
+
+    def _read_data_description(self, description):
+        """
+        Data region description keyed by time, read from the description's data_files.
+        """
+        data_description = {}
+        for key, data_file in description['data_files'].items():
+            with open(self._resolve(data_file), 'r') as stream:
+                data_description[key] = stream.read()
+        return data_description
+
+    def _resolve(self, filename):
+        return os.path.join(self._base_directory, filename)
+
+    def get_context(self):
+        return self._context
+
+    def get_scaffold_region(self):
+        return self._region
+
+    def get_parameters(self):
+        return self._parameters
+
+    def get_data_region_description(self):
+        return self._data_description
+
+    def get_generator_settings(self):
+        return self._scaffold_package.getScaffoldSettings()
+
+    def get_generator_model(self):
+        return None
+
+    def get_scaffold_package(self):
+        return [self._scaffold_package]
+
+    def get_scaffold_package_class(self):
+        return ScaffoldPackage
+
+    def get_aligner_settings(self):
+        return self._aligner_settings
+
+    def get_model_name(self):
+        return self._model_name
+
+    def get_species(self):
+        return self._species
+
+    def get_correction_factor(self):
+        return self._correction_factor
+
+    def get_time_count(self):
+        return len([key for key in self._data_description if key != 'landmarks'])
+
+    def get_shareable_widget(self):
+        return None
+
+
+def find_scaffold_type(name):
+    for scaffold_type in Scaffolds().getScaffoldTypes():
+        if scaffold_type.getName() == name:
+            return scaffold_type
+    raise ValueError('Scaffold type {} was not found.'.format(name))
+
+
+def _read_json(filename):
+    with open(filename, 'r') as stream:
+        return json.load(stream)
+
+
+def load_aligner_description(description, base_directory=''):
+    """
+    AlignerDescription from a serialized description dict or the name of a JSON file holding one.
+    """
+    if not isinstance(description, dict):
+        filename = os.path.join(base_directory, description)
+        return AlignerDescription(_read_json(filename), os.path.dirname(filename))
+    return AlignerDescription(description, base_directory)
+
+
+def _json_value(value):
+    if hasattr(value, '_asdict'):
+        value = value._asdict()
+    if isinstance(value, dict):
+        return dict((str(key), _json_value(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_json_value(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def run_job(job, base_directory='', output_directory=None):
+    """
+    Run a job spec dict and write its outputs.
+
+    :param job: Job spec, see the module docstring.
+    :param base_directory: Directory relative file names in the job are resolved against.
+    :param output_directory: Overrides the job's output_directory.
+    :return: The timing report, also written to timing.json in the output directory.
+    """
+    job_start = default_timer()
+    if output_directory is None:
+        output_directory = os.path.join(base_directory, job.get('output_directory', 'output'))
+    if not os.path.isdir(output_directory):
+        os.makedirs(output_directory)
+
+    trace_file = job.get('trace', None)
+    MasterModel.set_tracing_enabled(trace_file is not None)
+    MasterModel.set_metrics_enabled(job.get('metrics', False))
+    MasterModel.reset_metrics()
+    memory = job.get('memory', False)
+    if memory:
+        options = {} if memory is True else memory
+        MasterModel.set_memory_tracking(True, options.get('top', 10), options.get('operations', ()))
+    profile = job.get('profile', None)
+    if profile is not None:
+        MasterModel.set_profiling(profile['operations'], os.path.join(output_directory, 'profiles'),
+                                  profile.get('profiler', 'deterministic'), profile.get('top', 20))
+    start = default_timer()
+    description = load_aligner_description(job['description'], base_directory)
+    model = MasterModel(description, description.data_is_temporal)
+    model.set_output_directory(output_directory if job.get('write_time_points', False) else None)
+    model.set_time_value(model.get_time_index().get_minimum_time())
+    report = {'load_time': default_timer() - start, 'operations': []}
+
+    for operation in job.get('operations', []):
+        arguments = dict(operation)
+        name = arguments.pop('operation')
+        if name not in OPERATIONS:
+            raise ValueError('Unknown operation {}, expected one of {}.'.format(name, OPERATIONS))
+        start = default_timer()
+        result = getattr(model, name)(**arguments)
+        report['operations'].append({'operation': name, 'arguments': arguments,
+                                     'time': default_timer() - start, 'result': _json_value(result)})
+
+    start = default_timer()
+    output_file = os.path.join(output_directory, job.get('output', 'fitted_scaffold.exf'))
+    model.write_model(output_file)
+    report['write_time'] = default_timer() - start
+    report['output'] = output_file
+    report['frame_iterations'] = _json_value(model.get_frame_iterations())
+    report['alignment_report'] = _json_value(model.get_alignment_report())
+    if job.get('metrics', False):
+        report['metrics'] = model.get_metrics()
+    if memory:
+        report['memory'] = model.get_memory_report()
+        MasterModel.set_memory_tracking(False)
+    if profile is not None:
+        report['profiles'] = model.get_profile_reports()
+        MasterModel.set_profiling(None)
+    report['total_time'] = default_timer() - job_start
+    if trace_file is not None:
+        MasterModel.export_trace(os.path.join(output_directory, trace_file))
+
+    with open(os.path.join(output_directory, 'timing.json'), 'w') as stream:
+        json.dump(report, stream, indent=4, sort_keys=True)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fit a scaffold to data without a user interface.')
+    parser.add_argument('job', help='JSON job spec')
+    parser.add_argument('-o', '--output-directory', help='overrides the output directory of the job')
+    args = parser.parse_args(argv)
+
+    report = run_job(_read_json(args.job), os.path.dirname(os.path.abspath(args.job)), args.output_directory)
+    for operation in report['operations']:
+        print('{:<32}{:>10.3f} s'.format(operation['operation'], operation['time']))
+    print('{:<32}{:>10.3f} s'.format('total', report['total_time']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
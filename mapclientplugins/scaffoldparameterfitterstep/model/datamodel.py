@@ -3,18 +3,37 @@ from opencmiss.zinc.glyph import Glyph
 from opencmiss.zinc.status import OK as ZINC_OK
 from opencmiss.zinc.streamregion import StreaminformationRegion
 
+from ..utils import filtering
 from ..utils import maths
+from ..utils import metrics
+from ..utils import tracing
+from ..utils import zincutils
+from ..utils.timeindex import TimeIndex
+
+_MESH_DESCRIPTION_KEYS = ('elements3D', 'elements2D', 'elements1D', 'nodes')
+_LANDMARKS_KEY = 'landmarks'
+
+
+def _is_data_key(key):
+    return (key not in _MESH_DESCRIPTION_KEYS) and (key != _LANDMARKS_KEY)
+
+
+def _read_time_index(data_description, is_temporal):
+    if not is_temporal:
+        return TimeIndex([0.0])
+    return TimeIndex(float(key) for key in data_description if _is_data_key(key))
+
+
+def _description_size(data_description):
+    return sum(len(data_description[key]) for key in data_description if _is_data_key(key))
 
 
 def _read_aligner_description(data_region, data_description, is_temporal):
     data_stream_information = data_region.createStreaminformationRegion()
     for key in data_description:
-        if key != 'elements3D' and key != 'elements2D' and key != 'elements1D' and key != 'nodes':
+        if _is_data_key(key):
             if is_temporal:
-                if isinstance(key, float):
-                    time = key
-                else:
-                    time = float(key)
+                time = float(key)
                 memory_resource = data_stream_information.createStreamresourceMemoryBuffer(data_description[key])
                 data_stream_information.setResourceDomainTypes(memory_resource, Field.DOMAIN_TYPE_DATAPOINTS)
                 data_stream_information.setResourceAttributeReal(memory_resource, StreaminformationRegion.ATTRIBUTE_TIME,
@@ -32,6 +51,9 @@ class DataModel(object):
         self._context = context
         self._region = region
         self._sir = _read_aligner_description(self._region, data_description, is_temporal)
+        self._time_index = _read_time_index(data_description, is_temporal)
+        self._description_size = _description_size(data_description)
+        self._landmarks = data_description.get(_LANDMARKS_KEY, None)
 
         self._material_module = material_module
         self._scene = None
@@ -41,6 +63,8 @@ class DataModel(object):
         self._time_sequence = None
 
         self._coordinate_field = None
+        self._data_points = {}
+        self._inlier_masks = {}
 
     def _create_data_point_graphics(self, is_temporal):
         # self._timekeeper.setTime(0.0)
@@ -59,6 +83,7 @@ class DataModel(object):
         points.setMaterial(self._material_module.findMaterialByName('silver'))
         points.setName('display_points')
 
+    @tracing.traced('DataModel.create_data_graphics')
     def create_data_graphics(self, is_temporal):
         self._create_data_point_graphics(is_temporal)
 
@@ -86,11 +111,21 @@ class DataModel(object):
     def get_region(self):
         return self._region
 
+    def get_time_index(self):
+        return self._time_index
+
+    def get_landmarks(self):
+        return self._landmarks
+
     def set_time(self, time):
         self._current_time = time
         self._timekeeper.setTime(time)
 
     def _get_data_range(self, time=0):
+        if time in self._inlier_masks:
+            inlier_points = self.get_data_points(time)
+            if len(inlier_points) > 0:
+                return inlier_points.min(axis=0).tolist(), inlier_points.max(axis=0).tolist()
         fm = self._region.getFieldmodule()
         data_points = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_DATAPOINTS)
         minimums, maximums = self._get_nodeset_minimum_maximum(data_points, self._coordinate_field, time=time)
@@ -99,6 +134,67 @@ class DataModel(object):
     def get_range(self, time=0):
         return self._get_data_range(time=time)
 
+    def get_data_points(self, time=0, inliers_only=True):
+        """
+        Coordinates of the data points at time as an N x 3 array, cached per time.
+        Points masked out by filter_outliers are left out unless inliers_only is False.
+        """
+        if time not in self._data_points:
+            fm = self._region.getFieldmodule()
+            data_points = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_DATAPOINTS)
+            _, self._data_points[time] = zincutils.evaluate_nodeset_field(data_points, self._coordinate_field, time)
+        if inliers_only and (time in self._inlier_masks):
+            return self._data_points[time][self._inlier_masks[time]]
+        return self._data_points[time]
+
+    def invalidate_data_points(self):
+        """
+        Forget the cached coordinates and outlier masks. Call after destroying data points.
+        """
+        self._data_points = {}
+        self._inlier_masks = {}
+
+    def remove_zero_valued_data_points(self, time=0.0, tolerance=1.0e-12):
+        """
+        Destroy the data points whose coordinates at time are all within tolerance of zero.
+        Returns the number destroyed, or None on failure.
+        """
+        removed = zincutils.remove_zero_valued_nodes(self._coordinate_field, time, tolerance)
+        self.invalidate_data_points()
+        if removed is None:
+            print('DataModel.remove_zero_valued_data_points: failed to remove zero valued data points')
+        elif removed > 0:
+            print('DataModel.remove_zero_valued_data_points: removed {} zero valued data points'.format(removed))
+        return removed
+
+    @tracing.traced('DataModel.filter_outliers')
+    def filter_outliers(self, method='statistical', k=8, std_ratio=2.0, radius=None, min_neighbours=4, times=None):
+        """
+        Mask out statistical or radius outliers of the data cloud at each time point using
+        k nearest neighbour distances. The data points themselves are left untouched, and
+        all are kept at a time point where every one would be masked out.
+        Returns a dict of time to the number of points masked out.
+        """
+        if times is None:
+            times = self._time_index.get_times()
+        removed = {}
+        for time in times:
+            points = self.get_data_points(time, inliers_only=False)
+            mask = filtering.outlier_mask(points, method=method, k=k, std_ratio=std_ratio, radius=radius,
+                                          min_neighbours=min_neighbours)
+            if (len(mask) > 0) and not mask.any():
+                print('DataModel.filter_outliers: all data points at time {} are outliers, keeping them'.format(time))
+                mask[:] = True
+            self._inlier_masks[time] = mask
+            removed[time] = int(len(mask) - mask.sum())
+        return removed
+
+    def clear_outlier_filter(self):
+        self._inlier_masks = {}
+
+    def get_inlier_mask(self, time=0):
+        return self._inlier_masks.get(time, None)
+
     def _get_auto_point_size(self):
         minimums, maximums = self._get_data_range()
         data_size = maths.magnitude(maths.sub(maximums, minimums))
@@ -120,18 +216,25 @@ class DataModel(object):
             maximums = None
         del minimums_field
         del maximums_field
+        metrics.increment('fields_created', 2)
+        metrics.increment('fields_destroyed', 2)
+        metrics.increment('fieldcaches_created')
+        metrics.increment('evaluateReal', 2)
         return minimums, maximums
 
     def get_scale(self, time):
         minimums, maximums = self._get_data_range(time)
         return maths.sub(minimums, maximums)
 
+    @tracing.traced('DataModel.initialise_data')
     def initialise_data(self):
         if self._coordinate_field is not None:
             self._coordinate_field = None
+        self.invalidate_data_points()
         result = self._region.read(self._sir)
         if result != ZINC_OK:
             raise ValueError('Failed to read and initialise data cloud.')
+        metrics.increment('bytes_read', self._description_size)
         self._coordinate_field = self.get_data_coordinate_field()
 
     def initialise_scene(self):
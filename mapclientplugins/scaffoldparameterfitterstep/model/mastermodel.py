@@ -1,6 +1,10 @@
 import platform
 
 import math
+import os
+from timeit import default_timer
+
+import numpy as np
 
 from opencmiss.zinc.field import Field
 from opencmiss.zinc.status import OK as ZINC_OK
@@ -8,6 +12,13 @@ from opencmiss.zinc.status import OK as ZINC_OK
 from .scaffoldmodel import ScaffoldModel
 from .datamodel import DataModel
 from ..utils import maths
+from ..utils import memory
+from ..utils import metrics
+from ..utils import profiling
+from ..utils import registration
+from ..utils import scaling
+from ..utils import temporal
+from ..utils import tracing
 from ..utils import zincutils
 
 if platform.system() == 'Windows':
@@ -15,6 +26,8 @@ if platform.system() == 'Windows':
 else:
     LINUX_OS_FLAG = True
 
+_FIT_TOLERANCE = 1.0e-3
+
 
 def _read_model_description(region, description):
     stream_information = region.createStreaminformationRegion()
@@ -37,6 +50,8 @@ class MasterModel(object):
         self._context = self._description.get_context()
         self._material_module = self._context.getMaterialmodule()
         self._region = self._description.get_scaffold_region()
+        self._root_region = self._context.getDefaultRegion()
+        memory.track_region(self._root_region)
         self._parameters = self._description.get_parameters()
         self._data_description = self._description.get_data_region_description()
         self._generator_settings = self._description.get_generator_settings()
@@ -54,6 +69,8 @@ class MasterModel(object):
 
         self._data_model = DataModel(self._context, self._region, self._data_description,
                                      self._material_module, is_temporal)
+        self._time_index = self._data_model.get_time_index()
+        self._scaffold_model.set_times(self._time_index.get_times())
 
         self._initialise_scaffold_and_data()
         self._scene = self._initialise_scene()
@@ -66,6 +83,15 @@ class MasterModel(object):
         self._settings_change_callback = None
         self._current_angle_value = [0., 0., 0.]
         self._current_axis_value = [0., 0., 0.]
+        self._frame_iterations = {}
+        self._alignment_report = None
+        self._landmarks = []
+        self._scale_method = None
+        self._scale_trim = 0.02
+        self._scale_confidence = None
+        self._output_directory = None
+        if self._data_model.get_landmarks():
+            self.set_landmarks(self._data_model.get_landmarks())
 
     def update_scaffold(self):
         self._scaffold_model.generate_mesh_for_fitting()
@@ -73,14 +99,17 @@ class MasterModel(object):
     def get_edit_scaffold(self, key):
         return self._scaffold_model.get_edit_scaffold_option(key)
 
+    @tracing.traced('MasterModel.generate_mesh')
     def generate_mesh(self):
         self._scaffold_model.generate_mesh_for_fitting()
 
+    @tracing.traced('MasterModel.create_graphics')
     def create_graphics(self, is_temporal):
         self._scaffold_model.create_scaffold_graphics()
         self._data_model.create_data_graphics(is_temporal)
 
     def set_time_value(self, time):
+        time = self._time_index.nearest(time)
         self._current_time = time
         self._timekeeper.setTime(time)
         self._data_model.set_time(time)
@@ -88,9 +117,116 @@ class MasterModel(object):
     def set_max_time(self, time):
         self._maximum_time = time
 
+    def get_time_index(self):
+        return self._time_index
+
     def get_context(self):
         return self._context
 
+    def set_output_directory(self, directory):
+        """
+        Directory the fitted time points are written to, or None, the default, to not write them.
+        """
+        self._output_directory = directory
+
+    def get_output_directory(self):
+        return self._output_directory
+
+    def write_model(self, filename):
+        self._scaffold_model.write_model(filename)
+
+    @staticmethod
+    def set_tracing_enabled(enabled):
+        """
+        Record timing spans around the model operations and zincutils sweeps.
+        Enabling starts a new trace.
+        """
+        if enabled:
+            tracing.clear()
+            tracing.enable()
+        else:
+            tracing.disable()
+
+    @staticmethod
+    def set_metrics_enabled(enabled):
+        """
+        Count Zinc API calls, nodes visited, fields created and bytes read and written
+        per model operation.
+        """
+        if enabled:
+            metrics.enable()
+        else:
+            metrics.disable()
+
+    @staticmethod
+    def get_metrics():
+        """
+        Snapshot of the counters per operation and in total, see utils.metrics.
+        """
+        return metrics.snapshot()
+
+    @staticmethod
+    def reset_metrics():
+        metrics.reset()
+
+    @staticmethod
+    def start_metrics_dump(filename, interval=10.0):
+        """
+        Write a metrics snapshot to filename every interval seconds until stop_metrics_dump.
+        """
+        metrics.start_periodic_dump(filename, interval)
+
+    @staticmethod
+    def stop_metrics_dump():
+        metrics.stop_periodic_dump()
+
+    @staticmethod
+    def set_profiling(operations, directory='.', profiler='deterministic', top=20):
+        """
+        Profile every call of the named operations, e.g. ['MasterModel.scale_scaffold'], saving
+        a timestamped profile and a summary of the top functions by own time into directory.
+        profiler is 'deterministic' (cProfile) or 'sampling' (pyinstrument). No operations
+        switches profiling off.
+        """
+        if operations:
+            profiling.configure(operations, directory, profiler, top)
+        else:
+            profiling.disable()
+
+    @staticmethod
+    def get_profile_reports():
+        return profiling.get_reports()
+
+    @staticmethod
+    def set_memory_tracking(enabled, top=10, operations=()):
+        """
+        Record the heap allocated and the Zinc regions and fields alive around each model
+        operation, and around the named nested operations, e.g. 'ScaffoldModel.generate_temp_mesh',
+        flagging operations that keep growing across repeated calls. Enabling starts a new report.
+        """
+        if enabled:
+            memory.reset()
+            memory.enable(top, operations)
+        else:
+            memory.disable()
+
+    @staticmethod
+    def get_memory_report():
+        """
+        Memory usage per operation and the operations growing, see utils.memory.
+        """
+        return memory.report()
+
+    @staticmethod
+    def export_trace(filename, chrome_trace=True):
+        """
+        Write the recorded spans as a Chrome trace, or as JSON with a per-span summary.
+        """
+        if chrome_trace:
+            tracing.export_chrome_trace(filename)
+        else:
+            tracing.export_json(filename)
+
     def get_scaffold_parameters(self):
         return self._parameters
 
@@ -153,6 +289,7 @@ class MasterModel(object):
         self._current_time = time
         self._timekeeper.setTime(time)
 
+    @tracing.traced('MasterModel.rotate_scaffold')
     def rotate_scaffold(self, angle, value):
         self._update_scaffold_coordinate_field()
         next_angle_value = value
@@ -187,6 +324,7 @@ class MasterModel(object):
         self._scaffold_model.set_coordinate_field(self._scaffold_coordinate_field)
         self._apply_callback()
 
+    @tracing.traced('MasterModel.translate_scaffold')
     def translate_scaffold(self, axis, value, rate):
         self._update_scaffold_coordinate_field()
         next_axis_value = value * rate
@@ -220,31 +358,218 @@ class MasterModel(object):
         self._scaffold_model.set_coordinate_field(self._scaffold_coordinate_field)
         self._apply_callback()
 
+    @tracing.traced('MasterModel.align_scaffold_automatically')
+    def align_scaffold_automatically(self, with_scale=False, max_iterations=50, tolerance=1.0e-6,
+                                     inlier_fraction=0.9, multi_resolution=False, levels=3):
+        """
+        Rigidly align the scaffold on the data at the current time by iterative closest point
+        between scaffold surface samples and the data cloud, optionally with a uniform scale.
+        With multi_resolution the alignment runs coarse-to-fine over a resolution pyramid and
+        the time spent per level is available from get_alignment_report.
+        Returns the registration.Alignment that was applied.
+        """
+        self._update_scaffold_coordinate_field()
+        scaffold_samples = self._scaffold_model.get_surface_samples(time=self._current_time)
+        data_points = self._data_model.get_data_points(time=self._current_time)
+        if multi_resolution:
+            alignment, self._alignment_report = registration.icp_pyramid(
+                scaffold_samples, data_points, levels=levels, with_scale=with_scale, tolerance=tolerance,
+                max_iterations=max_iterations, inlier_fraction=inlier_fraction)
+        else:
+            start = default_timer()
+            alignment = registration.icp(scaffold_samples, data_points, with_scale=with_scale,
+                                         max_iterations=max_iterations, tolerance=tolerance,
+                                         inlier_fraction=inlier_fraction)
+            self._alignment_report = [{'level': 0, 'source_points': len(scaffold_samples),
+                                       'target_points': len(data_points), 'iterations': alignment.iterations,
+                                       'error': float(alignment.error), 'time': default_timer() - start}]
+        self._apply_similarity_transform(alignment.rotation, alignment.translation, alignment.scale)
+        self._apply_callback()
+        return alignment
+
+    @tracing.traced('MasterModel.initialise_alignment')
+    def initialise_alignment(self, with_scale=False):
+        """
+        Closed-form initial pose at the current time: match the principal axes and centroid
+        of the scaffold nodes to those of the data cloud, choosing the best of the proper
+        axis sign and permutation candidates. Returns the registration.Alignment applied.
+        """
+        self._update_scaffold_coordinate_field()
+        node_coordinates = self._scaffold_model.get_node_coordinates(time=self._current_time)
+        data_points = self._data_model.get_data_points(time=self._current_time)
+        alignment = registration.principal_axes_alignment(node_coordinates, data_points, with_scale=with_scale)
+        self._apply_similarity_transform(alignment.rotation, alignment.translation, alignment.scale)
+        self._apply_callback()
+        return alignment
+
+    def set_landmarks(self, landmarks):
+        """
+        Set landmark correspondences as a list of (scaffold point, data point) pairs
+        or a dict of named pairs, e.g. {'apex': ([x, y, z], [x, y, z])}. Each scaffold
+        point is stored as the material location in the scaffold mesh nearest to it now,
+        so it moves with the scaffold through any later transform and time change.
+        """
+        if isinstance(landmarks, dict):
+            landmarks = [landmarks[name] for name in sorted(landmarks)]
+        landmarks = list(landmarks)
+        locations = self._scaffold_model.find_mesh_locations([scaffold_point for scaffold_point, _ in landmarks],
+                                                             time=self._get_landmark_time())
+        self._landmarks = []
+        for location, (scaffold_point, data_point) in zip(locations, landmarks):
+            if location is None:
+                print('MasterModel.set_landmarks: no scaffold location found for landmark', scaffold_point)
+            else:
+                self._landmarks.append((location, list(data_point)))
+
+    def get_landmarks(self):
+        """
+        The landmark correspondences as (scaffold point, data point) pairs, with the
+        scaffold points evaluated at the current time.
+        """
+        if not self._landmarks:
+            return []
+        scaffold_points = self._get_landmark_scaffold_points()
+        if scaffold_points is None:
+            return []
+        return [(scaffold_point, data_point) for scaffold_point, (_, data_point)
+                in zip(scaffold_points.tolist(), self._landmarks)]
+
+    def _get_landmark_time(self):
+        return 0.0 if self._current_time is None else self._current_time
+
+    def _get_landmark_scaffold_points(self):
+        return self._scaffold_model.evaluate_mesh_locations([location for location, _ in self._landmarks],
+                                                            time=self._get_landmark_time())
+
+    @tracing.traced('MasterModel.align_scaffold_to_landmarks')
+    def align_scaffold_to_landmarks(self, with_scale=True):
+        """
+        Apply the closed-form similarity transform (Umeyama) best mapping the scaffold
+        landmarks, evaluated at their material locations at the current time, onto their
+        data counterparts. Returns the registration.Alignment applied, or None if the
+        scaffold landmarks could not be evaluated.
+        """
+        if len(self._landmarks) < 3:
+            raise ValueError('At least three landmark pairs are required for landmark alignment.')
+        self._update_scaffold_coordinate_field()
+        scaffold_points = self._get_landmark_scaffold_points()
+        if scaffold_points is None:
+            return None
+        data_points = np.array([data_point for _, data_point in self._landmarks], dtype=np.float64)
+        rotation, translation, scale = registration.similarity_transform(scaffold_points, data_points,
+                                                                         with_scale=with_scale)
+        moved_points = registration.apply_transform(scaffold_points, rotation, translation, scale)
+        error = np.sqrt(np.mean(np.sum((moved_points - data_points) ** 2, axis=1)))
+        self._apply_similarity_transform(rotation, translation, scale)
+        self._apply_callback()
+        return registration.Alignment(rotation, translation, scale, error, 1)
+
+    def get_alignment_report(self):
+        return self._alignment_report
+
+    def _apply_similarity_transform(self, rotation, translation, scale=1.0):
+        transformation = (scale * np.asarray(rotation)).tolist()
+        zincutils.transform_coordinates(self._scaffold_coordinate_field, transformation, time=self._current_time)
+        zincutils.offset_scaffold(self._scaffold_coordinate_field, np.asarray(translation).tolist(),
+                                  time=self._current_time)
+        self._scaffold_model.set_coordinate_field(self._scaffold_coordinate_field)
+
+    @tracing.traced('MasterModel.remap_axes')
+    def remap_axes(self, remap=None):
+        """
+        Apply a signed permutation of the scaffold axes to every nodal parameter. Defaults to
+        the 'axis_remap' aligner setting, given either as a 3 x 3 signed permutation matrix or
+        as {'scaffold_up': ..., 'data_up': ...} with axes 'X', 'Y', 'Z' or '-X', '-Y', '-Z'.
+        """
+        if remap is None:
+            remap = self._settings.get('axis_remap')
+        if remap is None:
+            return False
+        self._update_scaffold_coordinate_field()
+        times = self._time_index.get_times() if self._scaffold_model.is_time_aware() else [0.0]
+        if isinstance(remap, dict):
+            success = zincutils.swap_axes(self._scaffold_coordinate_field, axes=remap, times=times)
+        else:
+            success = zincutils.swap_axes(self._scaffold_coordinate_field, remap=remap, times=times)
+        self._scaffold_model.set_coordinate_field(self._scaffold_coordinate_field)
+        self._apply_callback()
+        return success
+
     def _update_scaffold_coordinate_field(self):
         self._scaffold_coordinate_field = self._scaffold_model.get_coordinate_field()
 
-    def get_scaffold_to_data_ratio(self):
+    def remove_zero_valued_data(self, tolerance=1.0e-12):
+        """
+        Destroy the data points whose coordinates at the current time are all within
+        tolerance of zero. Returns the number destroyed, or None on failure.
+        """
+        return self._data_model.remove_zero_valued_data_points(self._current_time, tolerance)
+
+    def filter_data_outliers(self, method='statistical', k=8, std_ratio=2.0, radius=None, min_neighbours=4):
+        """
+        Mask statistical or radius outliers out of the data cloud at every time point so they
+        no longer affect data ranges, scales, centres and alignment.
+        Returns a dict of time to the number of points masked out.
+        """
+        return self._data_model.filter_outliers(method=method, k=k, std_ratio=std_ratio, radius=radius,
+                                                min_neighbours=min_neighbours)
+
+    def set_scale_method(self, method, trim=0.02):
+        """
+        Estimate the scaffold to data scale with one of scaling.SCALE_METHODS instead of
+        bounding-box ratios, or with bounding boxes again when method is None.
+        """
+        if (method is not None) and (method not in scaling.SCALE_METHODS):
+            raise ValueError('Unknown scale estimation method {}, expected one of {}.'.format(
+                method, scaling.SCALE_METHODS))
+        self._scale_method = method
+        self._scale_trim = trim
+
+    def get_scale_confidence(self):
+        return self._scale_confidence
+
+    def estimate_scales(self, times=None, method='moments', trim=0.02):
+        """
+        Robust scaffold to data scale ratios for all (or the given) time points in one
+        batched pass. Returns a dict of time to (per-axis ratios, confidence).
+        """
+        if times is None:
+            times = self._time_index.get_times()
+        if self._scaffold_model.is_time_aware():
+            scaffold_samples = [self._scaffold_model.get_surface_samples(time=time) for time in times]
+        else:
+            scaffold_samples = [self._scaffold_model.get_surface_samples(time=self._current_time)] * len(times)
+        data_points = [self._data_model.get_data_points(time=time) for time in times]
+        ratios, confidences = scaling.estimate_scale_ratios(scaffold_samples, data_points, method=method, trim=trim)
+        return dict((time, (ratio.tolist(), float(confidence)))
+                    for time, ratio, confidence in zip(times, ratios, confidences))
+
+    def _get_robust_scaffold_to_data_ratio(self):
+        ratio, confidence = self.estimate_scales(
+            [self._current_time], method=self._scale_method, trim=self._scale_trim)[self._current_time]
+        finite_ratios = [value for value in ratio if not math.isnan(value)]
+        mean_ratio = sum(finite_ratios) / len(finite_ratios) if finite_ratios else 1.0
+        return [mean_ratio if math.isnan(value) else value for value in ratio], confidence
+
+    def _compute_scaffold_to_data_ratio(self):
+        """
+        Per-axis scaffold to data scale ratio at the current time and its confidence, None
+        without a scale method. Unlike get_scaffold_to_data_ratio nothing is stored.
+        """
         correction_factor = self._description.get_correction_factor()
+        if self._scale_method is not None:
+            return self._get_robust_scaffold_to_data_ratio()
         if correction_factor is not None:
             print('Current time = ', self._current_time)
-            data_range_temp = self._data_model.get_scale(self._current_time)
-
-            for range_index in range(len(data_range_temp)):
-                if data_range_temp[range_index] == 0.0:
-                    data_range_temp[range_index] = 1.0
-
-            data_range = maths.eldiv(data_range_temp, correction_factor)
-            scaffold_scale = self._scaffold_model.get_scale()
-            diff = maths.eldiv(scaffold_scale, data_range)
-
-            for temp_index in range(len(diff)):
-                if diff[temp_index] == scaffold_scale[temp_index]:
-                    diff[temp_index] = 1.0
-        else:
-            data_scale = self._data_model.get_scale(self._current_time)
-            scaffold_scale = self._scaffold_model.get_scale()
-            diff = maths.eldiv(scaffold_scale, data_scale)
+            return scaling.range_ratios(self._scaffold_model.get_scale(self._current_time),
+                                        self._data_model.get_scale(self._current_time), correction_factor), None
+        return scaling.range_ratios(self._scaffold_model.get_scale(self._current_time),
+                                    self._data_model.get_scale(self._current_time)), None
 
+    def get_scaffold_to_data_ratio(self):
+        diff, confidence = self._compute_scaffold_to_data_ratio()
+        if self._scale_method is not None:
+            self._scale_confidence = confidence
         self._scaffold_data_scale_ratio = diff
         mean_diff = sum(diff) / len(diff)
         diff_string = '%s*%s*%s' %(diff[0], diff[1], diff[2])
@@ -277,15 +602,23 @@ class MasterModel(object):
         model_centre = maths.eldiv(model_centre_temp, [1, 1, 1])
         return model_centre
 
-    def scale_scaffold(self, all_time_points=False):
+    @tracing.traced('MasterModel.scale_scaffold')
+    def scale_scaffold(self, all_time_points=False, alignment_mode=None):
+        """
+        Scale the scaffold to the data at the current or at all time points. With an
+        alignment_mode, all time points are instead fitted by fit_time_points_sequentially.
+        """
         self._reference_centre = self._get_model_centre()
-        if self._scaffold_data_scale_ratio is None:
+        if all_time_points and (alignment_mode is not None):
+            self.fit_time_points_sequentially(alignment_mode=alignment_mode)
+        elif self._scaffold_data_scale_ratio is None:
             if all_time_points:
-                for time in range(self._maximum_time):
+                for time in self._time_index:
                     self.set_time_value(time)
                     self.get_scaffold_to_data_ratio()
                     self._apply_scale()
                     self._align_scaffold_on_data()
+                    self._write_time_point()
             else:
                 self.get_scaffold_to_data_ratio()
                 self._apply_scale()
@@ -295,7 +628,7 @@ class MasterModel(object):
             self._scaffold_coordinate_field = self._scaffold_model.get_coordinate_field()
             self._scaffold_data_scale_ratio = None
             if all_time_points:
-                for time in range(self._maximum_time):
+                for time in self._time_index:
                     self.set_time_value(time)
                     self.get_scaffold_to_data_ratio()
                     self._apply_scale()
@@ -305,6 +638,125 @@ class MasterModel(object):
                 self._apply_scale()
                 # self._align_scaffold_on_data()
 
+    @tracing.traced('MasterModel.fit_time_point')
+    def _fit_time_point(self, time, tolerance=None, alignment_mode=None):
+        """
+        Scale the scaffold to the data at time unless the ratio is already within tolerance,
+        centre it, and optionally align it automatically. Returns the iterations the
+        automatic alignment needed, 0 without one as scaling and centring are closed form.
+        """
+        self.set_time_value(time)
+        mean_ratio, _ = self.get_scaffold_to_data_ratio()
+        if (tolerance is None) or (abs(abs(mean_ratio) - 1.0) >= tolerance):
+            self._apply_scale()
+        self._align_scaffold_on_data()
+        iterations = 0
+        if alignment_mode == 'principal_axes':
+            self.initialise_alignment()
+        if alignment_mode is not None:
+            alignment = self.align_scaffold_automatically(multi_resolution=(alignment_mode == 'multi_resolution'))
+            iterations += alignment.iterations
+        self._frame_iterations[time] = iterations
+        self._write_time_point()
+        return iterations
+
+    @tracing.traced('MasterModel.fit_time_points_sequentially')
+    def fit_time_points_sequentially(self, times=None, warm_start=True, tolerance=_FIT_TOLERANCE,
+                                     alignment_mode=None):
+        """
+        Fit frames in order, seeding the pose, scale and parameters of each frame from
+        the fitted parameters of the previous frame. Each frame is rescaled unless its
+        scale ratio is within tolerance, then centred. alignment_mode 'icp' or
+        'multi_resolution' additionally aligns each frame automatically on its data, and
+        'principal_axes' initialises each frame's pose from principal axes before ICP.
+        Returns a dict of the iterations the automatic alignment of each frame needed.
+        """
+        if times is None:
+            times = self._time_index.get_times()
+        self._reference_centre = self._get_model_centre()
+        self._scaffold_model.set_time_aware()
+        previous_time = None
+        for time in times:
+            if warm_start and (previous_time is not None):
+                self._scaffold_model.copy_nodal_parameters(previous_time, [time])
+            self._fit_time_point(time, tolerance, alignment_mode)
+            previous_time = time
+        return dict((time, self._frame_iterations[time]) for time in times)
+
+    def get_frame_iterations(self):
+        return dict(self._frame_iterations)
+
+    def _get_fit_error(self):
+        """
+        Relative residual a full fit would remove at the current time: deviation of the
+        scaffold to data scale ratio from 1 plus the centre offset from the reference centre.
+        """
+        ratio, _ = self._compute_scaffold_to_data_ratio()
+        mean_ratio = sum(ratio) / len(ratio)
+        model_minimums, model_maximums = self._scaffold_model.get_range(time=self._current_time)
+        model_size = maths.magnitude(maths.sub(model_maximums, model_minimums))
+        centre_offset = maths.magnitude(maths.sub(self._get_model_centre(), self._reference_centre))
+        return abs(abs(mean_ratio) - 1.0) + centre_offset / model_size
+
+    def _get_data_signatures(self, times):
+        """
+        Per-frame data centre and extents, normalised by the mean data size.
+        """
+        signatures = []
+        for time in times:
+            minimums, maximums = self._data_model.get_range(time=time)
+            signatures.append(maths.mult(maths.add(minimums, maximums), 0.5) + maths.sub(maximums, minimums))
+        signatures = np.array(signatures, dtype=np.float64)
+        size = np.mean(np.linalg.norm(signatures[:, 3:], axis=1))
+        return signatures / size if size > 0.0 else signatures
+
+    @tracing.traced('MasterModel.scale_scaffold_keyframes')
+    def scale_scaffold_keyframes(self, keyframes=None, stride=4, change_threshold=None, error_threshold=None):
+        """
+        Fully fit only keyframes and interpolate the scaffold parameters of the frames in between.
+
+        :param keyframes: Explicit keyframe times, snapped to the nearest available frames.
+        :param stride: Fit every stride-th frame when no keyframes or change_threshold are given.
+        :param change_threshold: Start a new keyframe when the data centre and extents move by more
+        than this fraction of the data size.
+        :param error_threshold: Refine interpolated frames whose fit error exceeds this value.
+        :return: Sorted list of the fully fitted times, or None if the parameters of a
+        keyframe could not be got, in which case no frame is interpolated.
+        """
+        times = self._time_index.get_times()
+        if keyframes is not None:
+            key_times = sorted(set(self._time_index.nearest(time) for time in keyframes))
+        elif change_threshold is not None:
+            key_times = temporal.select_adaptive_keyframes(times, self._get_data_signatures(times), change_threshold)
+        else:
+            key_times = temporal.select_uniform_keyframes(times, stride)
+
+        self.fit_time_points_sequentially(key_times)
+        layout = None
+        key_values = []
+        for time in key_times:
+            layout, values = self._scaffold_model.get_nodal_parameters(time, layout=layout)
+            if layout is None:
+                print('MasterModel.scale_scaffold_keyframes: failed to get the parameters at time', time)
+                return None
+            key_values.append(values)
+
+        fitted_times = set(key_times)
+        in_between_times = [time for time in times if time not in fitted_times]
+        if in_between_times:
+            interpolated_values = temporal.interpolate_parameters(key_times, key_values, in_between_times)
+            for time, values in zip(in_between_times, interpolated_values):
+                self._scaffold_model.set_nodal_parameters(layout, values, time)
+
+        if error_threshold is not None:
+            for time in in_between_times:
+                self.set_time_value(time)
+                if self._get_fit_error() > error_threshold:
+                    self._fit_time_point(time, _FIT_TOLERANCE)
+                    fitted_times.add(time)
+
+        return sorted(fitted_times)
+
     def _align_scaffold_on_data(self):
         data_minimums, data_maximums = self._data_model.get_range(time=self._current_time)
         data_centre = maths.mult(maths.add(data_minimums, data_maximums), 0.5)
@@ -315,13 +767,23 @@ class MasterModel(object):
         zincutils.offset_scaffold(self._scaffold_coordinate_field, offset, time=self._current_time)
         self._scaffold_model.set_coordinate_field(self._scaffold_coordinate_field)
 
+    def _write_time_point(self):
+        if self._output_directory is None:
+            return
         time = self._current_time
-        exf_file = 'fitted_heart_%s.exf' % time
-        self._region.writeFile('D:\\sparc\\tmp\\pig_scaffold_time\\{}'.format(exf_file))
+        exf_file = os.path.join(self._output_directory, 'fitted_heart_%s.exf' % time)
+        self._region.writeFile(exf_file)
+        metrics.count_file_written(exf_file)
 
     def _apply_callback(self):
-        self._settings_change_callback()
+        if self._settings_change_callback is not None:
+            self._settings_change_callback()
 
     def save_temp(self):
-        filename = 'fitted_heart_%.3f' % self._current_time
-        self._region.writeFile('D:\\sparc\\tmp\\pig_scaffold_time\\{}'.format(filename))
+        if self._output_directory is None:
+            print('MasterModel.save_temp: no output directory set')
+            return False
+        filename = os.path.join(self._output_directory, 'fitted_heart_%.3f' % self._current_time)
+        self._region.writeFile(filename)
+        metrics.count_file_written(filename)
+        return True
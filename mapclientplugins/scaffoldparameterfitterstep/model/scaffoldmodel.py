@@ -10,6 +10,14 @@ from scaffoldmaker.scaffolds import Scaffolds
 from scaffoldmaker.scaffoldpackage import ScaffoldPackage
 
 from ..utils import maths
+from ..utils import memory
+from ..utils import metrics
+from ..utils import tracing
+from ..utils import zincutils
+
+# Scratch regions temp meshes are generated into in turn, so the previous temp mesh
+# stays intact while the next candidate is generated.
+_SCRATCH_REGION_COUNT = 2
 
 
 class ScaffoldModel(object):
@@ -46,10 +54,13 @@ class ScaffoldModel(object):
         self._scaffold = None
         self._scaffold_options = None
         self._temp_region = None
+        self._scratch_regions = []
+        self._scratch_region_uses = 0
         self._annotation_groups = None
         self._scene = None
         self._scaffold_is_time_aware = None
         self._scaffold_fit_parameters = None
+        self._times = []
         self._initialise_surface_material()
         # self._timekeeper = self._scene.getTimekeepermodule().getDefaultTimekeeper()
         # self._current_time = None
@@ -140,6 +151,7 @@ class ScaffoldModel(object):
         self._scene.endChange()
         return lines
 
+    @tracing.traced('ScaffoldModel.create_scaffold_graphics')
     def create_scaffold_graphics(self):
         # self._create_node_graphics()
         self._create_line_graphics()
@@ -183,18 +195,68 @@ class ScaffoldModel(object):
         result, min_x = min_coordinates.evaluateReal(cache, components_count)
         result, max_x = max_coordinates.evaluateReal(cache, components_count)
         fm.endChange()
+        metrics.increment('fields_created', 2)
+        metrics.increment('fieldcaches_created')
+        metrics.increment('evaluateReal', 2)
         return min_x, max_x
 
     def get_range(self, time=0):
         return self._get_node_coordinates_range(time=time)
 
-    def get_scale(self):
-        minimums, maximums = self._get_node_coordinates_range()
+    def get_scale(self, time=0):
+        minimums, maximums = self._get_node_coordinates_range(time=time)
         return maths.sub(minimums, maximums)
 
     def get_coordinate_field(self):
         return self._coordinate_field
 
+    def get_surface_samples(self, time=0, divisions=2):
+        """
+        Coordinates sampled over the exterior faces of the scaffold at time as an
+        N x 3 array, falling back to the node coordinates when there are no faces.
+        """
+        fm = self._region.getFieldmodule()
+        mesh = fm.findMeshByDimension(2)
+        if mesh.getSize() > 0:
+            samples = zincutils.sample_mesh_field(mesh, self._coordinate_field, divisions=divisions, time=time)
+            if len(samples) > 0:
+                return samples
+        return self.get_node_coordinates(time)
+
+    def get_node_coordinates(self, time=0):
+        fm = self._region.getFieldmodule()
+        nodes = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        _, coordinates = zincutils.evaluate_nodeset_field(nodes, self._coordinate_field, time)
+        return coordinates
+
+    def find_mesh_locations(self, points, time=0):
+        return zincutils.find_mesh_locations(self._get_mesh(), self._coordinate_field, points, time=time)
+
+    def evaluate_mesh_locations(self, locations, time=0):
+        return zincutils.evaluate_mesh_locations(self._get_mesh(), self._coordinate_field, locations, time=time)
+
+    def get_nodal_parameters(self, time=0, layout=None):
+        return zincutils.get_nodal_parameters(self._coordinate_field, time=time, layout=layout)
+
+    def copy_nodal_parameters(self, source_time, times):
+        return zincutils.copy_nodal_parameters_over_times(self._coordinate_field, self._coordinate_field, times,
+                                                          source_time=source_time)
+
+    def set_nodal_parameters(self, layout, values, time=0):
+        return zincutils.set_nodal_parameters(self._coordinate_field, layout, values, time=time)
+
+    def is_time_aware(self):
+        return bool(self._scaffold_is_time_aware)
+
+    def set_times(self, times):
+        self._times = list(times)
+
+    def set_time_aware(self, times=None):
+        if self._scaffold_is_time_aware:
+            return
+        zincutils.define_nodal_timesequence(self._coordinate_field, self._times if times is None else times)
+        self._scaffold_is_time_aware = True
+
     def get_scaffold_options(self):
         return self._scaffold_options
 
@@ -226,6 +288,7 @@ class ScaffoldModel(object):
         # print(self.get_edit_scaffold_settings()[key])
         return self.get_edit_scaffold_settings()[key]
 
+    @tracing.traced('ScaffoldModel.generate_mesh_for_fitting')
     def generate_mesh_for_fitting(self):
         scaffold_package = self._scaffold_package
         # if self._region:
@@ -284,13 +347,23 @@ class ScaffoldModel(object):
         self._scene.endChange()
         self.set_coordinate_field(field)
 
+    @tracing.traced('ScaffoldModel.transfer_temp_into_main')
     def transfer_temp_into_main(self, time):
+        if time in self._times:
+            self.set_time_aware()
+            temp_coordinate_field = self._temp_region.getFieldmodule().findFieldByName('coordinates')
+            if zincutils.copy_nodal_parameters(temp_coordinate_field, self._coordinate_field, time):
+                return
+        # Times outside the known frames need the node time sequence extended, which reading does.
+        # Reading also overwrites any parameters a partial direct copy left behind, e.g. when
+        # node identifiers or parameter layouts of the temp and main regions differ.
         node_descriptions = _extract_node_descriptions(self._temp_region)
         if not self._scaffold_is_time_aware:
             self._undefine_scaffold_nodes()
             self._scaffold_is_time_aware = True
         _read_node_descriptions(self._region, node_descriptions, time)
 
+    @tracing.traced('ScaffoldModel.generate_temp_mesh')
     def generate_temp_mesh(self, fit_options_array=None):
         fit_options = {}
         if fit_options_array is not None:
@@ -299,9 +372,25 @@ class ScaffoldModel(object):
 
         temp_options = self.get_scaffold_options().copy()
         temp_options.update(fit_options)
-        self._temp_region = self._region.createRegion()
+        self._temp_region = self._next_scratch_region()
         self._scaffold.generateMesh(self._temp_region, temp_options)
 
+    def _next_scratch_region(self):
+        """
+        Scratch regions are owned by this model, so concurrent workers each fitting with
+        their own model never share them.
+        """
+        index = self._scratch_region_uses % _SCRATCH_REGION_COUNT
+        self._scratch_region_uses += 1
+        if index < len(self._scratch_regions):
+            region = self._scratch_regions[index]
+            zincutils.clear_region(region)
+        else:
+            region = self._region.createRegion()
+            memory.track_region(region)
+            self._scratch_regions.append(region)
+        return region
+
     def set_scaffold_options(self, options):
         self._scaffold_options = options
         parameters = []
@@ -332,6 +421,7 @@ class ScaffoldModel(object):
 
     def write_model(self, filename):
         self._region.writeFile(filename)
+        metrics.count_file_written(filename)
 
 
 def _extract_node_descriptions(region):
@@ -340,6 +430,7 @@ def _extract_node_descriptions(region):
     stream_information.setResourceDomainTypes(memory_resource, Field.DOMAIN_TYPE_NODES)
     region.write(stream_information)
     _, buffer_contents = memory_resource.getBuffer()
+    metrics.increment('bytes_written', len(buffer_contents))
     return buffer_contents
 
 
@@ -349,6 +440,7 @@ def _read_node_descriptions(region, buffer, time):
     stream_information.setResourceDomainTypes(memory_resource, Field.DOMAIN_TYPE_NODES)
     stream_information.setResourceAttributeReal(memory_resource, StreaminformationRegion.ATTRIBUTE_TIME, time)
     region.read(stream_information)
+    metrics.increment('bytes_read', len(buffer))
 
 
 def _read_aligner_description(scaffold_region, scaffold_description):
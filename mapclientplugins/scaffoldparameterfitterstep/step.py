@@ -3,6 +3,7 @@
 MAP Client Plugin Step
 """
 import json
+import os
 
 from PySide import QtGui
 
@@ -41,6 +42,9 @@ class ScaffoldParameterFitterStep(WorkflowStepMountPoint):
         self._aligner_description = None
         self._generator_model_description = None
         self._config['identifier'] = ''
+        self._config['profile_operation'] = ''
+        self._config['profiler'] = 'deterministic'
+        self._config['profile_directory'] = ''
 
     def execute(self):
         """
@@ -51,7 +55,9 @@ class ScaffoldParameterFitterStep(WorkflowStepMountPoint):
         # Put your execute step code here before calling the '_doneExecution' method.
         if self._view is None:
             rigid_aligner_description = self._model_description
+            self._configure_profiling()
             self._model = MasterModel(rigid_aligner_description, rigid_aligner_description.data_is_temporal)
+            self._model.set_output_directory(self._location)
 
             shareable_widget = self._model_description.get_shareable_widget()
             max_time = rigid_aligner_description.get_time_count()
@@ -62,7 +68,14 @@ class ScaffoldParameterFitterStep(WorkflowStepMountPoint):
 
         self._setCurrentWidget(self._view)
 
+    def _configure_profiling(self):
+        operation = self._config.get('profile_operation', '')
+        directory = os.path.join(self._location, self._config.get('profile_directory', '') or 'profiles')
+        MasterModel.set_profiling([operation] if operation else None, directory,
+                                  self._config.get('profiler', 'deterministic'))
+
     def _myDoneExecution(self):
+        MasterModel.set_profiling(None)
         self._model = None
         self._view = None
         self._doneExecution()
@@ -103,7 +116,7 @@ class ScaffoldParameterFitterStep(WorkflowStepMountPoint):
         dlg.setModal(True)
 
         if dlg.exec_():
-            self._config = dlg.getConfig()
+            self._config.update(dlg.getConfig())
 
         self._configured = dlg.validate()
         self._configuredObserver()
@@ -26,6 +26,24 @@ class Ui_ConfigureDialog(object):
         self.lineEdit0 = QtGui.QLineEdit(self.configGroupBox)
         self.lineEdit0.setObjectName("lineEdit0")
         self.formLayout.setWidget(0, QtGui.QFormLayout.FieldRole, self.lineEdit0)
+        self.label1 = QtGui.QLabel(self.configGroupBox)
+        self.label1.setObjectName("label1")
+        self.formLayout.setWidget(1, QtGui.QFormLayout.LabelRole, self.label1)
+        self.comboBox1 = QtGui.QComboBox(self.configGroupBox)
+        self.comboBox1.setObjectName("comboBox1")
+        self.formLayout.setWidget(1, QtGui.QFormLayout.FieldRole, self.comboBox1)
+        self.label2 = QtGui.QLabel(self.configGroupBox)
+        self.label2.setObjectName("label2")
+        self.formLayout.setWidget(2, QtGui.QFormLayout.LabelRole, self.label2)
+        self.comboBox2 = QtGui.QComboBox(self.configGroupBox)
+        self.comboBox2.setObjectName("comboBox2")
+        self.formLayout.setWidget(2, QtGui.QFormLayout.FieldRole, self.comboBox2)
+        self.label3 = QtGui.QLabel(self.configGroupBox)
+        self.label3.setObjectName("label3")
+        self.formLayout.setWidget(3, QtGui.QFormLayout.LabelRole, self.label3)
+        self.lineEdit3 = QtGui.QLineEdit(self.configGroupBox)
+        self.lineEdit3.setObjectName("lineEdit3")
+        self.formLayout.setWidget(3, QtGui.QFormLayout.FieldRole, self.lineEdit3)
         self.gridLayout.addWidget(self.configGroupBox, 0, 0, 1, 1)
         self.buttonBox = QtGui.QDialogButtonBox(ConfigureDialog)
         self.buttonBox.setOrientation(QtCore.Qt.Horizontal)
@@ -41,4 +59,7 @@ class Ui_ConfigureDialog(object):
     def retranslateUi(self, ConfigureDialog):
         ConfigureDialog.setWindowTitle(QtGui.QApplication.translate("ConfigureDialog", "Configure Step", None, QtGui.QApplication.UnicodeUTF8))
         self.label0.setText(QtGui.QApplication.translate("ConfigureDialog", "identifier:  ", None, QtGui.QApplication.UnicodeUTF8))
+        self.label1.setText(QtGui.QApplication.translate("ConfigureDialog", "Profile operation:  ", None, QtGui.QApplication.UnicodeUTF8))
+        self.label2.setText(QtGui.QApplication.translate("ConfigureDialog", "Profiler:  ", None, QtGui.QApplication.UnicodeUTF8))
+        self.label3.setText(QtGui.QApplication.translate("ConfigureDialog", "Profile directory:  ", None, QtGui.QApplication.UnicodeUTF8))
 
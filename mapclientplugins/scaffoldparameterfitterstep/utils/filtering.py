@@ -0,0 +1,45 @@
+import numpy as np
+
+from .spatialindex import SpatialIndex
+
+OUTLIER_METHODS = ('statistical', 'radius')
+
+
+def statistical_outlier_mask(points, k=8, std_ratio=2.0, index=None):
+    """
+    Inlier mask keeping points whose mean distance to their k nearest neighbours is
+    within std_ratio standard deviations of the mean over the whole cloud.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) <= k:
+        return np.ones(len(points), dtype=bool)
+    if index is None:
+        index = SpatialIndex(points)
+    distances, _ = index.query(points, k=k + 1)
+    mean_distances = distances[:, 1:].mean(axis=1)
+    threshold = mean_distances.mean() + std_ratio * mean_distances.std()
+    return mean_distances <= threshold
+
+
+def radius_outlier_mask(points, radius, min_neighbours=4, index=None):
+    """
+    Inlier mask keeping points with at least min_neighbours other points within radius.
+    Clouds too small to have min_neighbours neighbours are kept whole.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) <= min_neighbours:
+        return np.ones(len(points), dtype=bool)
+    if index is None:
+        index = SpatialIndex(points)
+    distances, _ = index.query(points, k=min_neighbours + 1)
+    return distances[:, -1] <= radius
+
+
+def outlier_mask(points, method='statistical', k=8, std_ratio=2.0, radius=None, min_neighbours=4):
+    if method == 'statistical':
+        return statistical_outlier_mask(points, k=k, std_ratio=std_ratio)
+    if method == 'radius':
+        if radius is None:
+            raise ValueError('Radius outlier removal requires a radius.')
+        return radius_outlier_mask(points, radius, min_neighbours=min_neighbours)
+    raise ValueError('Unknown outlier removal method {}, expected one of {}.'.format(method, OUTLIER_METHODS))
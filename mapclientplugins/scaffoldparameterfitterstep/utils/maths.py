@@ -1,50 +1,69 @@
-from math import sqrt, cos, sin, fabs, atan2
+"""
+Vector and matrix helpers. Every function accepts either single vectors and
+matrices as lists, returning lists and floats as before, or numpy arrays holding
+N x 3 vectors and stacks of 3 x 3 matrices, returning arrays so whole parameter
+arrays can be transformed in one call. Dividing lists by zero raises
+ZeroDivisionError as before, while arrays follow numpy and give inf or nan.
+"""
 import numpy as np
 
 
+def _output(result, *inputs):
+    if any(isinstance(value, np.ndarray) for value in inputs):
+        return result
+    if np.ndim(result) == 0:
+        return float(result)
+    return result.tolist()
+
+
 def magnitude(v):
-    return sqrt(sum((v[i] * v[i]) for i in range(len(v))))
+    return _output(np.linalg.norm(np.asarray(v, dtype=np.float64), axis=-1), v)
 
 
 def add(u, v):
-    return [(u[i] + v[i]) for i in range(len(u))]
+    return _output(np.add(u, v, dtype=np.float64), u, v)
 
 
 def sub(u, v):
-    return [(u[i] - v[i]) for i in range(len(u))]
+    return _output(np.subtract(u, v, dtype=np.float64), u, v)
 
 
 def dot(u, v):
-    return sum((u[i] * v[i]) for i in range(len(u)))
+    return _output(np.sum(np.multiply(u, v, dtype=np.float64), axis=-1), u, v)
+
+
+def _check_divisor(divisor, *inputs):
+    if not any(isinstance(value, np.ndarray) for value in inputs) and np.any(np.asarray(divisor) == 0):
+        raise ZeroDivisionError('float division by zero')
 
 
 def eldiv(u, v):
-    return [(u[i] / v[i]) for i in range(len(u))]
+    _check_divisor(v, u, v)
+    return _output(np.true_divide(u, v, dtype=np.float64), u, v)
 
 
 def elmult(u, v):
-    return [(u[i] * v[i]) for i in range(len(u))]
+    return _output(np.multiply(u, v, dtype=np.float64), u, v)
 
 
 def normalize(v):
-    vmag = magnitude(v)
-    return [(val / vmag) for val in v]
+    v_array = np.asarray(v, dtype=np.float64)
+    return _output(v_array / np.linalg.norm(v_array, axis=-1)[..., np.newaxis], v)
 
 
 def cross(u, v):
-    c = [u[1] * v[2] - u[2] * v[1],
-         u[2] * v[0] - u[0] * v[2],
-         u[0] * v[1] - u[1] * v[0]]
-
-    return c
+    return _output(np.cross(np.asarray(u, dtype=np.float64), np.asarray(v, dtype=np.float64)), u, v)
 
 
 def mult(u, c):
-    return [(u[i] * c) for i in range(len(u))]
+    return _output(np.multiply(u, np.asarray(c, dtype=np.float64)[..., np.newaxis] if np.ndim(c) else c,
+                               dtype=np.float64), u, c)
 
 
 def div(u, c):
-    return [(u[i] / c) for i in range(len(u))]
+    _check_divisor(c, u, c)
+    return _output(np.true_divide(u, np.asarray(c, dtype=np.float64)[..., np.newaxis] if np.ndim(c) else c,
+                                  dtype=np.float64), u, c)
 
 
 def rotmx(quaternion):
@@ -52,41 +71,44 @@ def rotmx(quaternion):
     This method takes a quaternion representing a rotation
     and turns it into a rotation matrix.
     """
-    mag_q = magnitude(quaternion)
-    norm_q = div(quaternion, mag_q)
-    qw, qx, qy, qz = norm_q
-    mx = [[qw * qw + qx * qx - qy * qy - qz * qz, 2 * qx * qy - 2 * qw * qz, 2 * qx * qz + 2 * qw * qy],
-          [2 * qx * qy + 2 * qw * qz, qw * qw - qx * qx + qy * qy - qz * qz, 2 * qy * qz - 2 * qw * qx],
-          [2 * qx * qz - 2 * qw * qy, 2 * qy * qz + 2 * qw * qx, qw * qw - qx * qx - qy * qy + qz * qz]]
-    return mx
+    q = np.asarray(quaternion, dtype=np.float64)
+    q = q / np.linalg.norm(q, axis=-1)[..., np.newaxis]
+    qw, qx, qy, qz = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    mx = np.stack([
+        np.stack([qw * qw + qx * qx - qy * qy - qz * qz, 2 * qx * qy - 2 * qw * qz, 2 * qx * qz + 2 * qw * qy], axis=-1),
+        np.stack([2 * qx * qy + 2 * qw * qz, qw * qw - qx * qx + qy * qy - qz * qz, 2 * qy * qz - 2 * qw * qx], axis=-1),
+        np.stack([2 * qx * qz - 2 * qw * qy, 2 * qy * qz + 2 * qw * qx, qw * qw - qx * qx - qy * qy + qz * qz], axis=-1)],
+        axis=-2)
+    return _output(mx, quaternion)
 
 
 def matrixconstantmult(m, c):
     """
     Multiply components of matrix m by constant c
     """
-    return [mult(row_m, c) for row_m in m]
+    c_array = np.asarray(c, dtype=np.float64)
+    return _output(np.multiply(m, c_array[..., np.newaxis, np.newaxis] if c_array.ndim else c_array,
+                               dtype=np.float64), m, c)
 
 
 def matrixvectormult(m, v):
     """
-    Post multiply matrix m by vector v
+    Post multiply matrix m by vector v. Either may be a stack; a single matrix
+    applied to N x 3 vectors transforms them all.
     """
-    return [dot(row_m, v) for row_m in m]
+    return _output(np.einsum('...ij,...j->...i', np.asarray(m, dtype=np.float64), np.asarray(v, dtype=np.float64)),
+                   m, v)
 
 
 def vectormatrixmult(v, m):
     """
     Premultiply matrix m by vector v
     """
-    rows = len(m)
-    if len(v) != rows:
+    m_array = np.asarray(m, dtype=np.float64)
+    v_array = np.asarray(v, dtype=np.float64)
+    if v_array.shape[-1] != m_array.shape[-2]:
         raise ValueError('vectormatmult mismatched rows')
-    columns = len(m[0])
-    result = []
-    for c in range(0, columns):
-        result.append(sum(v[r] * m[r][c] for r in range(rows)))
-    return result
+    return _output(np.einsum('...i,...ij->...j', v_array, m_array), v, m)
 
 
 def matrixmult(a, b):
@@ -94,26 +116,28 @@ def matrixmult(a, b):
     Multiply 2 matrices: first index is down row, second is across column.
     Assumes sizes are compatible (
     """
-    return [vectormatrixmult(row_a, b) for row_a in a]
+    return _output(np.matmul(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)), a, b)
 
 
 def eulerToRotationMatrix3(euler_angles):
     """
     From OpenCMISS-Zinc graphics_library.cpp
     """
-    cos_azimuth = cos(euler_angles[0])
-    sin_azimuth = sin(euler_angles[0])
-    cos_elevation = cos(euler_angles[1])
-    sin_elevation = sin(euler_angles[1])
-    cos_roll = cos(euler_angles[2])
-    sin_roll = sin(euler_angles[2])
-    mat3x3 = [
-        [cos_azimuth * cos_elevation, sin_azimuth * cos_elevation, -sin_elevation],
-        [cos_azimuth * sin_elevation * sin_roll - sin_azimuth * cos_roll,
-         sin_azimuth * sin_elevation * sin_roll + cos_azimuth * cos_roll, cos_elevation * sin_roll],
-        [cos_azimuth * sin_elevation * cos_roll + sin_azimuth * sin_roll,
-         sin_azimuth * sin_elevation * cos_roll - cos_azimuth * sin_roll, cos_elevation * cos_roll]]
-    return mat3x3
+    angles = np.asarray(euler_angles, dtype=np.float64)
+    cos_azimuth = np.cos(angles[..., 0])
+    sin_azimuth = np.sin(angles[..., 0])
+    cos_elevation = np.cos(angles[..., 1])
+    sin_elevation = np.sin(angles[..., 1])
+    cos_roll = np.cos(angles[..., 2])
+    sin_roll = np.sin(angles[..., 2])
+    mat3x3 = np.stack([
+        np.stack([cos_azimuth * cos_elevation, sin_azimuth * cos_elevation, -sin_elevation], axis=-1),
+        np.stack([cos_azimuth * sin_elevation * sin_roll - sin_azimuth * cos_roll,
+                  sin_azimuth * sin_elevation * sin_roll + cos_azimuth * cos_roll, cos_elevation * sin_roll], axis=-1),
+        np.stack([cos_azimuth * sin_elevation * cos_roll + sin_azimuth * sin_roll,
+                  sin_azimuth * sin_elevation * cos_roll - cos_azimuth * sin_roll, cos_elevation * cos_roll], axis=-1)],
+        axis=-2)
+    return _output(mat3x3, euler_angles)
 
 
 def rotationMatrix3ToEuler(matrix):
@@ -121,36 +145,95 @@ def rotationMatrix3ToEuler(matrix):
     From OpenCMISS-Zinc graphics_library.cpp
     """
     MATRIX_TO_EULER_TOLERANCE = 1.0E-12
-    euler_angles = [0.0, 0.0, 0.0]
-    if (fabs(matrix[0][0]) > MATRIX_TO_EULER_TOLERANCE) and (fabs(matrix[0][1]) > MATRIX_TO_EULER_TOLERANCE):
-        euler_angles[0] = atan2(matrix[0][1], matrix[0][0])
-        euler_angles[2] = atan2(matrix[1][2], matrix[2][2])
-        euler_angles[1] = atan2(-matrix[0][2], matrix[0][0] / cos(euler_angles[0]))
-    elif fabs(matrix[0][0]) > MATRIX_TO_EULER_TOLERANCE:
-        euler_angles[0] = atan2(matrix[0][1], matrix[0][0])
-        euler_angles[2] = atan2(matrix[1][2], matrix[2][2])
-        euler_angles[1] = atan2(-matrix[0][2], matrix[0][0] / cos(euler_angles[0]))
-    elif fabs(matrix[0][1]) > MATRIX_TO_EULER_TOLERANCE:
-        euler_angles[0] = atan2(matrix[0][1], matrix[0][0])
-        euler_angles[2] = atan2(matrix[1][2], matrix[2][2])
-        euler_angles[1] = atan2(-matrix[0][2], matrix[0][1] / sin(euler_angles[0]))
-    else:
-        euler_angles[1] = atan2(-matrix[0][2], 0)  # get +/-1
-        euler_angles[0] = 0
-        euler_angles[2] = atan2(-matrix[2][1], -matrix[2][0] * matrix[0][2])
-    return euler_angles
+    m = np.asarray(matrix, dtype=np.float64)
+    m00, m01, m02 = m[..., 0, 0], m[..., 0, 1], m[..., 0, 2]
+    cos_branch = np.abs(m00) > MATRIX_TO_EULER_TOLERANCE
+    sin_branch = ~cos_branch & (np.abs(m01) > MATRIX_TO_EULER_TOLERANCE)
+    general = cos_branch | sin_branch
+    azimuth = np.arctan2(m01, m00)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        elevation = np.where(cos_branch, np.arctan2(-m02, m00 / np.cos(azimuth)),
+                             np.where(sin_branch, np.arctan2(-m02, m01 / np.sin(azimuth)), np.arctan2(-m02, 0.0)))
+    roll = np.where(general, np.arctan2(m[..., 1, 2], m[..., 2, 2]),
+                    np.arctan2(-m[..., 2, 1], -m[..., 2, 0] * m02))
+    euler_angles = np.stack([np.where(general, azimuth, 0.0), elevation, roll], axis=-1)
+    return _output(euler_angles, matrix)
 
 
 def axisAngleToQuaternion(axis, angle):
-    return [cos(angle / 2), axis[0] * sin(angle / 2), axis[1] * sin(angle / 2), axis[2] * sin(angle / 2)]
+    axis_array = np.asarray(axis, dtype=np.float64)
+    half_angle = np.asarray(angle, dtype=np.float64) / 2
+    quaternion = np.concatenate([np.cos(half_angle)[..., np.newaxis],
+                                 axis_array * np.sin(half_angle)[..., np.newaxis]], axis=-1)
+    return _output(quaternion, axis, angle)
+
+
+def axisAngleToMatrix(axis, angle):
+    return rotmx(axisAngleToQuaternion(normalize(axis), angle))
+
+
+def matrixToQuaternion(matrix):
+    """
+    Unit quaternion [w, x, y, z] with w >= 0 for each rotation matrix, the inverse of
+    rotmx. Closed form (Shepperd's method): the largest of the four squared components
+    is taken from the diagonal and the rest from the off-diagonal sums and differences,
+    so it stays accurate for all angles including half turns.
+    """
+    m = np.asarray(matrix, dtype=np.float64)
+    m00, m01, m02 = m[..., 0, 0], m[..., 0, 1], m[..., 0, 2]
+    m10, m11, m12 = m[..., 1, 0], m[..., 1, 1], m[..., 1, 2]
+    m20, m21, m22 = m[..., 2, 0], m[..., 2, 1], m[..., 2, 2]
+    # rows are 4 * the quaternion times its w, x, y or z component respectively
+    candidates = np.stack([
+        np.stack([1.0 + m00 + m11 + m22, m21 - m12, m02 - m20, m10 - m01], axis=-1),
+        np.stack([m21 - m12, 1.0 + m00 - m11 - m22, m01 + m10, m02 + m20], axis=-1),
+        np.stack([m02 - m20, m01 + m10, 1.0 - m00 + m11 - m22, m12 + m21], axis=-1),
+        np.stack([m10 - m01, m02 + m20, m12 + m21, 1.0 - m00 - m11 + m22], axis=-1)], axis=-2)
+    best = np.argmax(np.diagonal(candidates, axis1=-2, axis2=-1), axis=-1)
+    quaternion = np.take_along_axis(candidates, best[..., np.newaxis, np.newaxis], axis=-2)[..., 0, :]
+    quaternion = quaternion / np.linalg.norm(quaternion, axis=-1)[..., np.newaxis]
+    quaternion = quaternion * np.where(quaternion[..., 0] < 0.0, -1.0, 1.0)[..., np.newaxis]
+    return _output(quaternion, matrix)
+
+
+def quaternionToAxisAngle(quaternion):
+    """
+    Unit rotation axis and angle in [0, pi] for each quaternion. The axis of a zero
+    rotation is reported as [0, 0, 1].
+    """
+    q = np.asarray(quaternion, dtype=np.float64)
+    q = q * np.where(q[..., 0] < 0.0, -1.0, 1.0)[..., np.newaxis]
+    vector_magnitude = np.linalg.norm(q[..., 1:], axis=-1)
+    angle = 2.0 * np.arctan2(vector_magnitude, q[..., 0])
+    zero = vector_magnitude == 0.0
+    axis = q[..., 1:] / np.where(zero, 1.0, vector_magnitude)[..., np.newaxis]
+    axis[zero] = [0.0, 0.0, 1.0]
+    return _output(axis, quaternion), _output(angle, quaternion)
+
+
+def matrixToAxisAngle(matrix):
+    """
+    Unit rotation axis and angle in [0, pi] for each rotation matrix, in closed form.
+    """
+    axis, angle = quaternionToAxisAngle(matrixToQuaternion(np.asarray(matrix, dtype=np.float64)))
+    return _output(axis, matrix), _output(angle, matrix)
+
+
+def eulerToQuaternion(euler_angles):
+    return _output(matrixToQuaternion(eulerToRotationMatrix3(np.asarray(euler_angles, dtype=np.float64))),
+                   euler_angles)
+
+
+def quaternionToEuler(quaternion):
+    return _output(rotationMatrix3ToEuler(rotmx(np.asarray(quaternion, dtype=np.float64))), quaternion)
 
 
 def directionFromMatrix(matrix):
-    R = np.array(matrix, dtype=np.float64, copy=False)
-    w, W = np.linalg.eig(R.T)
-    i = np.where(abs(np.real(w) - 1.0) < 1e-8)[0]
-    direction = np.real(W[:, i[-1]]).squeeze()
-    return direction
+    """
+    Unit direction left unchanged by each rotation matrix, i.e. its rotation axis.
+    """
+    axis, _ = matrixToAxisAngle(np.asarray(matrix, dtype=np.float64))
+    return axis
 
 
 if __name__ == '__main__':
@@ -0,0 +1,221 @@
+"""
+Memory usage around the top-level model operations, and any nested operations named
+in enable, off by default.
+
+Each call of an operation decorated with tracing.traced records the Python heap
+allocated and its peak during the call, using tracemalloc, and the Zinc regions and
+fields alive afterwards. An operation is flagged as growing when one of these keeps
+increasing over its last few calls, which for repeated identical operations, e.g.
+candidate mesh evaluations, points to a leak.
+
+Zinc cannot enumerate the regions of a context, so live regions are counted from the
+Python handles passed to track_region, with their child regions. A region Zinc keeps
+alive after its last handle is dropped is not counted; its memory still shows in the
+process, though not in the tracemalloc heap, which only covers Python allocations.
+Nesting is tracked per thread, but tracemalloc is process wide, so heap figures of
+operations overlapping in other threads include each other's allocations.
+"""
+import gc
+import threading
+import weakref
+
+from . import tracing
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+# Calls an operation must grow over, and the heap growth per call that counts.
+_GROWTH_CALLS = 3
+_HEAP_TOLERANCE = 64 * 1024
+
+_enabled = False
+_started_tracemalloc = False
+_top = 10
+_local = threading.local()
+_nested_operations = set()
+_lock = threading.Lock()
+_regions = weakref.WeakSet()
+_operations = {}
+_top_allocations = {}
+
+
+def enable(top=10, operations=()):
+    """
+    Start recording, listing the top source lines of heap growth per call. The named
+    operations, e.g. 'ScaffoldModel.generate_temp_mesh', are also recorded when nested.
+    """
+    global _enabled, _started_tracemalloc, _top
+    if tracemalloc is None:
+        print('memory.enable: tracemalloc is not available, recording Zinc regions and fields only')
+    elif not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+    _top = top
+    _nested_operations.clear()
+    _nested_operations.update(operations)
+    _enabled = True
+    tracing.set_hook_enabled(_MEMORY_HOOK, True)
+
+
+def disable():
+    global _enabled, _started_tracemalloc
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+    _enabled = False
+    tracing.set_hook_enabled(_MEMORY_HOOK, False)
+
+
+def is_enabled():
+    return _enabled
+
+
+def _peaks():
+    """
+    Per thread, the highest traced memory seen so far by each measured call in progress,
+    innermost last, as nested calls reset the tracemalloc peak.
+    """
+    if not hasattr(_local, 'peaks'):
+        _local.peaks = []
+    return _local.peaks
+
+
+def is_measuring(name):
+    return _enabled and ((not _peaks()) or (name in _nested_operations))
+
+
+def reset():
+    with _lock:
+        _operations.clear()
+        _top_allocations.clear()
+
+
+def track_region(region):
+    """
+    Count region, and its child regions, as live for as long as its handle is referenced.
+    Only a weak reference is kept, so the caller must hold on to the handle; a temporary
+    one, e.g. track_region(context.getDefaultRegion()), is dropped at once.
+    """
+    _regions.add(region)
+
+
+def count_zinc_objects():
+    """
+    Live regions and the fields defined in them, as {'regions': count, 'fields': count}.
+    """
+    counts = {'regions': 0, 'fields': 0}
+    for region in list(_regions):
+        _count_region(region, counts)
+    return counts
+
+
+def _count_region(region, counts):
+    counts['regions'] += 1
+    field_iterator = region.getFieldmodule().createFielditerator()
+    field = field_iterator.next()
+    while field.isValid():
+        counts['fields'] += 1
+        field = field_iterator.next()
+    child = region.getFirstChild()
+    while child.isValid():
+        _count_region(child, counts)
+        child = child.getNextSibling()
+
+
+def _heap_size():
+    if tracemalloc is None:
+        return 0
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def _take_snapshot():
+    if (tracemalloc is None) or not _top:
+        return None
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+class _MemoryHook(tracing.OperationHook):
+
+    def is_active(self, name):
+        return is_measuring(name)
+
+    def around(self, name, call):
+        return measure_call(name, call)
+
+
+_MEMORY_HOOK = _MemoryHook()
+tracing.register_hook(_MEMORY_HOOK, tracing.MEMORY_PRIORITY, enabled=False)
+
+
+def _traced_peak():
+    return tracemalloc.get_traced_memory()[1] if tracemalloc is not None else 0
+
+
+def measure_call(name, call):
+    peaks = _peaks()
+    snapshot_before = _take_snapshot()
+    heap_before = _heap_size()
+    if peaks:
+        peaks[-1] = max(peaks[-1], _traced_peak())
+    if hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+    peaks.append(0)
+    try:
+        return call()
+    finally:
+        peak = max(peaks.pop(), _traced_peak())
+        if peaks:
+            peaks[-1] = max(peaks[-1], peak)
+        heap_after = _heap_size()
+        top_allocations = None
+        if snapshot_before is not None:
+            differences = _take_snapshot().compare_to(snapshot_before, 'lineno')[:_top]
+            top_allocations = [str(difference) for difference in differences]
+        sample = {'heap': heap_after, 'allocated': heap_after - heap_before,
+                  'peak': max(peak - heap_before, 0)}
+        sample.update(count_zinc_objects())
+        with _lock:
+            _operations.setdefault(name, []).append(sample)
+            if top_allocations is not None:
+                _top_allocations[name] = top_allocations
+
+
+def _growing(samples):
+    """
+    Quantities that increased on every one of the last _GROWTH_CALLS calls.
+    """
+    if len(samples) <= _GROWTH_CALLS:
+        return []
+    recent = samples[-_GROWTH_CALLS - 1:]
+    growing = []
+    for quantity, tolerance in (('regions', 0), ('fields', 0), ('heap', _HEAP_TOLERANCE)):
+        if all(later[quantity] - earlier[quantity] > tolerance for earlier, later in zip(recent, recent[1:])):
+            growing.append(quantity)
+    return growing
+
+
+def report():
+    """
+    Per operation: the number of calls, the heap allocated per call and its maximum peak
+    in bytes, the live regions and fields after each call, the top allocations of the
+    last call and the quantities growing across calls. Also the live regions and fields now.
+    """
+    with _lock:
+        operations = dict((name, list(samples)) for name, samples in _operations.items())
+        top_allocations = dict(_top_allocations)
+    summary = {}
+    for name, samples in operations.items():
+        summary[name] = {
+            'calls': len(samples),
+            'allocated': [sample['allocated'] for sample in samples],
+            'peak': max(sample['peak'] for sample in samples),
+            'regions': [sample['regions'] for sample in samples],
+            'fields': [sample['fields'] for sample in samples],
+            'top_allocations': top_allocations.get(name, []),
+            'growing': _growing(samples),
+        }
+    return {'operations': summary, 'live': count_zinc_objects(),
+            'growing': sorted(name for name, entry in summary.items() if entry['growing'])}
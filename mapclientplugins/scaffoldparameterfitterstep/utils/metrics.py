@@ -0,0 +1,135 @@
+"""
+Counters of Zinc API calls and related work, attributed to the top-level operation
+running at the time, e.g. MasterModel.rotate_scaffold. Operations are the functions
+decorated with tracing.traced. Off by default, when increment costs a single flag check.
+
+Counters in use:
+    getNodeParameters, setNodeParameters, evaluateReal: Zinc calls
+    fieldcaches_created, fields_created, fields_destroyed
+    nodes_visited, elements_visited
+    bytes_read, bytes_written: by imports and exports
+"""
+import json
+import os
+import threading
+
+from . import tracing
+
+_OTHER_OPERATION = 'other'
+
+_enabled = False
+_counters = {}
+_lock = threading.Lock()
+_local = threading.local()
+_dump_timer = None
+
+
+def enable():
+    global _enabled
+    _enabled = True
+    tracing.set_hook_enabled(_OPERATION_HOOK, True)
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    tracing.set_hook_enabled(_OPERATION_HOOK, False)
+
+
+def is_enabled():
+    return _enabled
+
+
+def _stack():
+    if not hasattr(_local, 'operations'):
+        _local.operations = []
+    return _local.operations
+
+
+def begin_operation(name):
+    _stack().append(name)
+
+
+def end_operation():
+    _stack().pop()
+
+
+class _OperationHook(tracing.OperationHook):
+
+    def is_active(self, name):
+        return _enabled
+
+    def around(self, name, call):
+        begin_operation(name)
+        try:
+            return call()
+        finally:
+            end_operation()
+
+
+_OPERATION_HOOK = _OperationHook()
+tracing.register_hook(_OPERATION_HOOK, tracing.METRICS_PRIORITY, enabled=False)
+
+
+def increment(counter, amount=1):
+    if not _enabled:
+        return
+    operations = _stack()
+    operation = operations[0] if operations else _OTHER_OPERATION
+    with _lock:
+        counters = _counters.setdefault(operation, {})
+        counters[counter] = counters.get(counter, 0) + amount
+
+
+def count_file_written(filename):
+    if _enabled and os.path.isfile(filename):
+        increment('bytes_written', os.path.getsize(filename))
+
+
+def snapshot():
+    """
+    Copy of the counters as {'operations': {operation: {counter: count}}, 'totals': {counter: count}}.
+    """
+    with _lock:
+        operations = dict((operation, dict(counters)) for operation, counters in _counters.items())
+    totals = {}
+    for counters in operations.values():
+        for counter, count in counters.items():
+            totals[counter] = totals.get(counter, 0) + count
+    return {'operations': operations, 'totals': totals}
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+
+
+def dump(filename):
+    with open(filename, 'w') as stream:
+        json.dump(snapshot(), stream, indent=4, sort_keys=True)
+
+
+def start_periodic_dump(filename, interval=10.0):
+    """
+    Write a snapshot to filename every interval seconds until stop_periodic_dump.
+    """
+    global _dump_timer
+    stop_periodic_dump()
+
+    def _dump_and_reschedule():
+        global _dump_timer
+        dump(filename)
+        _dump_timer = threading.Timer(interval, _dump_and_reschedule)
+        _dump_timer.daemon = True
+        _dump_timer.start()
+
+    _dump_timer = threading.Timer(interval, _dump_and_reschedule)
+    _dump_timer.daemon = True
+    _dump_timer.start()
+
+
+def stop_periodic_dump():
+    global _dump_timer
+    if _dump_timer is not None:
+        _dump_timer.cancel()
+        _dump_timer = None
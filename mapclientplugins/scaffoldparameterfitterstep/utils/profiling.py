@@ -0,0 +1,163 @@
+"""
+On-demand profiling of chosen operations, named as for tracing.traced, e.g.
+'MasterModel.scale_scaffold' or 'DataModel.initialise_data'.
+
+Each profiled call saves a timestamped profile together with a condensed summary of the
+top functions. The deterministic profiler is cProfile; the sampling profiler uses
+pyinstrument when it is installed.
+"""
+import cProfile
+import os
+import pstats
+import time
+from timeit import default_timer
+
+from . import tracing
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:
+    SamplingProfiler = None
+
+PROFILERS = ('deterministic', 'sampling')
+
+_operations = set()
+_directory = '.'
+_profiler = 'deterministic'
+_top = 20
+_active = False
+_reports = []
+
+
+def configure(operations, directory='.', profiler='deterministic', top=20):
+    """
+    Profile every call of the named operations from now on, writing into directory.
+    """
+    global _directory, _profiler, _top
+    if profiler not in PROFILERS:
+        raise ValueError('Unknown profiler {}, expected one of {}.'.format(profiler, PROFILERS))
+    if (profiler == 'sampling') and (SamplingProfiler is None):
+        print('profiling.configure: pyinstrument is not installed, using the deterministic profiler')
+        profiler = 'deterministic'
+    _operations.clear()
+    _operations.update(operations)
+    del _reports[:]
+    _directory = directory
+    _profiler = profiler
+    _top = top
+    tracing.set_hook_enabled(_PROFILING_HOOK, bool(_operations))
+
+
+def disable():
+    _operations.clear()
+    tracing.set_hook_enabled(_PROFILING_HOOK, False)
+
+
+def is_profiling(name):
+    return (name in _operations) and not _active
+
+
+def get_reports():
+    """
+    Dicts of the operation, time in seconds and profile and summary files of each profiled call.
+    """
+    return list(_reports)
+
+
+class _ProfilingHook(tracing.OperationHook):
+
+    def is_active(self, name):
+        return is_profiling(name)
+
+    def around(self, name, call):
+        return profile_call(name, call)
+
+
+_PROFILING_HOOK = _ProfilingHook()
+tracing.register_hook(_PROFILING_HOOK, tracing.PROFILING_PRIORITY, enabled=False)
+
+
+def profile_call(name, call):
+    global _active
+    if not os.path.isdir(_directory):
+        os.makedirs(_directory)
+    stem = os.path.join(_directory, '{}_{}_{}'.format(name.replace('.', '_'), time.strftime('%Y%m%d-%H%M%S'),
+                                                      len(_reports)))
+    _active = True
+    start = default_timer()
+    try:
+        if _profiler == 'sampling':
+            profiler = SamplingProfiler()
+            profiler.start()
+            try:
+                result = call()
+            finally:
+                profiler.stop()
+            profile_file = stem + '.html'
+            with open(profile_file, 'w') as stream:
+                stream.write(profiler.output_html())
+            summary = _summarise_session(profiler.last_session, _top)
+        else:
+            profiler = cProfile.Profile()
+            try:
+                result = profiler.runcall(call)
+            finally:
+                profile_file = stem + '.prof'
+                profiler.dump_stats(profile_file)
+            summary = _summarise_stats(profile_file, _top)
+    finally:
+        _active = False
+    summary_file = stem + '_summary.txt'
+    with open(summary_file, 'w') as stream:
+        stream.write(summary)
+    _reports.append({'operation': name, 'time': default_timer() - start, 'profile': profile_file,
+                     'summary': summary_file})
+    return result
+
+
+def _summarise_session(session, top):
+    """
+    The top functions of a pyinstrument session by cumulative time, counted once per
+    sampled stack so recursion is not double counted.
+    """
+    lines = ['{:>12}{:>12}  {}'.format('own (s)', 'cumul. (s)', 'function')]
+    root = session.root_frame() if session is not None else None
+    totals = {}
+    frames = [(root, frozenset())] if root is not None else []
+    while frames:
+        frame, ancestors = frames.pop()
+        frames.extend((child, ancestors | frozenset([_frame_key(frame)])) for child in frame.children)
+        if getattr(frame, 'is_synthetic', False):
+            continue
+        key = _frame_key(frame)
+        own_time, cumulative_time = totals.get(key, (0.0, 0.0))
+        frame_own_time, frame_time = _frame_times(frame)
+        totals[key] = (own_time + frame_own_time, cumulative_time + (0.0 if key in ancestors else frame_time))
+    entries = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)[:top]
+    for (function, filename, line), (own_time, cumulative_time) in entries:
+        lines.append('{:>12.4f}{:>12.4f}  {} ({}:{})'.format(
+            own_time, cumulative_time, function, os.path.basename(filename or ''), line))
+    return '\n'.join(lines) + '\n'
+
+
+def _frame_key(frame):
+    return frame.function, frame.file_path_short, frame.line_no
+
+
+def _frame_times(frame):
+    """
+    Own and cumulative time of a pyinstrument frame, whose attributes differ between versions.
+    """
+    frame_time = frame.time() if callable(frame.time) else frame.time
+    own_time = frame.total_self_time if hasattr(frame, 'total_self_time') else frame.self_time
+    return own_time, frame_time
+
+
+def _summarise_stats(profile_file, top):
+    lines = ['{:>10}{:>12}{:>12}  {}'.format('calls', 'own (s)', 'cumul. (s)', 'function')]
+    stats = pstats.Stats(profile_file)
+    entries = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    for (filename, line, function), (_, calls, total_time, cumulative_time, _) in entries:
+        lines.append('{:>10}{:>12.4f}{:>12.4f}  {} ({}:{})'.format(
+            calls, total_time, cumulative_time, function, os.path.basename(filename), line))
+    return '\n'.join(lines) + '\n'
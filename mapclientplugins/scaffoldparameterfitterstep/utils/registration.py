@@ -0,0 +1,207 @@
+from collections import namedtuple
+from itertools import permutations, product
+from timeit import default_timer
+
+import numpy as np
+
+from .spatialindex import SpatialIndex
+
+Alignment = namedtuple('Alignment', ['rotation', 'translation', 'scale', 'error', 'iterations'])
+
+# The 24 signed permutation matrices that are proper rotations.
+_AXIS_CANDIDATES = [np.diag(signs)[list(order)] for order in permutations(range(3))
+                    for signs in product((1.0, -1.0), repeat=3)]
+_AXIS_CANDIDATES = [candidate for candidate in _AXIS_CANDIDATES if np.linalg.det(candidate) > 0.0]
+
+
+def apply_transform(points, rotation, translation, scale=1.0):
+    """
+    Map N x 3 points through x' = scale * rotation * x + translation.
+    """
+    return scale * np.dot(points, np.asarray(rotation).T) + translation
+
+
+def similarity_transform(source, target, with_scale=True):
+    """
+    Closed-form least squares rotation, translation and optional uniform scale
+    mapping corresponding source points onto target points (Umeyama, 1991).
+    """
+    source = np.asarray(source, dtype=np.float64)
+    target = np.asarray(target, dtype=np.float64)
+    source_centroid = source.mean(axis=0)
+    target_centroid = target.mean(axis=0)
+    source_centred = source - source_centroid
+    target_centred = target - target_centroid
+    covariance = np.dot(target_centred.T, source_centred) / len(source)
+    u, d, vt = np.linalg.svd(covariance)
+    reflection = np.ones(len(d))
+    if np.linalg.det(u) * np.linalg.det(vt) < 0.0:
+        reflection[-1] = -1.0
+    rotation = np.dot(u * reflection, vt)
+    scale = 1.0
+    if with_scale:
+        source_variance = np.sum(source_centred * source_centred) / len(source)
+        if source_variance > 0.0:
+            scale = np.sum(d * reflection) / source_variance
+    translation = target_centroid - scale * np.dot(rotation, source_centroid)
+    return rotation, translation, scale
+
+
+def icp(source, target, with_scale=False, max_iterations=50, tolerance=1.0e-6, inlier_fraction=1.0,
+        target_index=None, rotation=None, translation=None, scale=1.0):
+    """
+    Iterative closest point alignment of source points onto the target cloud.
+
+    :param source: N x 3 points to move, e.g. scaffold surface samples.
+    :param target: M x 3 fixed points, e.g. the data cloud.
+    :param with_scale: Also estimate a uniform scale.
+    :param tolerance: Stop when the relative change in RMS error falls below this.
+    :param inlier_fraction: Fraction of closest pairs kept each iteration (trimmed ICP).
+    :param target_index: Optional prebuilt SpatialIndex over target.
+    :param rotation, translation, scale: Optional initial transform.
+    :return: Alignment mapping the original source points onto target.
+    """
+    source = np.asarray(source, dtype=np.float64)
+    if target_index is None:
+        target_index = SpatialIndex(target)
+    target = target_index.get_points()
+    rotation = np.identity(3) if rotation is None else np.asarray(rotation, dtype=np.float64)
+    translation = np.zeros(3) if translation is None else np.asarray(translation, dtype=np.float64)
+    inlier_count = max(3, int(round(inlier_fraction * len(source))))
+
+    inliers, matches, error = _match(source, target_index, rotation, translation, scale, inlier_count)
+    iterations = 0
+    while iterations < max_iterations:
+        iterations += 1
+        if with_scale:
+            rotation, translation, scale = similarity_transform(source[inliers], target[matches], with_scale=True)
+        else:
+            rotation, translation, _ = similarity_transform(scale * source[inliers], target[matches],
+                                                            with_scale=False)
+        previous_error = error
+        inliers, matches, error = _match(source, target_index, rotation, translation, scale, inlier_count)
+        if abs(previous_error - error) <= tolerance * max(previous_error, 1.0e-30):
+            break
+    return Alignment(rotation, translation, scale, error, iterations)
+
+
+def _match(source, target_index, rotation, translation, scale, inlier_count):
+    """
+    Closest target point for each moved source point, keeping the inlier_count
+    closest pairs. Returns (source inliers, matched target indices, RMS error).
+    """
+    distances, indices = target_index.query(apply_transform(source, rotation, translation, scale))
+    if inlier_count < len(source):
+        inliers = np.argpartition(distances, inlier_count - 1)[:inlier_count]
+    else:
+        inliers = np.arange(len(source))
+    return inliers, indices[inliers], np.sqrt(np.mean(distances[inliers] ** 2))
+
+
+def voxel_downsample(points, voxel_size):
+    """
+    Replace the points falling in each cubic voxel of edge voxel_size by their centroid.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if voxel_size <= 0.0 or len(points) == 0:
+        return points
+    keys = np.floor((points - points.min(axis=0)) / voxel_size).astype(np.int64)
+    _, inverse, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+    centroids = np.zeros((len(counts), points.shape[1]))
+    np.add.at(centroids, inverse, points)
+    return centroids / counts[:, np.newaxis]
+
+
+def build_pyramid(points, levels=3, coarsest_divisions=16):
+    """
+    Resolution pyramid of a point cloud ordered coarse to fine. The coarsest level
+    uses voxels of 1/coarsest_divisions of the bounding box diagonal, halving at each
+    level, and the finest level is the full resolution cloud.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    diagonal = np.linalg.norm(points.max(axis=0) - points.min(axis=0)) if len(points) else 0.0
+    pyramid = []
+    for level in range(levels - 1):
+        voxel_size = diagonal / (coarsest_divisions * 2 ** level)
+        pyramid.append(voxel_downsample(points, voxel_size))
+    pyramid.append(points)
+    return pyramid
+
+
+def icp_pyramid(source, target, levels=3, with_scale=False, coarse_tolerance=1.0e-3, tolerance=1.0e-6,
+                max_iterations=50, final_iterations=10, inlier_fraction=1.0, coarsest_divisions=16):
+    """
+    Coarse-to-fine ICP: converge on voxel-downsampled source and target first and
+    spend at most final_iterations at full resolution.
+    Returns (alignment, level_reports) where each report records the level's point
+    counts, iterations, RMS error and time in seconds.
+    """
+    source_pyramid = build_pyramid(source, levels, coarsest_divisions)
+    target_pyramid = build_pyramid(target, levels, coarsest_divisions)
+    rotation = translation = None
+    scale = 1.0
+    alignment = None
+    level_reports = []
+    for level in range(levels):
+        finest = (level == levels - 1)
+        start = default_timer()
+        alignment = icp(source_pyramid[level], target_pyramid[level], with_scale=with_scale,
+                        max_iterations=final_iterations if finest else max_iterations,
+                        tolerance=tolerance if finest else coarse_tolerance,
+                        inlier_fraction=inlier_fraction, rotation=rotation, translation=translation, scale=scale)
+        rotation, translation, scale = alignment.rotation, alignment.translation, alignment.scale
+        level_reports.append({
+            'level': level,
+            'source_points': len(source_pyramid[level]),
+            'target_points': len(target_pyramid[level]),
+            'iterations': alignment.iterations,
+            'error': float(alignment.error),
+            'time': default_timer() - start,
+        })
+    return alignment, level_reports
+
+
+def principal_axes(points):
+    """
+    Centroid, principal axes as columns ordered by decreasing variance, and the variances.
+    The axes form a right-handed basis, i.e. a proper rotation.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    centroid = points.mean(axis=0)
+    centred = points - centroid
+    variances, axes = np.linalg.eigh(np.dot(centred.T, centred) / len(points))
+    order = np.argsort(variances)[::-1]
+    axes = axes[:, order]
+    if np.linalg.det(axes) < 0.0:
+        axes[:, -1] = -axes[:, -1]
+    return centroid, axes, variances[order]
+
+
+def principal_axes_alignment(source, target, with_scale=False, sample_count=500, target_index=None):
+    """
+    One-shot initial alignment matching the principal axes and centroids of source
+    onto those of target. The axis sign and permutation ambiguity is resolved by
+    scoring all proper signed permutations on the RMS closest point distance of
+    up to sample_count source points. As both sets of axes are right-handed, every
+    candidate is a proper rotation and never mirrors the source.
+    """
+    source = np.asarray(source, dtype=np.float64)
+    if target_index is None:
+        target_index = SpatialIndex(target)
+    source_centroid, source_axes, source_variances = principal_axes(source)
+    target_centroid, target_axes, target_variances = principal_axes(target_index.get_points())
+    scale = 1.0
+    if with_scale and np.sum(source_variances) > 0.0:
+        scale = np.sqrt(np.sum(target_variances) / np.sum(source_variances))
+
+    step = max(1, len(source) // sample_count)
+    samples = source[::step] - source_centroid
+    rotations = np.array([np.dot(np.dot(target_axes, candidate), source_axes.T) for candidate in _AXIS_CANDIDATES])
+    moved = scale * np.einsum('cij,nj->cni', rotations, samples) + target_centroid
+    distances, _ = target_index.query(moved.reshape((-1, 3)))
+    errors = np.sqrt(np.mean(distances.reshape((len(rotations), -1)) ** 2, axis=1))
+    best = int(np.argmin(errors))
+    rotation = rotations[best]
+    translation = target_centroid - scale * np.dot(rotation, source_centroid)
+    return Alignment(rotation, translation, scale, errors[best], len(rotations))
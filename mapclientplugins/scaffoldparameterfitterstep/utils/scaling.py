@@ -0,0 +1,139 @@
+import numpy as np
+
+SCALE_METHODS = ('moments', 'percentile')
+
+_DEGENERATE_EXTENT = 1.0e-6
+
+
+def moment_extents(points):
+    """
+    Standard deviations along the principal axes, largest first.
+    """
+    return batched_moment_extents([points])[0]
+
+
+def batched_moment_extents(points_list):
+    """
+    Principal standard deviations of several point clouds in one pass.
+    Returns an array of shape (number of clouds, 3), NaN for empty clouds.
+    """
+    counts = np.array([len(points) for points in points_list])
+    extents = np.full((len(points_list), 3), np.nan)
+    present = np.nonzero(counts)[0]
+    if len(present) == 0:
+        return extents
+    points = np.concatenate([np.asarray(points_list[index], dtype=np.float64) for index in present])
+    points = points - points.mean(axis=0)
+    offsets = np.concatenate(([0], np.cumsum(counts[present])[:-1]))
+    sums = np.add.reduceat(points, offsets, axis=0)
+    products = np.add.reduceat(points[:, :, np.newaxis] * points[:, np.newaxis, :], offsets, axis=0)
+    means = sums / counts[present][:, np.newaxis]
+    covariances = products / counts[present][:, np.newaxis, np.newaxis] - \
+        means[:, :, np.newaxis] * means[:, np.newaxis, :]
+    variances = np.linalg.eigvalsh(covariances)[:, ::-1]
+    extents[present] = np.sqrt(np.maximum(variances, 0.0))
+    return extents
+
+
+def percentile_extents(points, trim=0.02):
+    """
+    Per-axis extent between the trim and 1 - trim quantiles, ignoring stray points.
+    """
+    return batched_percentile_extents([points], trim)[0]
+
+
+def batched_percentile_extents(points_list, trim=0.02):
+    """
+    Trimmed per-axis extents of several point clouds in one pass, sorting the concatenated
+    clouds once per axis by cloud then coordinate. Quantiles interpolate linearly as
+    np.percentile does. Returns an array of shape (number of clouds, 3), NaN for empty clouds.
+    """
+    counts = np.array([len(points) for points in points_list])
+    extents = np.full((len(points_list), 3), np.nan)
+    present = np.nonzero(counts)[0]
+    if len(present) == 0:
+        return extents
+    points = np.concatenate([np.asarray(points_list[index], dtype=np.float64) for index in present])
+    counts = counts[present]
+    clouds = np.repeat(np.arange(len(present)), counts)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    ordered = np.column_stack([points[np.lexsort((points[:, axis], clouds)), axis] for axis in range(3)])
+
+    def quantile(fraction):
+        position = fraction * (counts - 1)
+        below = np.floor(position).astype(np.int64)
+        above = np.minimum(below + 1, counts - 1)
+        weight = (position - below)[:, np.newaxis]
+        return (1.0 - weight) * ordered[offsets + below] + weight * ordered[offsets + above]
+
+    extents[present] = quantile(1.0 - trim) - quantile(trim)
+    return extents
+
+
+def scale_ratios(scaffold_extents, data_extents):
+    """
+    Scaffold to data extent ratios, NaN along axes where the data is degenerate.
+    """
+    scaffold_extents = np.asarray(scaffold_extents, dtype=np.float64)
+    data_extents = np.asarray(data_extents, dtype=np.float64)
+    largest = np.fmax.reduce(data_extents, axis=-1)[..., np.newaxis]
+    degenerate = ~(data_extents > _DEGENERATE_EXTENT * largest)
+    ratios = scaffold_extents / np.where(degenerate, 1.0, data_extents)
+    ratios[degenerate] = np.nan
+    return ratios
+
+
+def range_ratios(scaffold_ranges, data_ranges, correction_factor=None):
+    """
+    Scaffold to data bounding range ratios per axis, the data ranges first divided by
+    correction_factor if given. Axes along which the data is flat, e.g. the normal of a
+    planar slice, give 1.0 so they are left out of the scale.
+    """
+    scaffold_ranges = np.asarray(scaffold_ranges, dtype=np.float64)
+    data_ranges = np.asarray(data_ranges, dtype=np.float64)
+    flat = data_ranges == 0.0
+    data_ranges = np.where(flat, 1.0, data_ranges)
+    if correction_factor is not None:
+        data_ranges = data_ranges / np.asarray(correction_factor, dtype=np.float64)
+    ratios = scaffold_ranges / data_ranges
+    ratios[flat] = 1.0
+    if correction_factor is not None:
+        ratios[ratios == scaffold_ranges] = 1.0
+    return ratios.tolist()
+
+
+def scale_confidences(ratios):
+    """
+    Agreement of the per-axis ratios as 1 - coefficient of variation, in [0, 1].
+    Zero when no axis gives a usable ratio.
+    """
+    ratios = np.atleast_2d(ratios)
+    confidences = np.zeros(len(ratios))
+    valid = np.any(np.isfinite(ratios), axis=1)
+    if np.any(valid):
+        mean = np.nanmean(ratios[valid], axis=1)
+        deviation = np.nanstd(ratios[valid], axis=1)
+        confidences[valid] = np.clip(1.0 - deviation / np.abs(mean), 0.0, 1.0)
+    return confidences
+
+
+def estimate_scale_ratios(scaffold_points_list, data_points_list, method='moments', trim=0.02):
+    """
+    Robust scaffold to data scale ratios for a batch of frames.
+
+    :param scaffold_points_list: Scaffold surface samples per frame.
+    :param data_points_list: Data cloud per frame.
+    :param method: 'moments' compares principal standard deviations, 'percentile'
+    compares trimmed per-axis extents.
+    :return: (ratios, confidences) with shapes (number of frames, 3) and (number of frames,).
+    """
+    if method == 'moments':
+        scaffold_extents = batched_moment_extents(scaffold_points_list)
+        data_extents = batched_moment_extents(data_points_list)
+    elif method == 'percentile':
+        scaffold_extents = batched_percentile_extents(scaffold_points_list, trim)
+        data_extents = batched_percentile_extents(data_points_list, trim)
+    else:
+        raise ValueError('Unknown scale estimation method {}, expected one of {}.'.format(method, SCALE_METHODS))
+    ratios = scale_ratios(scaffold_extents, data_extents)
+    return ratios, scale_confidences(ratios)
@@ -0,0 +1,56 @@
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+
+class SpatialIndex(object):
+    """
+    Nearest neighbour queries over a fixed set of points. Uses a scipy k-d tree
+    when scipy is available and falls back to blocked brute force otherwise.
+    """
+
+    def __init__(self, points, block_size=1024):
+        self._points = np.asarray(points, dtype=np.float64)
+        self._block_size = block_size
+        self._tree = cKDTree(self._points) if cKDTree is not None else None
+
+    def __len__(self):
+        return len(self._points)
+
+    def get_points(self):
+        return self._points
+
+    def query(self, queries, k=1):
+        """
+        Distances to and indices of the k nearest points for each query point.
+        Returns arrays of shape (M,) when k is 1, otherwise (M, k).
+        """
+        queries = np.asarray(queries, dtype=np.float64)
+        k = min(k, len(self._points))
+        if self._tree is not None:
+            return self._tree.query(queries, k=k)
+        return self._brute_force_query(queries, k)
+
+    def _brute_force_query(self, queries, k):
+        distances = np.empty((len(queries), k))
+        indices = np.empty((len(queries), k), dtype=np.intp)
+        points_squared = np.sum(self._points * self._points, axis=1)
+        for start in range(0, len(queries), self._block_size):
+            block = queries[start:start + self._block_size]
+            squared = np.sum(block * block, axis=1)[:, np.newaxis] - 2.0 * np.dot(block, self._points.T) + \
+                points_squared[np.newaxis, :]
+            if k < len(self._points):
+                nearest = np.argpartition(squared, k - 1, axis=1)[:, :k]
+            else:
+                nearest = np.tile(np.arange(len(self._points)), (len(block), 1))
+            nearest_squared = np.take_along_axis(squared, nearest, axis=1)
+            order = np.argsort(nearest_squared, axis=1)
+            indices[start:start + len(block)] = np.take_along_axis(nearest, order, axis=1)
+            nearest_squared = np.take_along_axis(nearest_squared, order, axis=1)
+            distances[start:start + len(block)] = np.sqrt(np.maximum(nearest_squared, 0.0))
+        if k == 1:
+            return distances[:, 0], indices[:, 0]
+        return distances, indices
@@ -0,0 +1,56 @@
+import numpy as np
+
+
+def select_uniform_keyframes(times, stride):
+    """
+    Every stride-th frame time, always including the first and last frames.
+    """
+    if not times:
+        return []
+    stride = max(int(stride), 1)
+    keyframes = list(times[::stride])
+    if keyframes[-1] != times[-1]:
+        keyframes.append(times[-1])
+    return keyframes
+
+
+def select_adaptive_keyframes(times, signatures, threshold):
+    """
+    Choose a new keyframe whenever the per-frame data signature has moved
+    further than threshold from the signature of the last keyframe.
+    Always includes the first and last frames.
+    """
+    if not times:
+        return []
+    signatures = np.asarray(signatures, dtype=np.float64)
+    keyframes = [times[0]]
+    key_signature = signatures[0]
+    for index in range(1, len(times)):
+        if np.linalg.norm(signatures[index] - key_signature) > threshold:
+            keyframes.append(times[index])
+            key_signature = signatures[index]
+    if keyframes[-1] != times[-1]:
+        keyframes.append(times[-1])
+    return keyframes
+
+
+def interpolate_parameters(key_times, key_values, times):
+    """
+    Piecewise linear interpolation of parameter arrays over time.
+
+    :param key_times: Increasing sequence of K keyframe times.
+    :param key_values: Array of shape (K, ...) with the parameters at each keyframe.
+    :param times: Sequence of T times to interpolate at; clamped to the keyframe range.
+    :return: Array of shape (T, ...).
+    """
+    key_times = np.asarray(key_times, dtype=np.float64)
+    key_values = np.asarray(key_values, dtype=np.float64)
+    times = np.asarray(times, dtype=np.float64)
+    if len(key_times) == 1:
+        return np.repeat(key_values, len(times), axis=0)
+    times = np.clip(times, key_times[0], key_times[-1])
+    upper = np.clip(np.searchsorted(key_times, times, side='right'), 1, len(key_times) - 1)
+    lower = upper - 1
+    weights = (times - key_times[lower]) / (key_times[upper] - key_times[lower])
+    weights = weights.reshape((-1,) + (1,) * (key_values.ndim - 1))
+    return (1.0 - weights) * key_values[lower] + weights * key_values[upper]
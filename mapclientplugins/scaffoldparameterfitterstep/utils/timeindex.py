@@ -0,0 +1,75 @@
+from bisect import bisect_left, bisect_right
+
+
+class TimeIndex(object):
+    """
+    Sorted index of the frame times actually present in the data, with
+    O(log n) nearest, floor and ceil lookups.
+    """
+
+    def __init__(self, times):
+        self._times = sorted(set(float(time) for time in times))
+
+    def __len__(self):
+        return len(self._times)
+
+    def __iter__(self):
+        return iter(self._times)
+
+    def __getitem__(self, index):
+        return self._times[index]
+
+    def __contains__(self, time):
+        index = bisect_left(self._times, time)
+        return index < len(self._times) and self._times[index] == time
+
+    def get_times(self):
+        return list(self._times)
+
+    def get_minimum_time(self):
+        return self._times[0] if self._times else None
+
+    def get_maximum_time(self):
+        return self._times[-1] if self._times else None
+
+    def nearest_index(self, time):
+        if not self._times:
+            return None
+        index = bisect_left(self._times, time)
+        if index == 0:
+            return 0
+        if index == len(self._times):
+            return index - 1
+        if (time - self._times[index - 1]) <= (self._times[index] - time):
+            return index - 1
+        return index
+
+    def nearest(self, time):
+        index = self.nearest_index(time)
+        return None if index is None else self._times[index]
+
+    def floor(self, time):
+        """
+        Greatest frame time less than or equal to time, or None.
+        """
+        index = bisect_right(self._times, time)
+        return self._times[index - 1] if index > 0 else None
+
+    def ceil(self, time):
+        """
+        Smallest frame time greater than or equal to time, or None.
+        """
+        index = bisect_left(self._times, time)
+        return self._times[index] if index < len(self._times) else None
+
+    def neighbours(self, time):
+        """
+        Frame times bracketing time as (floor, ceil); either may be None.
+        """
+        return self.floor(time), self.ceil(time)
+
+    def times_between(self, start_time, end_time):
+        """
+        Frame times t with start_time <= t <= end_time.
+        """
+        return self._times[bisect_left(self._times, start_time):bisect_right(self._times, end_time)]
@@ -0,0 +1,241 @@
+"""
+Named timing spans around the hot paths, off by default.
+
+    tracing.enable()
+    with tracing.span('fit', frame=3) as current:
+        ...
+        current.set(nodes=count)
+    tracing.export_chrome_trace('trace.json')
+
+Functions decorated with traced record a span per call. While tracing and the other
+registered hooks are all disabled a traced call or span costs a single flag check, so
+instrumentation can stay in place. Only the most recent spans are kept, see
+set_maximum_spans.
+"""
+import collections
+import functools
+import json
+import os
+import threading
+from timeit import default_timer
+
+# Hook priorities; hooks with lower priorities run outside those with higher ones.
+METRICS_PRIORITY = 0
+TRACING_PRIORITY = 10
+MEMORY_PRIORITY = 20
+PROFILING_PRIORITY = 30
+
+_DEFAULT_MAXIMUM_SPANS = 100000
+
+_enabled = False
+_origin = default_timer()
+_lock = threading.Lock()
+_spans = collections.deque(maxlen=_DEFAULT_MAXIMUM_SPANS)
+_hooks = []
+_enabled_hooks = set()
+_any_hook_enabled = False
+
+
+class OperationHook(object):
+    """
+    A feature run around every call of the functions decorated with traced, e.g. the
+    spans here or the metrics, memory and profiling utilities, added by register_hook.
+    """
+
+    def is_active(self, name):
+        return False
+
+    def around(self, name, call):
+        """
+        Run call, taking no arguments, for operation name and return its result.
+        """
+        return call()
+
+
+def register_hook(hook, priority, enabled=True):
+    """
+    Run hook around traced operations whenever it is enabled and active, at priority.
+    """
+    _hooks.append((priority, hook))
+    _hooks.sort(key=lambda entry: entry[0])
+    set_hook_enabled(hook, enabled)
+
+
+def unregister_hook(hook):
+    _hooks[:] = [entry for entry in _hooks if entry[1] is not hook]
+    set_hook_enabled(hook, False)
+
+
+def set_hook_enabled(hook, enabled):
+    """
+    Switch hook on or off, e.g. from the enable and disable of its feature. Traced
+    calls only ask enabled hooks whether they are active, and none while all are off.
+    """
+    global _any_hook_enabled
+    if enabled:
+        _enabled_hooks.add(hook)
+    else:
+        _enabled_hooks.discard(hook)
+    _any_hook_enabled = bool(_enabled_hooks)
+
+
+def is_any_hook_enabled():
+    return _any_hook_enabled
+
+
+class _NullSpan(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set(self, **arguments):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span(object):
+
+    def __init__(self, name, arguments):
+        self._name = name
+        self._arguments = arguments
+        self._start = None
+
+    def __enter__(self):
+        self._start = default_timer()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = default_timer()
+        if exc_type is not None:
+            self._arguments['error'] = exc_type.__name__
+        recorded = {
+            'name': self._name,
+            'start': self._start - _origin,
+            'duration': end - self._start,
+            'thread': threading.current_thread().ident,
+            'arguments': self._arguments,
+        }
+        with _lock:
+            _spans.append(recorded)
+        return False
+
+    def set(self, **arguments):
+        """
+        Attach arguments discovered while the span runs, e.g. node and parameter counts.
+        """
+        self._arguments.update(arguments)
+
+
+class _SpanHook(OperationHook):
+
+    def is_active(self, name):
+        return _enabled
+
+    def around(self, name, call):
+        with _Span(name, {}):
+            return call()
+
+
+_SPAN_HOOK = _SpanHook()
+register_hook(_SPAN_HOOK, TRACING_PRIORITY, enabled=False)
+
+
+def enable():
+    global _enabled
+    _enabled = True
+    set_hook_enabled(_SPAN_HOOK, True)
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    set_hook_enabled(_SPAN_HOOK, False)
+
+
+def is_enabled():
+    return _enabled
+
+
+def set_maximum_spans(maximum):
+    """
+    Keep only the most recent maximum spans, 100000 by default, clearing the trace.
+    """
+    global _spans
+    with _lock:
+        _spans = collections.deque(maxlen=maximum)
+
+
+def clear():
+    with _lock:
+        _spans.clear()
+
+
+def get_spans():
+    """
+    Recorded spans as dicts of name, start and duration in seconds, thread and arguments.
+    """
+    with _lock:
+        return list(_spans)
+
+
+def span(name, **arguments):
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, arguments)
+
+
+def traced(name):
+    """
+    Decorator naming the decorated function as an operation, around every call of which
+    the active registered hooks run: a span here, and the metrics counting, memory
+    recording and profiling that select operations by this name.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _any_hook_enabled:
+                return function(*args, **kwargs)
+            active = [hook for _, hook in _hooks if (hook in _enabled_hooks) and hook.is_active(name)]
+            if not active:
+                return function(*args, **kwargs)
+            call = functools.partial(function, *args, **kwargs)
+            for hook in reversed(active):
+                call = functools.partial(hook.around, name, call)
+            return call()
+        return wrapper
+    return decorator
+
+
+def summarise_spans(spans=None):
+    """
+    Count, total and maximum duration in seconds per span name.
+    """
+    summary = {}
+    for recorded in get_spans() if spans is None else spans:
+        entry = summary.setdefault(recorded['name'], {'count': 0, 'total': 0.0, 'maximum': 0.0})
+        entry['count'] += 1
+        entry['total'] += recorded['duration']
+        entry['maximum'] = max(entry['maximum'], recorded['duration'])
+    return summary
+
+
+def export_json(filename):
+    with open(filename, 'w') as stream:
+        json.dump({'spans': get_spans(), 'summary': summarise_spans()}, stream, indent=4, sort_keys=True)
+
+
+def export_chrome_trace(filename):
+    """
+    Write the spans in the Chrome trace event format, viewable in chrome://tracing or Perfetto.
+    """
+    process = os.getpid()
+    events = [{'name': recorded['name'], 'ph': 'X', 'ts': 1.0e6 * recorded['start'],
+               'dur': 1.0e6 * recorded['duration'], 'pid': process, 'tid': recorded['thread'],
+               'args': recorded['arguments']} for recorded in get_spans()]
+    with open(filename, 'w') as stream:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, stream)
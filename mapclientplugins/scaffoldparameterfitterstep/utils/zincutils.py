@@ -1,140 +1,205 @@
+import numpy as np
+
 from opencmiss.zinc.node import Node
-from opencmiss.zinc.field import Field
+from opencmiss.zinc.field import Field, FieldFindMeshLocation
 from opencmiss.zinc.status import OK as ZINC_OK
 
+from . import metrics
+from . import tracing
 from .maths import elmult, add, matrixvectormult
 
+_VALUE_LABELS = [Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2, Node.VALUE_LABEL_D2_DS1DS2,
+                 Node.VALUE_LABEL_D_DS3, Node.VALUE_LABEL_D2_DS1DS3, Node.VALUE_LABEL_D2_DS2DS3,
+                 Node.VALUE_LABEL_D3_DS1DS2DS3]
 
-def remove_zero_valued_nodes(source_field, time=0.0):
-    ncomp = source_field.getNumberOfComponents()
+
+@tracing.traced('zincutils.remove_zero_valued_nodes')
+def remove_zero_valued_nodes(source_field, time=0.0, tolerance=1.0e-12):
+    """
+    Destroy, in one conditional operation, the datapoints whose source_field values
+    at time are all within tolerance of zero.
+    Returns the number of datapoints destroyed, or None on failure. This replaces the
+    former True/False result, so test for failure with 'is None' as 0 is a success.
+    """
     source_fe_field = source_field.castFiniteElement()
     if not (source_fe_field.isValid()):
-        print('zinc.copy_nonzero_parameters: fields must be finite element type')
-        return False
-    success = True
+        print('zincutils.remove_zero_valued_nodes: field must be finite element type')
+        return None
     fm = source_fe_field.getFieldmodule()
-    fm.beginChange()
-    cache = fm.createFieldcache()
-    cache.setTime(time)
     nodes = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_DATAPOINTS)
-    node_template = nodes.createNodetemplate()
-    node_iter = nodes.createNodeiterator()
-    node = node_iter.next()
-    while node.isValid():
-        node_template.defineFieldFromNode(source_fe_field, node)
-        cache.setNode(node)
-        result, values = source_fe_field.getNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, ncomp)
-        if result != ZINC_OK:
-            success = False
-        if values == [0., 0., 0.]:
-            result = nodes.destroyNode(node)
-            if result != ZINC_OK:
-                success = False
-            print("ZERO NODE VALUES DELETED")
-        node = node_iter.next()
+    identifiers, values = evaluate_nodeset_field(nodes, source_fe_field, time)
+    zero_mask = np.all(np.abs(values) <= tolerance, axis=1)
+    if not destroy_nodes_by_mask(nodes, identifiers, zero_mask):
+        print('zincutils.remove_zero_valued_nodes: failed to destroy zero valued nodes')
+        return None
+    return int(np.count_nonzero(zero_mask))
+
+
+def destroy_nodes_by_mask(nodeset, identifiers, mask):
+    """
+    Destroy the nodes of nodeset whose identifiers are selected by the boolean mask
+    with a single conditional destroy over a temporary node group.
+    """
+    selected = [identifier for identifier, flag in zip(identifiers, mask) if flag]
+    if not selected:
+        return True
+    fm = nodeset.getFieldmodule()
+    fm.beginChange()
+    node_group = fm.createFieldNodeGroup(nodeset)
+    nodeset_group = node_group.getNodesetGroup()
+    for identifier in selected:
+        nodeset_group.addNode(nodeset.findNodeByIdentifier(identifier))
+    result = nodeset.destroyNodesConditional(node_group)
+    del nodeset_group
+    del node_group
     fm.endChange()
-    return success
+    metrics.increment('fields_created')
+    metrics.increment('fields_destroyed')
+    return result == ZINC_OK
 
 
+@tracing.traced('zincutils.clear_region')
+def clear_region(region):
+    """
+    Destroy all elements, nodes and datapoints of region, keeping its fields so that
+    a mesh can be generated into it again.
+    """
+    fm = region.getFieldmodule()
+    fm.beginChange()
+    for dimension in (3, 2, 1):
+        fm.findMeshByDimension(dimension).destroyAllElements()
+    for domain_type in (Field.DOMAIN_TYPE_NODES, Field.DOMAIN_TYPE_DATAPOINTS):
+        fm.findNodesetByFieldDomainType(domain_type).destroyAllNodes()
+    fm.endChange()
+
+
+@tracing.traced('zincutils.copy_nodal_parameters')
 def copy_nodal_parameters(source_field, target_field, time=0.0):
+    """
+    Returns True only if every nodal parameter of source_field was copied to target_field.
+    """
+    copied, expected = _copy_nodal_parameters(source_field, target_field, [time])
+    return (copied is not None) and (copied == expected)
+
+
+@tracing.traced('zincutils.copy_nodal_parameters_over_times')
+def copy_nodal_parameters_over_times(source_field, target_field, times, source_time=None):
+    """
+    Copy all nodal parameters of source_field to target_field, which may be in another
+    region with matching node identifiers, at each of times. With source_time the
+    parameters at source_time are copied to every one of times instead.
+    Returns the number of nodal parameter vectors copied, or None on failure.
+    """
+    return _copy_nodal_parameters(source_field, target_field, times, source_time)[0]
+
+
+def _copy_nodal_parameters(source_field, target_field, times, source_time=None):
+    """
+    Returns (number of nodal parameter vectors copied, number there are to copy), or
+    (None, None) on failure. Parameters that could not be got are not set.
+    """
     ncomp = source_field.getNumberOfComponents()
     if target_field.getNumberOfComponents() != ncomp:
-        print('zinc.copyNodalParameters: fields must have same number of components')
-        return False
+        print('zincutils.copy_nodal_parameters: fields must have same number of components')
+        return None, None
     source_fe_field = source_field.castFiniteElement()
     target_fe_field = target_field.castFiniteElement()
     if not (source_fe_field.isValid() and target_fe_field.isValid()):
-        print('zinc.copyNodalParameters: fields must be finite element type')
+        print('zincutils.copy_nodal_parameters: fields must be finite element type')
+        return None, None
+    if not times:
+        return 0, 0
+    copied = 0
+    layout = values = None
+    for time in times:
+        if layout is None:
+            layout, values = get_nodal_parameters(source_fe_field, time if source_time is None else source_time)
+            if layout is None:
+                return None, None
+            set_layout = layout
+        elif source_time is None:
+            values, fetched = _get_nodal_parameters_for_layout(source_fe_field, layout, time)
+            set_layout = layout
+            if not fetched.all():
+                rows = np.nonzero(fetched)[0]
+                set_layout = [layout[row] for row in rows]
+                values = values[rows]
+        copied += _set_nodal_parameters(target_fe_field, set_layout, values, time)
+    expected = len(layout) * len(times)
+    if copied != expected:
+        print('zincutils.copy_nodal_parameters: failed to get/set some values')
+    return copied, expected
+
+
+_AXIS_VECTORS = {'X': [1.0, 0.0, 0.0], 'Y': [0.0, 1.0, 0.0], 'Z': [0.0, 0.0, 1.0]}
+
+
+def axis_remap_matrix(scaffold_up, data_up):
+    """
+    Rotation taking the scaffold up axis onto the data up axis, each given as
+    'X', 'Y' or 'Z' with an optional leading '-'. The result is a signed permutation.
+    """
+    source = _axis_vector(scaffold_up)
+    target = _axis_vector(data_up)
+    axis = np.cross(source, target)
+    if np.any(axis):
+        k = np.array([[0.0, -axis[2], axis[1]], [axis[2], 0.0, -axis[0]], [-axis[1], axis[0], 0.0]])
+        return np.identity(3) + k + np.dot(k, k)
+    if np.dot(source, target) > 0.0:
+        return np.identity(3)
+    perpendicular = np.roll(np.abs(source), 1)
+    return 2.0 * np.outer(perpendicular, perpendicular) - np.identity(3)
+
+
+def _axis_vector(axis):
+    sign = -1.0 if axis.startswith('-') else 1.0
+    return sign * np.array(_AXIS_VECTORS[axis.lstrip('+-').upper()])
+
+
+def is_signed_permutation(matrix):
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if matrix.shape != (3, 3) or not np.all(np.isin(matrix, (-1.0, 0.0, 1.0))):
         return False
-    success = True
-    fm = source_fe_field.getFieldmodule()
-    fm.beginChange()
-    cache = fm.createFieldcache()
-    cache.setTime(time)
-    nodes = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
-    node_template = nodes.createNodetemplate()
-    node_iter = nodes.createNodeiterator()
-    node = node_iter.next()
-    while node.isValid():
-        node_template.defineFieldFromNode(source_fe_field, node)
-        cache.setNode(node)
-        for derivative in [Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2, Node.VALUE_LABEL_D2_DS1DS2,
-                           Node.VALUE_LABEL_D_DS3, Node.VALUE_LABEL_D2_DS1DS3, Node.VALUE_LABEL_D2_DS2DS3, Node.VALUE_LABEL_D3_DS1DS2DS3]:
-            versions = node_template.getValueNumberOfVersions(source_fe_field, -1, derivative)
-            for v in range(1, versions + 1):
-                result, values = source_fe_field.getNodeParameters(cache, -1, derivative, v, ncomp)
-                if result != ZINC_OK:
-                    success = False
-                else:
-                    result = target_fe_field.setNodeParameters(cache, -1, derivative, v, values)
-                    if result != ZINC_OK:
-                        success = False
-        node = node_iter.next()
-    fm.endChange()
-    if not success:
-        print('zinc.copyNodalParameters: failed to get/set some values')
-    return success
+    return np.all(np.count_nonzero(matrix, axis=0) == 1) and np.all(np.count_nonzero(matrix, axis=1) == 1)
 
 
-def swap_axes(source_field, axes=None):
-    axis_x = 0
-    axis_y = 1
-    axis_z = 2
-    number_of_components = source_field.getNumberOfComponents()
+@tracing.traced('zincutils.swap_axes')
+def swap_axes(source_field, axes=None, remap=None, times=(0.0,)):
+    """
+    Remap the axes of every nodal parameter of source_field, values and derivatives alike,
+    in one vectorised pass per time. remap may be any 3 x 3 signed permutation matrix;
+    otherwise axes = {'scaffold_up': ..., 'data_up': ...} selects the rotation taking the
+    scaffold up axis onto the data up axis.
+    """
+    if remap is None:
+        remap = axis_remap_matrix(axes['scaffold_up'], axes['data_up'])
+    if not is_signed_permutation(remap):
+        print('zincutils.swap_axes: remap must be a 3 x 3 signed permutation matrix')
+        return False
     field = source_field.castFiniteElement()
     if not (field.isValid()):
         print('field must be finite element type')
         return False
+    if field.getNumberOfComponents() != 3:
+        print('zincutils.swap_axes: field must have 3 components')
+        return False
+    remap = np.asarray(remap, dtype=np.float64)
     success = True
-    fm = field.getFieldmodule()
-    fm.beginChange()
-    cache = fm.createFieldcache()
-    nodes = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
-    node_template = nodes.createNodetemplate()
-    node_iter = nodes.createNodeiterator()
-    node = node_iter.next()
-    while node.isValid():
-        node_template.defineFieldFromNode(field, node)
-        cache.setNode(node)
-        for derivative in [Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2,
-                           Node.VALUE_LABEL_D2_DS1DS2,
-                           Node.VALUE_LABEL_D_DS3, Node.VALUE_LABEL_D2_DS1DS3, Node.VALUE_LABEL_D2_DS2DS3,
-                           Node.VALUE_LABEL_D3_DS1DS2DS3]:
-            versions = node_template.getValueNumberOfVersions(field, -1, derivative)
-            for v in range(1, versions + 1):
-                result, values = field.getNodeParameters(cache, -1, derivative, v, number_of_components)
-                if result != ZINC_OK:
-                    success = False
-                else:
-                    if axes['scaffold_up'] == 'Z' and axes['data_up'] == 'Y':
-                        new_values = [values[axis_x], values[axis_z], values[axis_y]]
-                        _ = field.setNodeParameters(cache, -1, derivative, v, new_values)
-                        new_values = [new_values[0], new_values[1], -new_values[2]]
-                        result = field.setNodeParameters(cache, -1, derivative, v, new_values)
-                    elif axes['scaffold_up'] == 'Z' and axes['data_up'] == 'X':
-                        new_values = [values[axis_z], values[axis_y], values[axis_x]]
-                        _ = field.setNodeParameters(cache, -1, derivative, v, new_values)
-                        new_values = [new_values[0], new_values[1], -new_values[2]]
-                        result = field.setNodeParameters(cache, -1, derivative, v, new_values)
-                    elif axes['scaffold_up'] == 'Z' and axes['data_up'] == 'Z':
-                        pass
-                    elif axes['scaffold_up'] == 'Y' and axes['data_up'] == 'Y':
-                        pass
-                    elif axes['scaffold_up'] == 'X' and axes['data_up'] == 'X':
-                        pass
-                    else:
-                        Warning('The scaffold {} up and data {} up axes combination is not yet implemented.'.format(
-                            axes['scaffold_up'], axes['data_up']))
-                        success = False
-                    if result != ZINC_OK:
-                        success = False
-        node = node_iter.next()
-    fm.endChange()
+    layout = None
+    for time in times:
+        time_layout, values = get_nodal_parameters(field, time, layout=layout)
+        if time_layout is None:
+            success = False
+            continue
+        layout = time_layout
+        if not set_nodal_parameters(field, layout, np.dot(values, remap.T), time):
+            success = False
     if not success:
         print('failed to get/set some values')
     return success
 
 
+@tracing.traced('zincutils.transform_coordinates')
 def transform_coordinates(field, rotation, time=0):
     number_of_components = field.getNumberOfComponents()
     if (number_of_components != 2) and (number_of_components != 3):
@@ -150,38 +215,15 @@ def transform_coordinates(field, rotation, time=0):
     if not fe_field.isValid():
         print('zincutils.transformCoordinates: field is not finite element field type')
         return False
-    success = True
-    fm = field.getFieldmodule()
-    fm.beginChange()
-    cache = fm.createFieldcache()
-    cache.setTime(time)
-    nodes = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
-    node_template = nodes.createNodetemplate()
-    node_iter = nodes.createNodeiterator()
-    node = node_iter.next()
-    while node.isValid():
-        node_template.defineFieldFromNode(fe_field, node)
-        cache.setNode(node)
-        for derivative in [Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2,
-                           Node.VALUE_LABEL_D2_DS1DS2, Node.VALUE_LABEL_D_DS3, Node.VALUE_LABEL_D2_DS1DS3,
-                           Node.VALUE_LABEL_D2_DS2DS3, Node.VALUE_LABEL_D3_DS1DS2DS3]:
-            versions = node_template.getValueNumberOfVersions(fe_field, -1, derivative)
-            for v in range(1, versions + 1):
-                result, values = fe_field.getNodeParameters(cache, -1, derivative, v, number_of_components)
-                if result != ZINC_OK:
-                    success = False
-                else:
-                    new_values = matrixvectormult(rotation, values)
-                    result = fe_field.setNodeParameters(cache, -1, derivative, v, new_values)
-                    if result != ZINC_OK:
-                        success = False
-        node = node_iter.next()
-    fm.endChange()
+    layout, values = get_nodal_parameters(fe_field, time)
+    success = (layout is not None) and \
+        (_set_nodal_parameters(fe_field, layout, matrixvectormult(np.asarray(rotation), values), time) == len(layout))
     if not success:
         print('zincutils.transformCoordinates: failed to get/set some values')
     return success
 
 
+@tracing.traced('zincutils.scale_coordinates')
 def scale_coordinates(field, scale, time=0):
     number_of_components = field.getNumberOfComponents()
     if (number_of_components != 2) and (number_of_components != 3):
@@ -197,38 +239,15 @@ def scale_coordinates(field, scale, time=0):
     if not fe_field.isValid():
         print('zincutils.scale_coordinates: field is not finite element field type')
         return False
-    success = True
-    fm = field.getFieldmodule()
-    fm.beginChange()
-    cache = fm.createFieldcache()
-    cache.setTime(time)
-    nodes = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
-    node_template = nodes.createNodetemplate()
-    node_iter = nodes.createNodeiterator()
-    node = node_iter.next()
-    while node.isValid():
-        node_template.defineFieldFromNode(fe_field, node)
-        cache.setNode(node)
-        for derivative in [Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2,
-                           Node.VALUE_LABEL_D2_DS1DS2, Node.VALUE_LABEL_D_DS3, Node.VALUE_LABEL_D2_DS1DS3,
-                           Node.VALUE_LABEL_D2_DS2DS3, Node.VALUE_LABEL_D3_DS1DS2DS3]:
-            versions = node_template.getValueNumberOfVersions(fe_field, -1, derivative)
-            for v in range(1, versions + 1):
-                result, values = fe_field.getNodeParameters(cache, -1, derivative, v, number_of_components)
-                if result != ZINC_OK:
-                    success = False
-                else:
-                    new_values = elmult(scale, values)
-                    result = fe_field.setNodeParameters(cache, -1, derivative, v, new_values)
-                    if result != ZINC_OK:
-                        success = False
-        node = node_iter.next()
-    fm.endChange()
+    layout, values = get_nodal_parameters(fe_field, time)
+    success = (layout is not None) and \
+        (_set_nodal_parameters(fe_field, layout, elmult(np.asarray(scale), values), time) == len(layout))
     if not success:
         print('zincutils.transformCoordinates: failed to get/set some values')
     return success
 
 
+@tracing.traced('zincutils.offset_scaffold')
 def offset_scaffold(field, offset, time=0):
     number_of_components = field.getNumberOfComponents()
     if (number_of_components != 2) and (number_of_components != 3):
@@ -244,36 +263,307 @@ def offset_scaffold(field, offset, time=0):
     if not fe_field.isValid():
         print('zincutils.transformCoordinates: field is not finite element field type')
         return False
+    layout, values = get_nodal_parameters(fe_field, time)
+    success = layout is not None
+    if success:
+        # only the values move; derivatives are unchanged by a translation
+        rows = [row for row, (_, derivative, _) in enumerate(layout) if derivative == Node.VALUE_LABEL_VALUE]
+        value_layout = [layout[row] for row in rows]
+        success = _set_nodal_parameters(fe_field, value_layout, add(values[rows], np.asarray(offset)), time) == \
+            len(value_layout)
+    if not success:
+        print('zincutils.offset_scaffold: failed to get/set some values')
+    return success
+
+
+def get_nodal_parameters(field, time=0.0, layout=None):
+    """
+    Gather every nodal parameter of a finite element field at time in a single sweep.
+    Returns (layout, values) where row i of the values array holds the parameters of
+    layout[i] = (node identifier, value label, version), or (None, None) on failure.
+    Passing the layout from a previous call skips the node structure queries; this fails
+    if any parameter of that layout cannot be got at time.
+    """
+    number_of_components = field.getNumberOfComponents()
+    fe_field = field.castFiniteElement()
+    if not fe_field.isValid():
+        print('zincutils.get_nodal_parameters: field is not finite element field type')
+        return None, None
+    if layout is not None:
+        values, fetched = _get_nodal_parameters_for_layout(fe_field, layout, time)
+        if not fetched.all():
+            print('zincutils.get_nodal_parameters: failed to get some values')
+            return None, None
+        return layout, values
+    layout = []
+    values = []
+    node_count = 0
+    call_count = 0
+    with tracing.span('zincutils.get_nodal_parameters', time=time) as current:
+        fm = field.getFieldmodule()
+        fm.beginChange()
+        cache = fm.createFieldcache()
+        cache.setTime(time)
+        nodes = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        node_template = nodes.createNodetemplate()
+        node_iter = nodes.createNodeiterator()
+        node = node_iter.next()
+        while node.isValid():
+            node_template.defineFieldFromNode(fe_field, node)
+            cache.setNode(node)
+            identifier = node.getIdentifier()
+            node_count += 1
+            for derivative in _VALUE_LABELS:
+                versions = node_template.getValueNumberOfVersions(fe_field, -1, derivative)
+                call_count += versions
+                for v in range(1, versions + 1):
+                    result, parameters = fe_field.getNodeParameters(cache, -1, derivative, v, number_of_components)
+                    if result == ZINC_OK:
+                        layout.append((identifier, derivative, v))
+                        values.append(parameters)
+            node = node_iter.next()
+        fm.endChange()
+        current.set(nodes=node_count, parameters=len(layout))
+    _count_sweep('getNodeParameters', node_count, call_count)
+    return layout, np.array(values, dtype=np.float64).reshape((-1, number_of_components))
+
+
+def _get_nodal_parameters_for_layout(fe_field, layout, time):
+    """
+    Returns the values array and a mask of the layout rows got successfully.
+    """
+    number_of_components = fe_field.getNumberOfComponents()
+    values = np.zeros((len(layout), number_of_components))
+    fetched = np.zeros(len(layout), dtype=bool)
+    node_count = 0
+    with tracing.span('zincutils.get_nodal_parameters', time=time) as current:
+        fm = fe_field.getFieldmodule()
+        fm.beginChange()
+        cache = fm.createFieldcache()
+        cache.setTime(time)
+        nodes = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        current_identifier = None
+        for row, (identifier, derivative, v) in enumerate(layout):
+            if identifier != current_identifier:
+                cache.setNode(nodes.findNodeByIdentifier(identifier))
+                current_identifier = identifier
+                node_count += 1
+            result, parameters = fe_field.getNodeParameters(cache, -1, derivative, v, number_of_components)
+            if result == ZINC_OK:
+                values[row] = parameters
+                fetched[row] = True
+        fm.endChange()
+        current.set(nodes=node_count, parameters=len(layout))
+    _count_sweep('getNodeParameters', node_count, len(layout))
+    return values, fetched
+
+
+def set_nodal_parameters(field, layout, values, time=0.0):
+    """
+    Scatter a parameter array gathered by get_nodal_parameters back into field at time.
+    """
+    fe_field = field.castFiniteElement()
+    if not fe_field.isValid():
+        print('zincutils.set_nodal_parameters: field is not finite element field type')
+        return False
+    success = _set_nodal_parameters(fe_field, layout, values, time) == len(layout)
+    if not success:
+        print('zincutils.set_nodal_parameters: failed to set some values')
+    return success
+
+
+def _set_nodal_parameters(fe_field, layout, values, time):
+    """
+    Returns the number of parameter vectors successfully set.
+    """
+    count = 0
+    node_count = 0
+    with tracing.span('zincutils.set_nodal_parameters', time=time) as current:
+        fm = fe_field.getFieldmodule()
+        fm.beginChange()
+        cache = fm.createFieldcache()
+        cache.setTime(time)
+        nodes = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        current_identifier = None
+        for (identifier, derivative, v), parameters in zip(layout, np.asarray(values).tolist()):
+            if identifier != current_identifier:
+                cache.setNode(nodes.findNodeByIdentifier(identifier))
+                current_identifier = identifier
+                node_count += 1
+            if fe_field.setNodeParameters(cache, -1, derivative, v, parameters) == ZINC_OK:
+                count += 1
+        fm.endChange()
+        current.set(nodes=node_count, parameters=count)
+    _count_sweep('setNodeParameters', node_count, len(layout))
+    return count
+
+
+def _count_sweep(call, node_count, call_count):
+    metrics.increment('fieldcaches_created')
+    metrics.increment('nodes_visited', node_count)
+    metrics.increment(call, call_count)
+
+
+@tracing.traced('zincutils.define_nodal_timesequence')
+def define_nodal_timesequence(field, times):
+    """
+    Make the nodal parameters of field time-varying over times, seeding every
+    time with the parameters the field currently holds.
+    """
+    fe_field = field.castFiniteElement()
+    if not fe_field.isValid():
+        print('zincutils.define_nodal_timesequence: field is not finite element field type')
+        return False
+    layout, values = get_nodal_parameters(fe_field)
     success = True
     fm = field.getFieldmodule()
     fm.beginChange()
-    cache = fm.createFieldcache()
-    cache.setTime(time)
+    timesequence = fm.getMatchingTimesequence(list(times))
     nodes = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
     node_template = nodes.createNodetemplate()
     node_iter = nodes.createNodeiterator()
     node = node_iter.next()
     while node.isValid():
         node_template.defineFieldFromNode(fe_field, node)
-        cache.setNode(node)
-        for derivative in [Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2,
-                           Node.VALUE_LABEL_D2_DS1DS2, Node.VALUE_LABEL_D_DS3, Node.VALUE_LABEL_D2_DS1DS3,
-                           Node.VALUE_LABEL_D2_DS2DS3, Node.VALUE_LABEL_D3_DS1DS2DS3]:
-            versions = node_template.getValueNumberOfVersions(fe_field, -1, derivative)
-            for v in range(1, versions + 1):
-                result, values = fe_field.getNodeParameters(cache, -1, derivative, v, number_of_components)
-                if result != ZINC_OK:
-                    success = False
-                else:
-                    if derivative == Node.VALUE_LABEL_VALUE:
-                        new_values = add(values, offset)
-                    else:
-                        new_values = values
-                    result = fe_field.setNodeParameters(cache, -1, derivative, v, new_values)
-                    if result != ZINC_OK:
-                        success = False
+        node_template.setTimesequence(fe_field, timesequence)
+        if node.merge(node_template) != ZINC_OK:
+            success = False
         node = node_iter.next()
+    for time in times:
+        if not set_nodal_parameters(fe_field, layout, values, time):
+            success = False
     fm.endChange()
     if not success:
-        print('zincutils.offset_scaffold: failed to get/set some values')
+        print('zincutils.define_nodal_timesequence: failed to define some nodes over time')
     return success
+
+
+@tracing.traced('zincutils.evaluate_nodeset_field')
+def evaluate_nodeset_field(nodeset, field, time=0.0):
+    """
+    Evaluate field at every node of nodeset at time.
+    Returns (identifiers, values) for the nodes the field is defined at, with values
+    an array of shape (number of nodes, number of components).
+    """
+    number_of_components = field.getNumberOfComponents()
+    identifiers = []
+    values = []
+    fm = field.getFieldmodule()
+    fm.beginChange()
+    cache = fm.createFieldcache()
+    cache.setTime(time)
+    node_count = 0
+    node_iter = nodeset.createNodeiterator()
+    node = node_iter.next()
+    while node.isValid():
+        cache.setNode(node)
+        node_count += 1
+        result, value = field.evaluateReal(cache, number_of_components)
+        if result == ZINC_OK:
+            identifiers.append(node.getIdentifier())
+            values.append(value)
+        node = node_iter.next()
+    fm.endChange()
+    _count_sweep('evaluateReal', node_count, node_count)
+    return identifiers, np.array(values, dtype=np.float64).reshape((-1, number_of_components))
+
+
+@tracing.traced('zincutils.sample_mesh_field')
+def sample_mesh_field(mesh, field, divisions=2, time=0.0, exterior_only=True):
+    """
+    Evaluate field on a regular divisions x divisions grid of cell centres in
+    each element of a 2D mesh, optionally only on exterior faces.
+    Returns an array of shape (number of samples, number of components).
+    """
+    number_of_components = field.getNumberOfComponents()
+    xi_samples = [[(i + 0.5) / divisions, (j + 0.5) / divisions] for j in range(divisions) for i in range(divisions)]
+    values = []
+    fm = field.getFieldmodule()
+    fm.beginChange()
+    is_exterior = fm.createFieldIsExterior() if exterior_only else None
+    cache = fm.createFieldcache()
+    cache.setTime(time)
+    element_count = 0
+    call_count = 0
+    element_iter = mesh.createElementiterator()
+    element = element_iter.next()
+    while element.isValid():
+        element_count += 1
+        if is_exterior is not None:
+            cache.setMeshLocation(element, [0.5, 0.5])
+            result, exterior = is_exterior.evaluateReal(cache, 1)
+            call_count += 1
+            if (result != ZINC_OK) or (exterior == 0.0):
+                element = element_iter.next()
+                continue
+        for xi in xi_samples:
+            cache.setMeshLocation(element, xi)
+            result, value = field.evaluateReal(cache, number_of_components)
+            if result == ZINC_OK:
+                values.append(value)
+        call_count += len(xi_samples)
+        element = element_iter.next()
+    del is_exterior
+    fm.endChange()
+    metrics.increment('fieldcaches_created')
+    metrics.increment('elements_visited', element_count)
+    metrics.increment('evaluateReal', call_count)
+    if exterior_only:
+        metrics.increment('fields_created')
+        metrics.increment('fields_destroyed')
+    return np.array(values, dtype=np.float64).reshape((-1, number_of_components))
+
+
+@tracing.traced('zincutils.find_mesh_locations')
+def find_mesh_locations(mesh, coordinate_field, points, time=0.0):
+    """
+    Material locations in mesh nearest to each of points, with coordinate_field at time.
+    Returns a list of (element identifier, xi), None for points no location was found for.
+    """
+    fm = coordinate_field.getFieldmodule()
+    fm.beginChange()
+    cache = fm.createFieldcache()
+    cache.setTime(time)
+    locations = []
+    for point in points:
+        point_field = fm.createFieldConstant(list(point))
+        find_mesh_location = fm.createFieldFindMeshLocation(point_field, coordinate_field, mesh)
+        find_mesh_location.setSearchMode(FieldFindMeshLocation.SEARCH_MODE_NEAREST)
+        element, xi = find_mesh_location.evaluateMeshLocation(cache, mesh.getDimension())
+        locations.append((element.getIdentifier(), xi) if element.isValid() else None)
+        del find_mesh_location
+        del point_field
+    fm.endChange()
+    metrics.increment('fieldcaches_created')
+    metrics.increment('fields_created', 2 * len(locations))
+    metrics.increment('fields_destroyed', 2 * len(locations))
+    metrics.increment('evaluateMeshLocation', len(locations))
+    return locations
+
+
+@tracing.traced('zincutils.evaluate_mesh_locations')
+def evaluate_mesh_locations(mesh, field, locations, time=0.0):
+    """
+    Evaluate field at each (element identifier, xi) of locations at time.
+    Returns an array of shape (number of locations, number of components), or None if
+    the field could not be evaluated at one of them.
+    """
+    number_of_components = field.getNumberOfComponents()
+    values = []
+    fm = field.getFieldmodule()
+    fm.beginChange()
+    cache = fm.createFieldcache()
+    cache.setTime(time)
+    for identifier, xi in locations:
+        cache.setMeshLocation(mesh.findElementByIdentifier(identifier), xi)
+        result, value = field.evaluateReal(cache, number_of_components)
+        if result != ZINC_OK:
+            break
+        values.append(value)
+    fm.endChange()
+    metrics.increment('fieldcaches_created')
+    metrics.increment('evaluateReal', len(values))
+    if len(values) != len(locations):
+        print('zincutils.evaluate_mesh_locations: failed to evaluate field at some locations')
+        return None
+    return np.array(values, dtype=np.float64).reshape((-1, number_of_components))
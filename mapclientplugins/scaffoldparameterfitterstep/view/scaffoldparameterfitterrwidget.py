@@ -24,7 +24,7 @@ class ScaffoldParameterFitterWidget(QtGui.QWidget):
 
         if self._is_temporal:
             self._ui.timePoint_spinBox.setEnabled(True)
-            self._ui.timePoint_spinBox.setMaximum(max_time)
+            self._ui.timePoint_spinBox.setMaximum(len(self._model.get_time_index()) - 1)
             self._model.set_max_time(max_time)
 
         self._ui.sceneviewerWidget.setContext(self._model.get_context())
@@ -48,6 +48,10 @@ class ScaffoldParameterFitterWidget(QtGui.QWidget):
         self._ui.positionX_doubleSpinBox.valueChanged.connect(self._x_clicked)
         self._ui.positionY_doubleSpinBox.valueChanged.connect(self._y_clicked)
         self._ui.positionZ_doubleSpinBox.valueChanged.connect(self._z_clicked)
+        self._ui.autoAlign_pushButton.clicked.connect(self._auto_align_clicked)
+        self._ui.initialiseAlignment_pushButton.clicked.connect(self._initialise_alignment_clicked)
+        self._ui.landmarkAlign_pushButton.setEnabled(len(self._model.get_landmarks()) >= 3)
+        self._ui.landmarkAlign_pushButton.clicked.connect(self._landmark_align_clicked)
 
         self._ui.fit_pushButton.setEnabled(True)
         if self._is_temporal:
@@ -67,8 +71,9 @@ class ScaffoldParameterFitterWidget(QtGui.QWidget):
         if self._is_temporal is None:
             self._is_temporal = is_temporal
         self._model.create_graphics(is_temporal)
-        self._model.set_time_value(0.0)
-        self._model.initialise_time_graphics(0.0)
+        start_time = self._model.get_time_index().get_minimum_time()
+        self._model.set_time_value(start_time)
+        self._model.initialise_time_graphics(start_time)
 
     @staticmethod
     def _display_real(widget, value):
@@ -169,8 +174,8 @@ class ScaffoldParameterFitterWidget(QtGui.QWidget):
                     layout.addWidget(line_edit)
 
     def _time_changed(self):
-        time_value = self._ui.timePoint_spinBox.value()
-        self._model.set_time_value(time_value)
+        time_index = self._ui.timePoint_spinBox.value()
+        self._model.set_time_value(self._model.get_time_index()[time_index])
 
     def _yaw_clicked(self):
         value = self._ui.yaw_doubleSpinBox.value()
@@ -199,9 +204,19 @@ class ScaffoldParameterFitterWidget(QtGui.QWidget):
         rate = self._ui.rateOfChange_horizontalSlider.value()
         self._model.translate_scaffold('Z', value, rate)
 
+    def _auto_align_clicked(self):
+        self._model.align_scaffold_automatically(multi_resolution=self._ui.multiResolution_checkBox.isChecked())
+
+    def _initialise_alignment_clicked(self):
+        self._model.initialise_alignment()
+
+    def _landmark_align_clicked(self):
+        self._model.align_scaffold_to_landmarks()
+
     def _scale(self):
         if self._ui.fitAllTime_radioButton.isChecked():
-            self._model.scale_scaffold(all_time_points=True)
+            alignment_mode = 'multi_resolution' if self._ui.multiResolution_checkBox.isChecked() else None
+            self._model.scale_scaffold(all_time_points=True, alignment_mode=alignment_mode)
         else:
             self._model.scale_scaffold()
 
@@ -328,6 +328,35 @@ class Ui_ScaffoldParameterFitter(object):
         self.gridLayout_2.addItem(spacerItem5, 5, 3, 1, 1)
         spacerItem6 = QtGui.QSpacerItem(40, 20, QtGui.QSizePolicy.Expanding, QtGui.QSizePolicy.Minimum)
         self.gridLayout_2.addItem(spacerItem6, 5, 1, 1, 1)
+        self.autoAlign_pushButton = QtGui.QPushButton(self.transformation_groupBox)
+        font = QtGui.QFont()
+        font.setWeight(50)
+        font.setBold(False)
+        self.autoAlign_pushButton.setFont(font)
+        self.autoAlign_pushButton.setObjectName("autoAlign_pushButton")
+        self.gridLayout_2.addWidget(self.autoAlign_pushButton, 7, 0, 1, 1)
+        self.multiResolution_checkBox = QtGui.QCheckBox(self.transformation_groupBox)
+        font = QtGui.QFont()
+        font.setWeight(50)
+        font.setBold(False)
+        self.multiResolution_checkBox.setFont(font)
+        self.multiResolution_checkBox.setObjectName("multiResolution_checkBox")
+        self.gridLayout_2.addWidget(self.multiResolution_checkBox, 7, 2, 1, 1)
+        self.initialiseAlignment_pushButton = QtGui.QPushButton(self.transformation_groupBox)
+        font = QtGui.QFont()
+        font.setWeight(50)
+        font.setBold(False)
+        self.initialiseAlignment_pushButton.setFont(font)
+        self.initialiseAlignment_pushButton.setObjectName("initialiseAlignment_pushButton")
+        self.gridLayout_2.addWidget(self.initialiseAlignment_pushButton, 7, 4, 1, 1)
+        self.landmarkAlign_pushButton = QtGui.QPushButton(self.transformation_groupBox)
+        self.landmarkAlign_pushButton.setEnabled(False)
+        font = QtGui.QFont()
+        font.setWeight(50)
+        font.setBold(False)
+        self.landmarkAlign_pushButton.setFont(font)
+        self.landmarkAlign_pushButton.setObjectName("landmarkAlign_pushButton")
+        self.gridLayout_2.addWidget(self.landmarkAlign_pushButton, 8, 0, 1, 1)
         self.gridLayout_7.addWidget(self.transformation_groupBox, 5, 0, 1, 1)
         self.verticalLayout_5.addWidget(self.scaffoldFrame)
         spacerItem7 = QtGui.QSpacerItem(20, 10, QtGui.QSizePolicy.Minimum, QtGui.QSizePolicy.Fixed)
@@ -531,6 +560,14 @@ class Ui_ScaffoldParameterFitter(object):
         self.roll_label.setText(QtGui.QApplication.translate("ScaffoldParameterFitter", "Roll", None, QtGui.QApplication.UnicodeUTF8))
         self.yaw_label.setText(QtGui.QApplication.translate("ScaffoldParameterFitter", "Yaw", None, QtGui.QApplication.UnicodeUTF8))
         self.pitch_label.setText(QtGui.QApplication.translate("ScaffoldParameterFitter", "Pitch", None, QtGui.QApplication.UnicodeUTF8))
+        self.autoAlign_pushButton.setToolTip(QtGui.QApplication.translate("ScaffoldParameterFitter", "Automatically align the scaffold on the data at the current time", None, QtGui.QApplication.UnicodeUTF8))
+        self.autoAlign_pushButton.setText(QtGui.QApplication.translate("ScaffoldParameterFitter", "Auto Align", None, QtGui.QApplication.UnicodeUTF8))
+        self.multiResolution_checkBox.setToolTip(QtGui.QApplication.translate("ScaffoldParameterFitter", "Align coarse-to-fine over a resolution pyramid, also when fitting all time-points", None, QtGui.QApplication.UnicodeUTF8))
+        self.multiResolution_checkBox.setText(QtGui.QApplication.translate("ScaffoldParameterFitter", "Coarse-to-fine", None, QtGui.QApplication.UnicodeUTF8))
+        self.initialiseAlignment_pushButton.setToolTip(QtGui.QApplication.translate("ScaffoldParameterFitter", "Initialise the scaffold pose from the principal axes of the scaffold and data", None, QtGui.QApplication.UnicodeUTF8))
+        self.initialiseAlignment_pushButton.setText(QtGui.QApplication.translate("ScaffoldParameterFitter", "Initialise Pose", None, QtGui.QApplication.UnicodeUTF8))
+        self.landmarkAlign_pushButton.setToolTip(QtGui.QApplication.translate("ScaffoldParameterFitter", "Align the scaffold on the data using the landmark correspondences", None, QtGui.QApplication.UnicodeUTF8))
+        self.landmarkAlign_pushButton.setText(QtGui.QApplication.translate("ScaffoldParameterFitter", "Landmark Align", None, QtGui.QApplication.UnicodeUTF8))
         self.fitting_groupBox.setTitle(QtGui.QApplication.translate("ScaffoldParameterFitter", "Estimate New Scaffold Parameters:", None, QtGui.QApplication.UnicodeUTF8))
         self.NelderMead_radioButton.setText(QtGui.QApplication.translate("ScaffoldParameterFitter", "Nelder-Mead", None, QtGui.QApplication.UnicodeUTF8))
         self.optimisationMethod_label.setText(QtGui.QApplication.translate("ScaffoldParameterFitter", "Optimisation method*:", None, QtGui.QApplication.UnicodeUTF8))
@@ -0,0 +1,41 @@
+import unittest
+
+import numpy as np
+
+from mapclientplugins.scaffoldparameterfitterstep.utils import filtering
+
+
+def _cloud_with_strays():
+    random = np.random.RandomState(0)
+    cloud = random.uniform(-1.0, 1.0, size=(500, 3))
+    strays = np.array([[20.0, 0.0, 0.0], [0.0, -25.0, 0.0], [0.0, 0.0, 30.0]])
+    return np.vstack((cloud, strays))
+
+
+class OutlierMaskTestCase(unittest.TestCase):
+
+    def test_statistical(self):
+        mask = filtering.outlier_mask(_cloud_with_strays(), method='statistical', k=8, std_ratio=2.0)
+        self.assertTrue(np.all(mask[:500]))
+        self.assertFalse(np.any(mask[500:]))
+
+    def test_radius(self):
+        mask = filtering.outlier_mask(_cloud_with_strays(), method='radius', radius=0.6, min_neighbours=3)
+        self.assertTrue(np.all(mask[:500]))
+        self.assertFalse(np.any(mask[500:]))
+
+    def test_small_clouds_are_kept(self):
+        points = [[0.0, 0.0, 0.0], [10.0, 0.0, 0.0]]
+        self.assertTrue(np.all(filtering.radius_outlier_mask(points, 0.1, min_neighbours=4)))
+        self.assertTrue(np.all(filtering.statistical_outlier_mask(points, k=8)))
+        self.assertEqual(len(filtering.radius_outlier_mask(np.zeros((0, 3)), 0.1)), 0)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            filtering.outlier_mask(_cloud_with_strays(), method='radius')
+        with self.assertRaises(ValueError):
+            filtering.outlier_mask(_cloud_with_strays(), method='median')
+
+
+if __name__ == '__main__':
+    unittest.main()
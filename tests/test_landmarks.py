@@ -0,0 +1,79 @@
+import unittest
+
+import numpy as np
+
+try:
+    from opencmiss.zinc.context import Context
+    from opencmiss.zinc.element import Element, Elementbasis
+    from opencmiss.zinc.field import Field
+except ImportError:
+    Context = None
+
+from mapclientplugins.scaffoldparameterfitterstep.utils import registration
+
+if Context is not None:
+    from mapclientplugins.scaffoldparameterfitterstep.utils import zincutils
+
+
+def _cube(region):
+    fm = region.getFieldmodule()
+    fm.beginChange()
+    coordinates = fm.createFieldFiniteElement(3)
+    coordinates.setName('coordinates')
+    coordinates.setManaged(True)
+    coordinates.setTypeCoordinate(True)
+    nodes = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+    node_template = nodes.createNodetemplate()
+    node_template.defineField(coordinates)
+    cache = fm.createFieldcache()
+    identifier = 1
+    for z in (0.0, 1.0):
+        for y in (0.0, 2.0):
+            for x in (0.0, 3.0):
+                cache.setNode(nodes.createNode(identifier, node_template))
+                coordinates.assignReal(cache, [x, y, z])
+                identifier += 1
+    mesh = fm.findMeshByDimension(3)
+    element_template = mesh.createElementtemplate()
+    element_template.setElementShapeType(Element.SHAPE_TYPE_CUBE)
+    eft = mesh.createElementfieldtemplate(fm.createElementbasis(3, Elementbasis.FUNCTION_TYPE_LINEAR_LAGRANGE))
+    element_template.defineField(coordinates, -1, eft)
+    element = mesh.createElement(1, element_template)
+    element.setNodesByIdentifier(eft, list(range(1, 9)))
+    fm.endChange()
+    return mesh, coordinates
+
+
+@unittest.skipIf(Context is None, 'requires opencmiss.zinc')
+class LandmarkTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._context = Context('landmarks')
+        self._mesh, self._coordinates = _cube(self._context.getDefaultRegion())
+        self._points = np.array([[0.5, 0.5, 0.5], [2.5, 0.2, 0.1], [1.5, 1.8, 0.9], [0.1, 1.0, 0.3]])
+
+    def test_locations_move_with_scaffold(self):
+        locations = zincutils.find_mesh_locations(self._mesh, self._coordinates, self._points)
+        np.testing.assert_allclose(zincutils.evaluate_mesh_locations(self._mesh, self._coordinates, locations),
+                                   self._points, atol=1.0e-9)
+        rotation = [[0.0, -1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 1.0]]
+        self.assertTrue(zincutils.transform_coordinates(self._coordinates, rotation))
+        np.testing.assert_allclose(zincutils.evaluate_mesh_locations(self._mesh, self._coordinates, locations),
+                                   np.dot(self._points, np.transpose(rotation)), atol=1.0e-9)
+
+    def test_align_after_rotation_has_zero_residual(self):
+        locations = zincutils.find_mesh_locations(self._mesh, self._coordinates, self._points)
+        data_points = self._points * 2.0 + [1.0, -2.0, 0.5]
+        angle = 0.3
+        rotation = [[np.cos(angle), 0.0, np.sin(angle)], [0.0, 1.0, 0.0], [-np.sin(angle), 0.0, np.cos(angle)]]
+        self.assertTrue(zincutils.transform_coordinates(self._coordinates, rotation))
+        scaffold_points = zincutils.evaluate_mesh_locations(self._mesh, self._coordinates, locations)
+        alignment_rotation, translation, scale = registration.similarity_transform(scaffold_points, data_points)
+        self.assertTrue(zincutils.transform_coordinates(self._coordinates, (scale * alignment_rotation).tolist()))
+        self.assertTrue(zincutils.offset_scaffold(self._coordinates, translation.tolist()))
+        np.testing.assert_allclose(zincutils.evaluate_mesh_locations(self._mesh, self._coordinates, locations),
+                                   data_points, atol=1.0e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
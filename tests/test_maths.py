@@ -0,0 +1,102 @@
+import unittest
+
+import numpy as np
+
+from mapclientplugins.scaffoldparameterfitterstep.utils import maths
+
+
+class VectorTestCase(unittest.TestCase):
+
+    def test_lists_return_lists_and_floats(self):
+        self.assertEqual(maths.add([1.0, 2.0, 3.0], [1.0, 1.0, 1.0]), [2.0, 3.0, 4.0])
+        self.assertEqual(maths.sub([1.0, 2.0, 3.0], [1.0, 1.0, 1.0]), [0.0, 1.0, 2.0])
+        self.assertEqual(maths.mult([1.0, 2.0, 3.0], 2.0), [2.0, 4.0, 6.0])
+        self.assertEqual(maths.eldiv([1.0, 2.0, 3.0], [2.0, 2.0, 2.0]), [0.5, 1.0, 1.5])
+        self.assertEqual(maths.cross([1.0, 0.0, 0.0], [0.0, 1.0, 0.0]), [0.0, 0.0, 1.0])
+        dot = maths.dot([1.0, 2.0, 3.0], [4.0, 5.0, 6.0])
+        self.assertIsInstance(dot, float)
+        self.assertEqual(dot, 32.0)
+        self.assertIsInstance(maths.magnitude([3.0, 4.0, 0.0]), float)
+        self.assertEqual(maths.magnitude([3.0, 4.0, 0.0]), 5.0)
+
+    def test_list_division_by_zero_raises(self):
+        with self.assertRaises(ZeroDivisionError):
+            maths.eldiv([1.0, 2.0, 3.0], [1.0, 0.0, 1.0])
+        with self.assertRaises(ZeroDivisionError):
+            maths.div([1.0, 2.0, 3.0], 0.0)
+
+    def test_arrays_are_batched(self):
+        vectors = np.array([[3.0, 4.0, 0.0], [0.0, 0.0, 2.0]])
+        np.testing.assert_allclose(maths.magnitude(vectors), [5.0, 2.0])
+        np.testing.assert_allclose(maths.normalize(vectors), [[0.6, 0.8, 0.0], [0.0, 0.0, 1.0]])
+        np.testing.assert_allclose(maths.mult(vectors, np.array([1.0, 0.5])), [[3.0, 4.0, 0.0], [0.0, 0.0, 1.0]])
+        self.assertIsInstance(maths.dot(vectors, vectors), np.ndarray)
+
+    def test_matrix_vector(self):
+        matrix = [[0.0, -1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 1.0]]
+        self.assertEqual(maths.matrixvectormult(matrix, [1.0, 0.0, 0.0]), [0.0, 1.0, 0.0])
+        self.assertEqual(maths.vectormatrixmult([1.0, 0.0, 0.0], matrix), [0.0, -1.0, 0.0])
+        vectors = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+        np.testing.assert_allclose(maths.matrixvectormult(np.array(matrix), vectors), [[0.0, 1.0, 0.0],
+                                                                                      [-1.0, 0.0, 0.0]])
+        with self.assertRaises(ValueError):
+            maths.vectormatrixmult([1.0, 0.0], matrix)
+
+
+class EulerTestCase(unittest.TestCase):
+
+    def test_euler_round_trip(self):
+        angles = np.array([[0.1, 0.2, 0.3], [-1.0, 0.5, 2.0], [2.5, -0.7, -1.5]])
+        matrices = maths.eulerToRotationMatrix3(angles)
+        np.testing.assert_allclose(np.linalg.det(matrices), 1.0)
+        np.testing.assert_allclose(maths.rotationMatrix3ToEuler(matrices), angles, atol=1.0e-12)
+        single = maths.rotationMatrix3ToEuler(maths.eulerToRotationMatrix3([0.1, 0.2, 0.3]))
+        self.assertIsInstance(single, list)
+        np.testing.assert_allclose(single, [0.1, 0.2, 0.3])
+
+
+class RotationConversionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        random = np.random.RandomState(0)
+        axes = random.normal(size=(50, 3))
+        self._axes = axes / np.linalg.norm(axes, axis=1)[:, np.newaxis]
+        self._angles = random.uniform(0.0, np.pi, size=50)
+        self._angles[:3] = [0.0, np.pi, 1.0e-9]
+
+    def test_axis_angle_round_trip(self):
+        matrices = maths.axisAngleToMatrix(self._axes, self._angles)
+        np.testing.assert_allclose(np.linalg.det(matrices), 1.0)
+        axes, angles = maths.matrixToAxisAngle(matrices)
+        np.testing.assert_allclose(angles, self._angles, atol=1.0e-7)
+        np.testing.assert_allclose(maths.axisAngleToMatrix(axes, angles), matrices, atol=1.0e-12)
+
+    def test_quaternion_round_trip(self):
+        matrices = maths.axisAngleToMatrix(self._axes, self._angles)
+        quaternions = maths.matrixToQuaternion(matrices)
+        np.testing.assert_allclose(np.linalg.norm(quaternions, axis=1), 1.0)
+        self.assertTrue(np.all(quaternions[:, 0] >= 0.0))
+        np.testing.assert_allclose(maths.rotmx(quaternions), matrices, atol=1.0e-12)
+
+    def test_half_turn(self):
+        quaternion = maths.matrixToQuaternion([[1.0, 0.0, 0.0], [0.0, -1.0, 0.0], [0.0, 0.0, -1.0]])
+        np.testing.assert_allclose(quaternion, [0.0, 1.0, 0.0, 0.0], atol=1.0e-12)
+
+    def test_zero_rotation_axis(self):
+        axis, angle = maths.quaternionToAxisAngle([1.0, 0.0, 0.0, 0.0])
+        self.assertEqual(axis, [0.0, 0.0, 1.0])
+        self.assertEqual(angle, 0.0)
+
+    def test_euler_quaternion_round_trip(self):
+        angles = [0.3, -0.4, 1.2]
+        np.testing.assert_allclose(maths.quaternionToEuler(maths.eulerToQuaternion(angles)), angles)
+
+    def test_direction_from_matrix(self):
+        matrix = maths.axisAngleToMatrix([1.0, 2.0, 2.0], 0.8)
+        direction = maths.directionFromMatrix(matrix)
+        np.testing.assert_allclose(direction, [1.0 / 3.0, 2.0 / 3.0, 2.0 / 3.0])
+        np.testing.assert_allclose(maths.matrixvectormult(matrix, direction), direction)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import gc
+import threading
+import unittest
+
+try:
+    from opencmiss.zinc.context import Context
+except ImportError:
+    Context = None
+
+from mapclientplugins.scaffoldparameterfitterstep.utils import memory, tracing
+
+
+@tracing.traced('TestMemory.outer')
+def _outer(size, inner_size):
+    block = bytearray(size)
+    del block
+    _inner(inner_size)
+
+
+@tracing.traced('TestMemory.inner')
+def _inner(size):
+    block = bytearray(size)
+    del block
+
+
+class MemoryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        memory.reset()
+        memory.enable(0, ['TestMemory.inner'])
+
+    def tearDown(self):
+        memory.disable()
+        memory.reset()
+
+    def test_nested_call_keeps_enclosing_peak(self):
+        _outer(4000000, 100000)
+        operations = memory.report()['operations']
+        self.assertGreaterEqual(operations['TestMemory.outer']['peak'], 4000000)
+        self.assertLess(operations['TestMemory.inner']['peak'], 1000000)
+
+    def test_depth_is_per_thread(self):
+        threads = [threading.Thread(target=_outer, args=(1000, 1000)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        operations = memory.report()['operations']
+        self.assertEqual(operations['TestMemory.outer']['calls'], 4)
+        self.assertEqual(operations['TestMemory.inner']['calls'], 4)
+
+    def test_growing(self):
+        samples = [{'regions': 1, 'fields': count, 'heap': 0} for count in range(5)]
+        self.assertEqual(memory._growing(samples), ['fields'])
+        self.assertEqual(memory._growing(samples[:3]), [])
+
+
+@unittest.skipIf(Context is None, 'requires opencmiss.zinc')
+class TrackRegionTestCase(unittest.TestCase):
+
+    def test_tracked_regions_are_counted_while_referenced(self):
+        before = memory.count_zinc_objects()
+        context = Context('memory')
+        root_region = context.getDefaultRegion()
+        root_region.createChild('child')
+        memory.track_region(root_region)
+        self.assertEqual(memory.count_zinc_objects()['regions'] - before['regions'], 2)
+        del root_region
+        gc.collect()
+        self.assertEqual(memory.count_zinc_objects(), before)
+
+    def test_temporary_handle_is_dropped(self):
+        before = memory.count_zinc_objects()
+        context = Context('memory')
+        memory.track_region(context.getDefaultRegion())
+        gc.collect()
+        self.assertEqual(memory.count_zinc_objects(), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+
+import numpy as np
+
+from mapclientplugins.scaffoldparameterfitterstep.utils import registration
+from mapclientplugins.scaffoldparameterfitterstep.utils.spatialindex import SpatialIndex
+
+
+def _rotation(angles):
+    """
+    Rotation about x, then y, then z by angles in radians.
+    """
+    rotation = np.identity(3)
+    for axis, angle in enumerate(angles):
+        c, s = np.cos(angle), np.sin(angle)
+        other = [index for index in range(3) if index != axis]
+        elementary = np.identity(3)
+        elementary[other[0], other[0]] = c
+        elementary[other[0], other[1]] = -s
+        elementary[other[1], other[0]] = s
+        elementary[other[1], other[1]] = c
+        rotation = np.dot(elementary, rotation)
+    return rotation
+
+
+def _cloud(count=400, seed=0):
+    """
+    Points on an asymmetric, anisotropic surface with distinct principal axes.
+    """
+    random = np.random.RandomState(seed)
+    directions = random.normal(size=(count, 3))
+    directions /= np.linalg.norm(directions, axis=1)[:, np.newaxis]
+    points = directions * [3.0, 2.0, 1.0]
+    points[:, 0] += 0.5 * points[:, 1] ** 2
+    return points
+
+
+class SpatialIndexTestCase(unittest.TestCase):
+
+    def test_brute_force_matches_tree(self):
+        points = _cloud(300)
+        queries = _cloud(50, seed=1) * 1.1
+        index = SpatialIndex(points, block_size=16)
+        tree_distances, tree_indices = index.query(queries, k=3)
+        brute_distances, brute_indices = index._brute_force_query(queries, 3)
+        np.testing.assert_allclose(brute_distances, tree_distances)
+        np.testing.assert_array_equal(brute_indices, tree_indices)
+
+
+class IcpTestCase(unittest.TestCase):
+
+    def test_recovers_small_rigid_motion(self):
+        source = _cloud()
+        rotation = _rotation([0.1, -0.05, 0.15])
+        translation = np.array([0.2, -0.1, 0.3])
+        target = registration.apply_transform(source, rotation, translation)
+        alignment = registration.icp(source, target, max_iterations=100, tolerance=1.0e-10)
+        np.testing.assert_allclose(alignment.rotation, rotation, atol=1.0e-6)
+        np.testing.assert_allclose(alignment.translation, translation, atol=1.0e-6)
+        self.assertLess(alignment.error, 1.0e-6)
+        self.assertAlmostEqual(np.linalg.det(alignment.rotation), 1.0)
+
+    def test_recovers_scale(self):
+        source = _cloud()
+        target = registration.apply_transform(source, _rotation([0.0, 0.0, 0.05]), [0.1, 0.0, 0.0], 1.2)
+        alignment = registration.icp(source, target, with_scale=True, max_iterations=200, tolerance=1.0e-12)
+        self.assertAlmostEqual(alignment.scale, 1.2, places=5)
+
+
+class PyramidTestCase(unittest.TestCase):
+
+    def test_voxel_downsample(self):
+        points = np.array([[0.0, 0.0, 0.0], [0.1, 0.1, 0.1], [1.0, 1.0, 1.0]])
+        downsampled = registration.voxel_downsample(points, 0.5)
+        self.assertEqual(len(downsampled), 2)
+        np.testing.assert_allclose(sorted(downsampled.tolist()), [[0.05, 0.05, 0.05], [1.0, 1.0, 1.0]])
+        np.testing.assert_array_equal(registration.voxel_downsample(points, 0.0), points)
+
+    def test_build_pyramid_coarse_to_fine(self):
+        points = _cloud(2000)
+        pyramid = registration.build_pyramid(points, levels=3, coarsest_divisions=4)
+        self.assertEqual(len(pyramid), 3)
+        self.assertLess(len(pyramid[0]), len(pyramid[1]))
+        self.assertLess(len(pyramid[1]), len(pyramid[2]))
+        np.testing.assert_array_equal(pyramid[-1], points)
+
+    def test_icp_pyramid_recovers_rigid_motion(self):
+        source = _cloud(2000)
+        rotation = _rotation([0.05, 0.1, -0.1])
+        translation = np.array([-0.2, 0.1, 0.05])
+        target = registration.apply_transform(source, rotation, translation)
+        alignment, reports = registration.icp_pyramid(source, target, levels=3, tolerance=1.0e-10,
+                                                      final_iterations=50)
+        self.assertEqual([report['level'] for report in reports], [0, 1, 2])
+        np.testing.assert_allclose(alignment.rotation, rotation, atol=1.0e-5)
+        np.testing.assert_allclose(alignment.translation, translation, atol=1.0e-5)
+
+
+class PrincipalAxesTestCase(unittest.TestCase):
+
+    def test_axes_are_right_handed(self):
+        for seed in range(20):
+            _, axes, variances = registration.principal_axes(_cloud(200, seed) * [1.0, -1.0, 1.0])
+            self.assertAlmostEqual(np.linalg.det(axes), 1.0)
+            self.assertTrue(np.all(np.diff(variances) <= 0.0))
+
+    def test_alignment_is_a_proper_rotation(self):
+        random = np.random.RandomState(1)
+        for trial in range(200):
+            source = random.normal(size=(60, 3)) * [3.0, 2.0, 1.0]
+            target = random.normal(size=(60, 3)) * [2.0, 1.0, 3.0]
+            alignment = registration.principal_axes_alignment(source, target)
+            self.assertAlmostEqual(np.linalg.det(alignment.rotation), 1.0)
+
+    def test_recovers_known_rotation(self):
+        source = _cloud(1000)
+        rotation = _rotation([0.7, -1.2, 2.0])
+        translation = np.array([1.0, 2.0, -3.0])
+        target = registration.apply_transform(source, rotation, translation, 1.5)
+        alignment = registration.principal_axes_alignment(source, target, with_scale=True)
+        np.testing.assert_allclose(alignment.rotation, rotation, atol=1.0e-6)
+        np.testing.assert_allclose(alignment.translation, translation, atol=1.0e-6)
+        self.assertAlmostEqual(alignment.scale, 1.5)
+
+
+class SimilarityTransformTestCase(unittest.TestCase):
+
+    def test_recovers_similarity(self):
+        source = _cloud(20)
+        rotation = _rotation([0.3, 0.2, -0.4])
+        target = registration.apply_transform(source, rotation, [1.0, 0.0, -1.0], 0.8)
+        found_rotation, found_translation, found_scale = registration.similarity_transform(source, target)
+        np.testing.assert_allclose(found_rotation, rotation, atol=1.0e-10)
+        np.testing.assert_allclose(found_translation, [1.0, 0.0, -1.0], atol=1.0e-10)
+        self.assertAlmostEqual(found_scale, 0.8)
+
+    def test_never_reflects(self):
+        source = _cloud(20)
+        mirrored = source * [-1.0, 1.0, 1.0]
+        rotation, _, scale = registration.similarity_transform(source, mirrored, with_scale=False)
+        self.assertAlmostEqual(np.linalg.det(rotation), 1.0)
+        self.assertEqual(scale, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+
+from mapclientplugins.scaffoldparameterfitterstep.utils import scaling
+
+
+class ExtentsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        random = np.random.RandomState(0)
+        self._clouds = [random.normal(size=(count, 3)) * [3.0, 2.0, 1.0] for count in (50, 1, 0, 200)]
+
+    def test_batched_percentile_matches_numpy(self):
+        extents = scaling.batched_percentile_extents(self._clouds, trim=0.05)
+        for cloud, extent in zip(self._clouds, extents):
+            if len(cloud) == 0:
+                self.assertTrue(np.all(np.isnan(extent)))
+                continue
+            lower, upper = np.percentile(cloud, [5.0, 95.0], axis=0)
+            np.testing.assert_allclose(extent, upper - lower)
+
+    def test_batched_moments_match_single(self):
+        extents = scaling.batched_moment_extents(self._clouds)
+        for cloud, extent in zip(self._clouds, extents):
+            if len(cloud) == 0:
+                self.assertTrue(np.all(np.isnan(extent)))
+                continue
+            variances = np.linalg.eigvalsh(np.cov(cloud.T, bias=True).reshape(3, 3))[::-1]
+            np.testing.assert_allclose(extent, np.sqrt(np.maximum(variances, 0.0)), atol=1.0e-12)
+
+    def test_percentile_ignores_stray_point(self):
+        cloud = np.random.RandomState(1).uniform(-1.0, 1.0, size=(1000, 3))
+        stray = np.vstack((cloud, [[100.0, 0.0, 0.0]]))
+        np.testing.assert_allclose(scaling.percentile_extents(stray), scaling.percentile_extents(cloud), rtol=0.01)
+
+
+class ScaleRatiosTestCase(unittest.TestCase):
+
+    def test_estimate_scale_ratios(self):
+        random = np.random.RandomState(2)
+        scaffolds = [random.normal(size=(300, 3)) * [3.0, 2.0, 1.0] for _ in range(3)]
+        data = [points * factor for points, factor in zip(scaffolds, (0.5, 1.0, 2.0))]
+        for method in scaling.SCALE_METHODS:
+            ratios, confidences = scaling.estimate_scale_ratios(scaffolds, data, method=method)
+            np.testing.assert_allclose(ratios, [[2.0] * 3, [1.0] * 3, [0.5] * 3])
+            np.testing.assert_allclose(confidences, 1.0)
+
+    def test_degenerate_axis(self):
+        ratios = scaling.scale_ratios([[2.0, 2.0, 2.0]], [[1.0, 1.0, 0.0]])
+        np.testing.assert_allclose(ratios[0, :2], [2.0, 2.0])
+        self.assertTrue(np.isnan(ratios[0, 2]))
+        self.assertEqual(scaling.scale_confidences([[np.nan] * 3])[0], 0.0)
+
+    def test_range_ratios_ignore_flat_axes(self):
+        ratios = scaling.range_ratios([-4.0, -2.0, -1.0], [-2.0, -1.0, 0.0])
+        self.assertEqual(ratios, [2.0, 2.0, 1.0])
+        self.assertTrue(all(np.isfinite(ratios)))
+        ratios = scaling.range_ratios([-4.0, -2.0, -1.0], [-2.0, -1.0, 0.0], [2.0, 2.0, 2.0])
+        self.assertEqual(ratios, [4.0, 4.0, 1.0])
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            scaling.estimate_scale_ratios([], [], method='boxes')
+
+
+if __name__ == '__main__':
+    unittest.main()
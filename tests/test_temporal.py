@@ -0,0 +1,39 @@
+import unittest
+
+import numpy as np
+
+from mapclientplugins.scaffoldparameterfitterstep.utils import temporal
+
+
+class KeyframeSelectionTestCase(unittest.TestCase):
+
+    def test_uniform_keyframes(self):
+        times = [0.0, 0.1, 0.2, 0.3, 0.4]
+        self.assertEqual(temporal.select_uniform_keyframes(times, 2), [0.0, 0.2, 0.4])
+        self.assertEqual(temporal.select_uniform_keyframes(times, 3), [0.0, 0.3, 0.4])
+        self.assertEqual(temporal.select_uniform_keyframes(times, 0), times)
+        self.assertEqual(temporal.select_uniform_keyframes([], 2), [])
+
+    def test_adaptive_keyframes(self):
+        times = [0.0, 0.1, 0.2, 0.3, 0.4]
+        signatures = [[0.0], [0.1], [1.0], [1.1], [1.2]]
+        self.assertEqual(temporal.select_adaptive_keyframes(times, signatures, 0.5), [0.0, 0.2, 0.4])
+
+
+class InterpolateParametersTestCase(unittest.TestCase):
+
+    def test_linear(self):
+        values = temporal.interpolate_parameters([0.0, 1.0], [[0.0, 10.0], [1.0, 20.0]], [0.0, 0.25, 1.0])
+        np.testing.assert_allclose(values, [[0.0, 10.0], [0.25, 12.5], [1.0, 20.0]])
+
+    def test_clamped(self):
+        values = temporal.interpolate_parameters([0.0, 1.0, 2.0], [0.0, 2.0, 0.0], [-1.0, 1.5, 3.0])
+        np.testing.assert_allclose(values, [0.0, 1.0, 0.0])
+
+    def test_single_keyframe(self):
+        values = temporal.interpolate_parameters([0.5], [[1.0, 2.0]], [0.0, 1.0])
+        np.testing.assert_allclose(values, [[1.0, 2.0], [1.0, 2.0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
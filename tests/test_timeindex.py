@@ -0,0 +1,47 @@
+import unittest
+
+from mapclientplugins.scaffoldparameterfitterstep.utils.timeindex import TimeIndex
+
+
+class TimeIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._index = TimeIndex([0.3, 0.1, 0.2, 0.1, 0.0])
+
+    def test_sorted_unique(self):
+        self.assertEqual(self._index.get_times(), [0.0, 0.1, 0.2, 0.3])
+        self.assertEqual(len(self._index), 4)
+        self.assertEqual(self._index.get_minimum_time(), 0.0)
+        self.assertEqual(self._index.get_maximum_time(), 0.3)
+        self.assertIn(0.2, self._index)
+        self.assertNotIn(0.25, self._index)
+
+    def test_nearest(self):
+        self.assertEqual(self._index.nearest(-1.0), 0.0)
+        self.assertEqual(self._index.nearest(0.14), 0.1)
+        self.assertEqual(self._index.nearest(0.16), 0.2)
+        self.assertEqual(self._index.nearest(5.0), 0.3)
+        self.assertEqual(self._index.nearest_index(0.21), 2)
+
+    def test_floor_ceil(self):
+        self.assertEqual(self._index.floor(0.15), 0.1)
+        self.assertEqual(self._index.ceil(0.15), 0.2)
+        self.assertEqual(self._index.floor(0.2), 0.2)
+        self.assertEqual(self._index.ceil(0.2), 0.2)
+        self.assertIsNone(self._index.floor(-0.1))
+        self.assertIsNone(self._index.ceil(0.4))
+        self.assertEqual(self._index.neighbours(0.25), (0.2, 0.3))
+
+    def test_times_between(self):
+        self.assertEqual(self._index.times_between(0.1, 0.2), [0.1, 0.2])
+        self.assertEqual(self._index.times_between(0.21, 0.29), [])
+
+    def test_empty(self):
+        index = TimeIndex([])
+        self.assertIsNone(index.nearest(0.0))
+        self.assertIsNone(index.get_minimum_time())
+        self.assertIsNone(index.floor(0.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+
+from mapclientplugins.scaffoldparameterfitterstep.utils import metrics
+from mapclientplugins.scaffoldparameterfitterstep.utils import tracing
+
+
+@tracing.traced('test.outer')
+def _outer(value):
+    metrics.increment('calls')
+    return _inner(value) + 1
+
+
+@tracing.traced('test.inner')
+def _inner(value):
+    metrics.increment('calls')
+    return 2 * value
+
+
+class TracingTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        tracing.disable()
+        tracing.set_maximum_spans(100000)
+        metrics.disable()
+        metrics.reset()
+
+    def test_disabled_records_nothing(self):
+        tracing.clear()
+        self.assertEqual(_outer(1), 3)
+        self.assertEqual(tracing.get_spans(), [])
+
+    def test_spans_and_metrics_attribution(self):
+        tracing.clear()
+        tracing.enable()
+        metrics.enable()
+        self.assertEqual(_outer(2), 5)
+        summary = tracing.summarise_spans()
+        self.assertEqual(summary['test.outer']['count'], 1)
+        self.assertEqual(summary['test.inner']['count'], 1)
+        self.assertEqual(metrics.snapshot()['operations'], {'test.outer': {'calls': 2}})
+
+    def test_hooks_are_skipped_while_all_disabled(self):
+        asked = []
+
+        class CountingHook(tracing.OperationHook):
+
+            def is_active(self, name):
+                asked.append(name)
+                return False
+
+        hook = CountingHook()
+        tracing.register_hook(hook, 0, enabled=False)
+        try:
+            self.assertFalse(tracing.is_any_hook_enabled())
+            _inner(1)
+            self.assertEqual(asked, [])
+            tracing.set_hook_enabled(hook, True)
+            self.assertTrue(tracing.is_any_hook_enabled())
+            _inner(1)
+            self.assertEqual(asked, ['test.inner'])
+        finally:
+            tracing.unregister_hook(hook)
+        self.assertFalse(tracing.is_any_hook_enabled())
+        tracing.enable()
+        self.assertTrue(tracing.is_any_hook_enabled())
+        tracing.disable()
+        self.assertFalse(tracing.is_any_hook_enabled())
+
+    def test_span_buffer_is_bounded(self):
+        tracing.enable()
+        tracing.set_maximum_spans(3)
+        for value in range(5):
+            _outer(value)
+        self.assertEqual(len(tracing.get_spans()), 3)
+
+    def test_hook_order(self):
+        calls = []
+
+        class RecordingHook(tracing.OperationHook):
+
+            def __init__(self, label):
+                self._label = label
+
+            def is_active(self, name):
+                return name == 'test.inner'
+
+            def around(self, name, call):
+                calls.append(self._label)
+                return call()
+
+        hooks = [RecordingHook('late'), RecordingHook('early')]
+        tracing.register_hook(hooks[0], 1000)
+        tracing.register_hook(hooks[1], -1000)
+        try:
+            self.assertEqual(_inner(3), 6)
+        finally:
+            for hook in hooks:
+                tracing.unregister_hook(hook)
+        self.assertEqual(calls, ['early', 'late'])
+
+
+if __name__ == '__main__':
+    unittest.main()